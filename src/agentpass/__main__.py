@@ -2,30 +2,24 @@
 
 from __future__ import annotations
 
-import argparse
 import asyncio
 import importlib
 import logging
 import os
 import signal
-import ssl
 import sys
 from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
 
-import websockets
-import websockets.asyncio.server
-from aiohttp import web
-
-from agentpass.config import ConfigError, ServiceConfig, load_config, load_permissions
-from agentpass.dashboard import setup_dashboard
-from agentpass.db import Database
-from agentpass.engine import PermissionEngine
-from agentpass.executor import Executor
-from agentpass.messenger.telegram import TelegramAdapter
-from agentpass.registry import build_registry
-from agentpass.server import GatewayServer
-from agentpass.services.base import ServiceHandler
-from agentpass.services.http import GenericHTTPService
+# Gateway-only modules (websockets, aiohttp, telegram, ...) are imported inside
+# run() and _load_plugin_service(): client commands never pay for them
+if TYPE_CHECKING:
+    import ssl
+
+    from agentpass.config import ServiceConfig, TLSConfig
+    from agentpass.db import Database
+    from agentpass.services.base import ServiceHandler
 
 logger = logging.getLogger("agentpass")
 
@@ -36,6 +30,8 @@ def _load_plugin_service(config: ServiceConfig) -> ServiceHandler:
     The handler_class field must be in "module.path:ClassName" format.
     The class receives (config, tools) as constructor arguments.
     """
+    from agentpass.config import ConfigError
+
     handler_class = config.handler_class
     if not handler_class:
         raise ConfigError(
@@ -68,10 +64,149 @@ def _load_plugin_service(config: ServiceConfig) -> ServiceHandler:
     return cls(config, config.tools)
 
 
-KNOWN_COMMANDS = {"serve", "request", "tools", "pending"}
+# Subcommand flags: flag -> (dest, converter); a None converter marks a store_true flag
+_SERVE_FLAGS = {
+    "--insecure": ("insecure", None),
+    "--config": ("config", str),
+    "--permissions": ("permissions", str),
+}
+_CLIENT_FLAGS = {
+    "--url": ("url", str),
+    "--token": ("token", str),
+    "--socket": ("socket", str),
+    "--low-latency": ("low_latency", None),
+}
+_FLAGS = {
+    "serve": _SERVE_FLAGS,
+    "request": {**_CLIENT_FLAGS, "--timeout": ("timeout", float)},
+    "tools": _CLIENT_FLAGS,
+    "pending": _CLIENT_FLAGS,
+    "daemon": _CLIENT_FLAGS,
+}
+
+KNOWN_COMMANDS = set(_FLAGS)
+
+
+def _defaults(command: str) -> dict[str, Any]:
+    """Default values for one subcommand (env vars are read at call time)."""
+    if command == "serve":
+        return {"insecure": False, "config": "config.yaml", "permissions": "permissions.yaml"}
+
+    defaults: dict[str, Any] = {
+        # None until _resolve_client_defaults(): it tells flags from env defaults
+        "url": None,
+        "token": None,
+        "socket": os.environ.get("AGENTPASS_SOCKET") or None,
+        "low_latency": False,
+    }
+    if command == "request":
+        defaults.update(args=[], timeout=900.0)
+    return defaults
+
+
+def _resolve_client_defaults(command: str, values: dict[str, Any]) -> None:
+    """Fill url/token from the environment and pick the daemon socket.
+
+    Client commands use a running daemon when its socket exists. The implicit
+    per-user socket is skipped when --url or --token is given: a gateway named
+    on the command line wins over whatever a background daemon connected to.
+    """
+    explicit_gateway = values["url"] is not None or values["token"] is not None
+    if values["url"] is None:
+        values["url"] = os.environ.get("AGENTPASS_URL", "")
+    if values["token"] is None:
+        values["token"] = os.environ.get("AGENT_TOKEN", "")
+    if values["socket"] is None and (command == "daemon" or not explicit_gateway):
+        from agentpass.daemon import default_socket_path
+
+        values["socket"] = default_socket_path()
+
+
+def _fast_parse(command: str, tokens: list[str]) -> dict[str, Any] | None:
+    """Parse the tokens after a subcommand, or return None to defer to argparse.
+
+    Covers exact flags followed by their value and contiguous positionals.
+    Anything else (--help, --flag=value, abbreviations, "--", values starting
+    with "-", bad numbers, missing positionals) goes to argparse, which either
+    parses it the same way or prints the usage error.
+    """
+    flags = _FLAGS[command]
+    values = _defaults(command)
+    positionals: list[str] = []
+    positionals_done = False
+    it = iter(tokens)
+    for token in it:
+        if not token.startswith("-"):
+            if positionals_done:
+                return None  # argparse only takes one run of positionals
+            positionals.append(token)
+            continue
+        positionals_done = bool(positionals)
+        spec = flags.get(token)
+        if spec is None:
+            return None
+        dest, convert = spec
+        if convert is None:
+            values[dest] = True
+            continue
+        value = next(it, None)
+        if value is None or value.startswith("-"):
+            return None
+        try:
+            values[dest] = convert(value)
+        except ValueError:
+            return None
+
+    if command == "request":
+        if not positionals:
+            return None
+        values["tool"], values["args"] = positionals[0], positionals[1:]
+    elif positionals:
+        return None
+    return values
+
+
+_CLIENT_HELP = {
+    "request": "Send a tool request",
+    "tools": "List available tools",
+    "pending": "Retrieve pending results",
+    "daemon": "Serve one gateway connection to client commands over a Unix socket",
+}
+
+
+def _argparse_parse(command: str, raw: list[str]) -> SimpleNamespace:
+    """Full argparse parser for one subcommand: help output and usage errors."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="agentpass: execution gateway for AI agents")
+    subparsers = parser.add_subparsers(dest="command")
+    if command == "serve":
+        sub = subparsers.add_parser("serve", help="Start the gateway server")
+        sub.add_argument("--insecure", action="store_true", help="Allow plaintext WS (no TLS)")
+        sub.add_argument("--config", help="Config file path")
+        sub.add_argument("--permissions", help="Permissions file path")
+    else:
+        sub = subparsers.add_parser(command, help=_CLIENT_HELP[command])
+        if command == "request":
+            sub.add_argument("tool", help="Tool name")
+            sub.add_argument("args", nargs="*", help="key=value arguments")
+            sub.add_argument("--timeout", type=float, help="Timeout in seconds")
+        sub.add_argument("--url", help="Gateway WebSocket URL")
+        sub.add_argument("--token", help="Agent token")
+        sub.add_argument("--socket", help="Daemon Unix socket path")
+        sub.add_argument(
+            "--low-latency",
+            action="store_true",
+            help="Busy-poll the gateway socket (Linux; burns CPU for lower latency)",
+        )
+    sub.set_defaults(**_defaults(command))
+    values = vars(parser.parse_args(raw))
+    if command != "serve":
+        _resolve_client_defaults(command, values)
+    return SimpleNamespace(**values)
 
 
-def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+def parse_args(argv: list[str] | None = None) -> SimpleNamespace:
     """Parse CLI arguments with subcommand routing.
 
     Subcommands:
@@ -79,75 +214,72 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         request   Send a one-shot tool request
         tools     List available tools
         pending   Retrieve pending results
+        daemon    Share one gateway connection with the other client commands
 
     Backward compat: if the first positional arg is not a known subcommand,
     'serve' is prepended automatically.
+
+    Well-formed command lines are parsed by hand; argparse is only imported
+    for --help and anything the fast path does not recognize.
     """
     raw = list(argv) if argv is not None else sys.argv[1:]
 
     # Backward compat: if no subcommand given, default to "serve"
-    first_positional = next((a for a in raw if not a.startswith("-")), None)
-    if first_positional not in KNOWN_COMMANDS:
+    command = next((a for a in raw if not a.startswith("-")), None)
+    if command not in KNOWN_COMMANDS:
+        command = "serve"
         raw = ["serve", *raw]
 
-    parser = argparse.ArgumentParser(description="agentpass: execution gateway for AI agents")
-    subparsers = parser.add_subparsers(dest="command")
+    values = _fast_parse(command, raw[1:]) if raw[0] == command else None
+    if values is None:
+        return _argparse_parse(command, raw)
+    if command != "serve":
+        _resolve_client_defaults(command, values)
+    return SimpleNamespace(command=command, **values)
 
-    # serve subcommand
-    serve_parser = subparsers.add_parser("serve", help="Start the gateway server")
-    serve_parser.add_argument("--insecure", action="store_true", help="Allow plaintext WS (no TLS)")
-    serve_parser.add_argument("--config", default="config.yaml", help="Config file path")
-    serve_parser.add_argument(
-        "--permissions", default="permissions.yaml", help="Permissions file path"
-    )
 
-    # request subcommand
-    request_parser = subparsers.add_parser("request", help="Send a tool request")
-    request_parser.add_argument("tool", help="Tool name")
-    request_parser.add_argument("args", nargs="*", default=[], help="key=value arguments")
-    request_parser.add_argument(
-        "--url",
-        default=os.environ.get("AGENTPASS_URL", ""),
-        help="Gateway WebSocket URL",
-    )
-    request_parser.add_argument(
-        "--token",
-        default=os.environ.get("AGENT_TOKEN", ""),
-        help="Agent token",
-    )
-    request_parser.add_argument("--timeout", type=float, default=900.0, help="Timeout in seconds")
-
-    # tools subcommand
-    tools_parser = subparsers.add_parser("tools", help="List available tools")
-    tools_parser.add_argument(
-        "--url",
-        default=os.environ.get("AGENTPASS_URL", ""),
-        help="Gateway WebSocket URL",
-    )
-    tools_parser.add_argument(
-        "--token",
-        default=os.environ.get("AGENT_TOKEN", ""),
-        help="Agent token",
-    )
+def _build_ssl_context(tls: TLSConfig) -> ssl.SSLContext:
+    """Build the server-side TLS context for the WebSocket listener.
 
-    # pending subcommand
-    pending_parser = subparsers.add_parser("pending", help="Retrieve pending results")
-    pending_parser.add_argument(
-        "--url",
-        default=os.environ.get("AGENTPASS_URL", ""),
-        help="Gateway WebSocket URL",
-    )
-    pending_parser.add_argument(
-        "--token",
-        default=os.environ.get("AGENT_TOKEN", ""),
-        help="Agent token",
-    )
+    TLS 1.3 only (one round trip per full handshake). ALPN is http/1.1
+    because WebSocket upgrades ride on HTTP/1.1. Renegotiation is refused.
+    """
+    import ssl
+
+    ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    ctx.minimum_version = ssl.TLSVersion.TLSv1_3
+    ctx.options |= ssl.OP_NO_COMPRESSION | ssl.OP_NO_RENEGOTIATION
+    ctx.set_alpn_protocols(["http/1.1"])
+    ctx.load_cert_chain(tls.cert, tls.key)
+    return ctx
 
-    return parser.parse_args(raw)
+
+async def _cleanup_stale(db: Database) -> None:
+    """Drop pending requests that expired before this process started."""
+    try:
+        stale = await db.cleanup_stale_requests()
+    except Exception:
+        logger.exception("Stale pending request cleanup failed")
+        return
+    if stale:
+        logger.info("Removed %d stale pending request(s)", len(stale))
 
 
-async def run(args: argparse.Namespace) -> None:
+async def run(args: SimpleNamespace) -> None:
     """Main async entrypoint -- orchestrates all components."""
+    import websockets.asyncio.server
+    from aiohttp import web
+
+    from agentpass.config import load_config, load_permissions
+    from agentpass.dashboard import setup_dashboard
+    from agentpass.db import Database
+    from agentpass.engine import PermissionEngine
+    from agentpass.executor import Executor
+    from agentpass.messenger.telegram import TelegramAdapter
+    from agentpass.registry import build_registry
+    from agentpass.server import GatewayServer
+    from agentpass.services.http import GenericHTTPService, close_shared_connector
+
     # 1. Load config
     config = load_config(args.config)
     permissions = load_permissions(args.permissions)
@@ -156,6 +288,8 @@ async def run(args: argparse.Namespace) -> None:
     if not args.insecure and config.gateway.tls is None:
         logger.error("TLS not configured. Use --insecure to allow plaintext WS.")
         sys.exit(1)
+    # Built before anything starts, so a bad cert/key fails fast
+    ssl_ctx = _build_ssl_context(config.gateway.tls) if config.gateway.tls else None
 
     # 3. Signal handling
     stop_event = asyncio.Event()
@@ -166,7 +300,10 @@ async def run(args: argparse.Namespace) -> None:
     # 4. Initialize database
     db = Database(config.storage.path)
     await db.initialize()
-    await db.cleanup_stale_requests()
+    # Leftovers from a previous run; the gateway does not wait for them. At
+    # runtime pending rows are owned by the gateway (offline results must
+    # outlive expires_at), so there is no periodic sweep.
+    cleanup_task = asyncio.create_task(_cleanup_stale(db))
 
     # 5. Build registry from all service tool definitions
     registry = build_registry(config.services)
@@ -178,9 +315,16 @@ async def run(args: argparse.Namespace) -> None:
             service = _load_plugin_service(svc_config)
         else:
             service = GenericHTTPService(svc_config)
-        if not await service.health_check():
-            logger.warning("Service '%s' unreachable — continuing anyway", name)
+        await service.start()
         services[name] = service
+    healthy = await asyncio.gather(
+        *(service.health_check() for service in services.values()), return_exceptions=True
+    )
+    for name, ok in zip(services, healthy, strict=True):
+        if isinstance(ok, Exception):
+            logger.warning("Service '%s' health check failed — continuing anyway: %s", name, ok)
+        elif not ok:
+            logger.warning("Service '%s' unreachable — continuing anyway", name)
 
     executor = Executor(services, registry)
 
@@ -214,13 +358,7 @@ async def run(args: argparse.Namespace) -> None:
         await ptb_app.start()
         await ptb_app.updater.start_polling()
 
-        # 11. SSL context
-        ssl_ctx = None
-        if config.gateway.tls:
-            ssl_ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
-            ssl_ctx.load_cert_chain(config.gateway.tls.cert, config.gateway.tls.key)
-
-        # 12. Start health HTTP server
+        # 11. Start health HTTP server
         async def _health_handler(request: web.Request) -> web.Response:
             try:
                 status = await gateway.health_status()
@@ -247,7 +385,7 @@ async def run(args: argparse.Namespace) -> None:
         await health_site.start()
         logger.info("Health/dashboard on http://%s:%d", health_host, health_port)
 
-        # 13. Start WebSocket server
+        # 12. Start WebSocket server
         async with websockets.asyncio.server.serve(
             gateway.handle_connection,
             config.gateway.host,
@@ -263,7 +401,7 @@ async def run(args: argparse.Namespace) -> None:
             )
             await stop_event.wait()
 
-        # 14. Graceful shutdown
+        # 13. Graceful shutdown
         logger.info("Shutting down...")
         await health_runner.cleanup()
         await gateway.resolve_all_pending("gateway_shutdown")
@@ -273,6 +411,8 @@ async def run(args: argparse.Namespace) -> None:
 
     for svc in services.values():
         await svc.close()
+    await close_shared_connector()
+    await cleanup_task
     await db.close()
     logger.info("agentpass stopped")
 
@@ -288,25 +428,32 @@ def main(argv: list[str] | None = None) -> None:
     args = parse_args(argv)
 
     if args.command == "serve":
+        from agentpass.config import ConfigError
+
         try:
             asyncio.run(run(args))
         except ConfigError as e:
             logger.error("Configuration error: %s", e)
             sys.exit(1)
     elif args.command == "request":
-        from agentpass.cli import run_request
+        from agentpass.cli import run_client_command, run_request
 
-        exit_code = asyncio.run(run_request(args))
+        exit_code = run_client_command(run_request(args))
         sys.exit(exit_code)
     elif args.command == "tools":
-        from agentpass.cli import run_tools
+        from agentpass.cli import run_client_command, run_tools
 
-        exit_code = asyncio.run(run_tools(args))
+        exit_code = run_client_command(run_tools(args))
         sys.exit(exit_code)
     elif args.command == "pending":
-        from agentpass.cli import run_pending
+        from agentpass.cli import run_client_command, run_pending
+
+        exit_code = run_client_command(run_pending(args))
+        sys.exit(exit_code)
+    elif args.command == "daemon":
+        from agentpass.cli import run_client_command, run_daemon
 
-        exit_code = asyncio.run(run_pending(args))
+        exit_code = run_client_command(run_daemon(args))
         sys.exit(exit_code)
 
 
@@ -3,9 +3,20 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import contextlib
+import os
+import signal
 import sys
-from argparse import Namespace
+from collections.abc import Coroutine
+from types import SimpleNamespace
+from typing import Any
+
+import orjson
+
+try:
+    import uvloop
+except ImportError:  # optional speedup: pip install agentpass[speedups]
+    uvloop = None
 
 from agentpass.client import (
     AgentPassClient,
@@ -14,6 +25,7 @@ from agentpass.client import (
     AgentPassError,
     AgentPassTimeout,
 )
+from agentpass.daemon import DaemonClient, DaemonRunningError, daemon_available, serve_daemon
 
 # Exit codes
 EXIT_SUCCESS = 0
@@ -23,6 +35,46 @@ EXIT_CONNECTION_ERROR = 3
 EXIT_INVALID_ARGS = 4
 
 
+def run_client_command(coro: Coroutine[Any, Any, int]) -> int:
+    """Run a client subcommand to completion, on uvloop when it is installed."""
+    loop_factory = uvloop.new_event_loop if uvloop is not None else None
+    return asyncio.run(coro, loop_factory=loop_factory)
+
+
+def _print_json(obj: Any) -> None:
+    """Write obj to stdout as indented JSON, as UTF-8 bytes when stdout has a buffer."""
+    data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        sys.stdout.write(data.decode())
+        return
+    sys.stdout.flush()  # keep ordering with anything already printed as text
+    buffer.write(data)
+    buffer.flush()
+
+
+async def _open_client(args: SimpleNamespace) -> AgentPassClient | DaemonClient | None:
+    """Pick a client: a daemon that answers on its socket, else a direct connection.
+
+    A socket file whose daemon was killed refuses connections; the command
+    then connects directly instead of failing. Prints an error and returns None
+    if a direct connection lacks url or token.
+    """
+    socket_path = getattr(args, "socket", None)
+    if socket_path and daemon_available(socket_path):
+        with contextlib.suppress(OSError):
+            return await DaemonClient(socket_path).connect()
+
+    if not args.url:
+        print("Error: Gateway URL required (--url or AGENTPASS_URL)", file=sys.stderr)
+        return None
+    if not args.token:
+        print("Error: Agent token required (--token or AGENT_TOKEN)", file=sys.stderr)
+        return None
+    low_latency = getattr(args, "low_latency", False)
+    return AgentPassClient(args.url, args.token, max_retries=0, low_latency=low_latency)
+
+
 def parse_key_value_args(raw_args: list[str]) -> dict[str, str]:
     """Parse a list of 'key=value' strings into a dict.
 
@@ -30,46 +82,40 @@ def parse_key_value_args(raw_args: list[str]) -> dict[str, str]:
     """
     result: dict[str, str] = {}
     for item in raw_args:
-        if "=" not in item:
-            raise ValueError(f"Invalid argument format (expected key=value): {item!r}")
-        key, _, value = item.partition("=")
-        if not key:
+        i = item.find("=")
+        if i <= 0:
+            # One find() covers both errors: -1 = no "=", 0 = empty key
+            if i < 0:
+                raise ValueError(f"Invalid argument format (expected key=value): {item!r}")
             raise ValueError(f"Empty key in argument: {item!r}")
-        result[key] = value
+        result[item[:i]] = item[i + 1 :]
     return result
 
 
-async def run_request(args: Namespace) -> int:
+async def run_request(args: SimpleNamespace) -> int:
     """Execute a one-shot tool request via the gateway.
 
     Returns exit code (0=success, 1=denied, 2=timeout, 3=connection, 4=invalid args).
     """
-    url = args.url
-    token = args.token
     tool = args.tool
     timeout = args.timeout
 
-    if not url:
-        print("Error: Gateway URL required (--url or AGENTPASS_URL)", file=sys.stderr)
-        return EXIT_CONNECTION_ERROR
-    if not token:
-        print("Error: Agent token required (--token or AGENT_TOKEN)", file=sys.stderr)
-        return EXIT_CONNECTION_ERROR
-
-    # Parse key=value arguments
+    # Parse key=value arguments (before connecting, so nothing is left open)
     try:
         tool_args = parse_key_value_args(args.args)
     except ValueError as e:
         print(f"Error: {e}", file=sys.stderr)
         return EXIT_INVALID_ARGS
 
+    client = await _open_client(args)
+    if client is None:
+        return EXIT_CONNECTION_ERROR
+
     try:
-        async with AgentPassClient(url, token, max_retries=0) as client:
-            result = await asyncio.wait_for(
-                client.tool_request(tool, **tool_args),
-                timeout=timeout,
-            )
-        print(json.dumps(result, indent=2))
+        async with client:
+            async with asyncio.timeout(timeout):
+                result = await client.tool_request(tool, **tool_args)
+        _print_json(result)
         return EXIT_SUCCESS
 
     except AgentPassDenied as e:
@@ -92,23 +138,17 @@ async def run_request(args: Namespace) -> int:
         return EXIT_CONNECTION_ERROR
 
 
-async def run_tools(args: Namespace) -> int:
+async def run_tools(args: SimpleNamespace) -> int:
     """List available tools from the gateway. Returns exit code."""
-    url = args.url
-    token = args.token
-
-    if not url:
-        print("Error: Gateway URL required (--url or AGENTPASS_URL)", file=sys.stderr)
-        return EXIT_CONNECTION_ERROR
-    if not token:
-        print("Error: Agent token required (--token or AGENT_TOKEN)", file=sys.stderr)
+    client = await _open_client(args)
+    if client is None:
         return EXIT_CONNECTION_ERROR
 
     try:
-        async with AgentPassClient(url, token, max_retries=0) as client:
+        async with client:
             tools = await client.list_tools()
 
-        print(json.dumps(tools, indent=2))
+        _print_json(tools)
         return EXIT_SUCCESS
 
     except AgentPassConnectionError as e:
@@ -125,22 +165,16 @@ async def run_tools(args: Namespace) -> int:
         return EXIT_TIMEOUT
 
 
-async def run_pending(args: Namespace) -> int:
+async def run_pending(args: SimpleNamespace) -> int:
     """Retrieve pending results from the gateway. Returns exit code."""
-    url = args.url
-    token = args.token
-
-    if not url:
-        print("Error: Gateway URL required (--url or AGENTPASS_URL)", file=sys.stderr)
-        return EXIT_CONNECTION_ERROR
-    if not token:
-        print("Error: Agent token required (--token or AGENT_TOKEN)", file=sys.stderr)
+    client = await _open_client(args)
+    if client is None:
         return EXIT_CONNECTION_ERROR
 
     try:
-        async with AgentPassClient(url, token, max_retries=0) as client:
+        async with client:
             results = await client.get_pending_results()
-        print(json.dumps(results, indent=2))
+        _print_json(results)
         return EXIT_SUCCESS
 
     except AgentPassConnectionError as e:
@@ -155,3 +189,40 @@ async def run_pending(args: Namespace) -> int:
     except OSError as e:
         print(f"Error: Connection failed: {e}", file=sys.stderr)
         return EXIT_CONNECTION_ERROR
+
+
+async def run_daemon(args: SimpleNamespace) -> int:
+    """Hold one gateway connection open and serve it on a Unix socket until signalled."""
+    if not args.url:
+        print("Error: Gateway URL required (--url or AGENTPASS_URL)", file=sys.stderr)
+        return EXIT_CONNECTION_ERROR
+    if not args.token:
+        print("Error: Agent token required (--token or AGENT_TOKEN)", file=sys.stderr)
+        return EXIT_CONNECTION_ERROR
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    try:
+        async with AgentPassClient(args.url, args.token, low_latency=args.low_latency) as client:
+            server = await serve_daemon(client, args.socket)
+            # The socket is ours from here on; never remove one this process didn't bind
+            try:
+                print(f"agentpass daemon listening on {args.socket}", file=sys.stderr)
+                async with server:
+                    await stop_event.wait()
+            finally:
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(args.socket)
+    except DaemonRunningError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_CONNECTION_ERROR
+    except AgentPassConnectionError as e:
+        print(f"Error: Connection failed ({e.code}): {e.message}", file=sys.stderr)
+        return EXIT_CONNECTION_ERROR
+    except OSError as e:
+        print(f"Error: Connection failed: {e}", file=sys.stderr)
+        return EXIT_CONNECTION_ERROR
+    return EXIT_SUCCESS
@@ -4,8 +4,11 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
-import json
+import socket
+import sys
+from typing import Any
 
+import orjson
 import websockets
 
 # ---------------------------------------------------------------------------
@@ -34,6 +37,61 @@ class AgentPassConnectionError(AgentPassError):
     """Connection or authentication failure."""
 
 
+# Gateway error code -> exception class; anything else raises AgentPassError
+_ERR_CLS: dict[int, type[AgentPassError]] = {
+    -32001: AgentPassDenied,
+    -32003: AgentPassDenied,
+    -32002: AgentPassTimeout,
+}
+
+
+# ---------------------------------------------------------------------------
+# Transport settings and pre-encoded JSON-RPC envelopes
+# ---------------------------------------------------------------------------
+
+# JSON-RPC frames are small and already validated by the parser, so compression
+# only costs CPU. Large pending-results payloads still fit under 4 MiB.
+_CONNECT_OPTIONS: dict[str, Any] = {"compression": None, "max_size": 2**22}
+
+_SEND_QUEUE_SIZE = 1024  # outbound frames buffered before send() applies backpressure
+_SEND_BATCH_MAX = 32  # frames drained per writer wakeup (and max JSON-RPC batch size)
+_READ_YIELD_EVERY = 32  # buffered frames handled before the reader yields to the loop
+
+# low_latency: busy-poll the socket for this many microseconds before sleeping.
+# Linux only; the socket module does not export the constant (value from asm-generic).
+_SO_BUSY_POLL = getattr(socket, "SO_BUSY_POLL", 46)
+_BUSY_POLL_USEC = 50
+
+# Constant envelope prefixes -- the id goes first so every frame is
+# prefix + id + params; only the id (and tool/args) are spliced in per call.
+_TOOL_REQUEST_PREFIX = b'{"jsonrpc":"2.0","method":"tool_request","id":'
+_LIST_TOOLS_PREFIX = b'{"jsonrpc":"2.0","method":"list_tools","id":'
+_GET_PENDING_RESULTS_PREFIX = b'{"jsonrpc":"2.0","method":"get_pending_results","id":'
+_EMPTY_PARAMS = b',"params":{}}'
+_AUTH_PREFIX = b'{"jsonrpc":"2.0","method":"auth","params":{"token":'
+# id 0 is reserved for auth: _next_id() starts at 1, so every frame carries an int id
+_AUTH_SUFFIX = b'},"id":0}'
+
+
+def _norm_id(request_id: Any) -> Any:
+    """Map a digit-string id back to the int we sent; other values pass through."""
+    if type(request_id) is int:
+        return request_id
+    if isinstance(request_id, str) and request_id.isdigit():
+        return int(request_id)
+    return request_id
+
+
+def _encode_frame(prefix: bytes, request_id: int, params: bytes = _EMPTY_PARAMS) -> bytes:
+    """Complete a pre-encoded envelope prefix ending in ``"id":``."""
+    return b"%s%d%s" % (prefix, request_id, params)
+
+
+def _encode_tool_params(tool: str, args: dict) -> bytes:
+    """Encode tool_request params; only tool name and args go through the encoder."""
+    return b',"params":{"tool":%s,"args":%s}}' % (orjson.dumps(tool), orjson.dumps(args))
+
+
 # ---------------------------------------------------------------------------
 # AgentPassClient
 # ---------------------------------------------------------------------------
@@ -54,94 +112,56 @@ class AgentPassClient:
         token: str,
         *,
         max_retries: int | None = None,
+        batch_requests: bool = False,
+        low_latency: bool = False,
     ) -> None:
         self.url = url
         self.token = token
+        # Token is fixed for the client's lifetime; encode the auth frame once
+        self._auth_frame = _AUTH_PREFIX + orjson.dumps(token) + _AUTH_SUFFIX
         self._max_retries = max_retries
+        self._batch_requests = batch_requests  # needs a gateway that accepts batch arrays
+        self._low_latency = low_latency  # busy polling trades CPU for response latency
         self._ws: websockets.WebSocketClientProtocol | None = None
         self._request_counter = 0
-        self._pending: dict[int, asyncio.Future] = {}  # request_id -> Future
+        # request_id -> Future. Small ints hash to themselves, so the C dict already
+        # behaves as a direct-indexed table; a Python-level ring buffer would be slower.
+        self._pending: dict[int, asyncio.Future] = {}
+        self._send_queue: asyncio.Queue[tuple[int, bytes]] = asyncio.Queue(maxsize=_SEND_QUEUE_SIZE)
         self._reader_task: asyncio.Task | None = None
+        self._writer_task: asyncio.Task | None = None
         self._reconnect_task: asyncio.Task | None = None
         self._connected = asyncio.Event()
         self._closed = False
+        self._loop: asyncio.AbstractEventLoop | None = None  # bound in connect()
 
     # -- public API ----------------------------------------------------------
 
     async def connect(self) -> None:
         """Connect to gateway and authenticate."""
-        self._ws = await websockets.connect(self.url)
+        self._loop = asyncio.get_running_loop()
+        self._ws = await websockets.connect(self.url, **_CONNECT_OPTIONS)
+        if self._low_latency:
+            self._tune_socket()
         await self._authenticate()
         self._connected.set()
         self._reader_task = asyncio.create_task(self._read_loop())
+        self._writer_task = asyncio.create_task(self._write_loop())
 
     async def tool_request(self, tool: str, **args: object) -> dict:
         """Send tool request, await result. Raises typed errors."""
-        request_id = self._next_id()
-        future: asyncio.Future = asyncio.get_running_loop().create_future()
-        self._pending[request_id] = future
-
-        # Wait for connection if currently reconnecting
-        if not self._connected.is_set():
-            await self._connected.wait()
-        if self._closed:
-            raise AgentPassConnectionError(-1, "Client is closed")
-
-        await self._ws.send(
-            json.dumps(
-                {
-                    "jsonrpc": "2.0",
-                    "method": "tool_request",
-                    "params": {"tool": tool, "args": args},
-                    "id": request_id,
-                }
-            )
-        )
-
-        result = await future
+        result = await self._call(_TOOL_REQUEST_PREFIX, _encode_tool_params(tool, args))
         return result.get("data")
 
     async def list_tools(self, timeout: float = 10) -> list:
         """Retrieve available tools from the gateway."""
-        request_id = self._next_id()
-        future: asyncio.Future = asyncio.get_running_loop().create_future()
-        self._pending[request_id] = future
-
-        if not self._connected.is_set():
-            await self._connected.wait()
-
-        await self._ws.send(
-            json.dumps(
-                {
-                    "jsonrpc": "2.0",
-                    "method": "list_tools",
-                    "params": {},
-                    "id": request_id,
-                }
-            )
-        )
-
-        result = await asyncio.wait_for(future, timeout=timeout)
+        async with asyncio.timeout(timeout):
+            result = await self._call(_LIST_TOOLS_PREFIX)
         return result.get("tools", [])
 
     async def get_pending_results(self) -> list:
         """Retrieve results for requests resolved while disconnected."""
-        request_id = self._next_id()
-        future: asyncio.Future = asyncio.get_running_loop().create_future()
-        self._pending[request_id] = future
-
-        await self._ws.send(
-            json.dumps(
-                {
-                    "jsonrpc": "2.0",
-                    "method": "get_pending_results",
-                    "params": {},
-                    "id": request_id,
-                }
-            )
-        )
-
-        response = await future
+        response = await self._call(_GET_PENDING_RESULTS_PREFIX)
         results = response.get("results", [])
         self._resolve_offline_results(results)
         return results
@@ -154,6 +174,10 @@ class AgentPassClient:
             self._reader_task.cancel()
             with contextlib.suppress(asyncio.CancelledError):
                 await self._reader_task
+        if self._writer_task is not None and not self._writer_task.done():
+            self._writer_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._writer_task
         if self._reconnect_task is not None and not self._reconnect_task.done():
             self._reconnect_task.cancel()
             with contextlib.suppress(asyncio.CancelledError):
@@ -177,20 +201,93 @@ class AgentPassClient:
         self._request_counter += 1
         return self._request_counter
 
+    def _new_request(self) -> tuple[int, asyncio.Future]:
+        """Allocate a request id and register a fresh future for it."""
+        request_id = self._next_id()
+        future = self._loop.create_future()
+        self._pending[request_id] = future
+        return request_id, future
+
+    async def _call(self, prefix: bytes, params: bytes = _EMPTY_PARAMS) -> Any:
+        """Send one request and await its result.
+
+        Waits out a reconnect before queueing; raises if the client is closed.
+        """
+        request_id, future = self._new_request()
+
+        if not self._connected.is_set():
+            await self._connected.wait()
+        if self._closed:
+            self._pending.pop(request_id, None)
+            raise AgentPassConnectionError(-1, "Client is closed")
+
+        await self._send(request_id, _encode_frame(prefix, request_id, params))
+        return await future
+
+    async def _send(self, request_id: int, frame: bytes) -> None:
+        """Queue a frame for the writer task."""
+        await self._send_queue.put((request_id, frame))
+
+    async def _write_loop(self) -> None:
+        """Background task: drain the send queue and write frames to the socket.
+
+        Frames queued while reconnecting are held until the connection is back.
+        With ``batch_requests`` enabled, frames drained together are sent as one
+        JSON-RPC batch array. A failed send fails the pending futures it carried.
+        """
+        queue = self._send_queue
+        try:
+            while True:
+                batch = [await queue.get()]
+                while len(batch) < _SEND_BATCH_MAX and not queue.empty():
+                    batch.append(queue.get_nowait())
+
+                if self._batch_requests and len(batch) > 1:
+                    units = [
+                        (
+                            [request_id for request_id, _ in batch],
+                            b"[%s]" % b",".join(frame for _, frame in batch),
+                        )
+                    ]
+                else:
+                    units = [([request_id], frame) for request_id, frame in batch]
+
+                if not self._connected.is_set():
+                    await self._connected.wait()
+                for request_ids, frame in units:
+                    try:
+                        await self._ws.send(frame)
+                    except websockets.exceptions.ConnectionClosed:
+                        for request_id in request_ids:
+                            future = self._pending.pop(request_id, None)
+                            if future is not None and not future.done():
+                                future.set_exception(
+                                    AgentPassConnectionError(-1, "Connection lost")
+                                )
+        except asyncio.CancelledError:
+            pass
+
+    def _tune_socket(self) -> None:
+        """Enable TCP_NODELAY and SO_BUSY_POLL on the underlying socket, best effort.
+
+        Raising SO_BUSY_POLL above net.core.busy_read needs CAP_NET_ADMIN; without it
+        (or off Linux) the option is silently left alone.
+        """
+        transport = getattr(self._ws, "transport", None)
+        sock = transport.get_extra_info("socket") if transport is not None else None
+        if sock is None:
+            return
+        with contextlib.suppress(OSError):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if sys.platform == "linux":
+            with contextlib.suppress(OSError):
+                sock.setsockopt(socket.SOL_SOCKET, _SO_BUSY_POLL, _BUSY_POLL_USEC)
+
     async def _authenticate(self) -> None:
         """Send auth, validate response."""
-        await self._ws.send(
-            json.dumps(
-                {
-                    "jsonrpc": "2.0",
-                    "method": "auth",
-                    "params": {"token": self.token},
-                    "id": "auth-1",
-                }
-            )
-        )
+        await self._ws.send(self._auth_frame)
         raw = await self._ws.recv()
-        msg = json.loads(raw)
+        msg = orjson.loads(raw)
         if "error" in msg:
             err = msg["error"]
             raise AgentPassConnectionError(
@@ -203,37 +300,31 @@ class AgentPassClient:
 
     async def _read_loop(self) -> None:
         """Background task: read responses and dispatch to pending futures."""
+        loads = orjson.loads
+        dispatch = self._dispatch_response
+        recv = self._ws.recv
+        handled = 0
         try:
-            async for raw in self._ws:
+            while True:
+                # recv() returns without suspending while frames are buffered, so a
+                # burst is drained in this loop; yield periodically so writers run.
+                raw = await recv(decode=False)
+                handled += 1
+                if handled % _READ_YIELD_EVERY == 0:
+                    await asyncio.sleep(0)
                 try:
-                    msg = json.loads(raw)
-                except json.JSONDecodeError:
+                    msg = loads(raw)
+                except orjson.JSONDecodeError:
                     continue  # Skip malformed messages
-
-                msg_id = msg.get("id")
-                if msg_id is None:
-                    continue
-
-                # Convert string IDs back to int for matching
-                if isinstance(msg_id, str) and msg_id.isdigit():
-                    msg_id = int(msg_id)
-
-                future = self._pending.pop(msg_id, None)
-                if future is None or future.done():
-                    continue
-
-                if "error" in msg:
-                    err = msg["error"]
-                    code = err.get("code", -1)
-                    message = err.get("message", "Unknown error")
-                    if code in (-32001, -32003):
-                        future.set_exception(AgentPassDenied(code, message))
-                    elif code == -32002:
-                        future.set_exception(AgentPassTimeout(code, message))
-                    else:
-                        future.set_exception(AgentPassError(code, message))
-                else:
-                    future.set_result(msg.get("result", {}))
+                if type(msg) is dict:
+                    dispatch(msg)
+                elif type(msg) is list:
+                    # Batch response: each element is its own envelope
+                    for item in msg:
+                        if type(item) is dict:
+                            dispatch(item)
+        except websockets.exceptions.ConnectionClosedOK:
+            pass  # Clean close: same as the end of `async for` over the connection
         except websockets.exceptions.ConnectionClosed:
             if not self._closed:
                 self._connected.clear()
@@ -241,47 +332,70 @@ class AgentPassClient:
         except asyncio.CancelledError:
             pass
 
+    def _dispatch_response(self, msg: dict) -> None:
+        """Resolve the pending future matching one response envelope."""
+        msg_id = msg.get("id")
+        if type(msg_id) is not int:
+            # Slow path: we only send int ids, but tolerate stringified echoes
+            if msg_id is None:
+                return
+            msg_id = _norm_id(msg_id)
+
+        future = self._pending.pop(msg_id, None)
+        if future is None or future.done():
+            return
+
+        err = msg.get("error")
+        if err is not None:
+            code = err.get("code", -1)
+            cls = _ERR_CLS.get(code, AgentPassError)
+            future.set_exception(cls(code, err.get("message", "Unknown error")))
+        else:
+            future.set_result(msg.get("result", {}))
+
     def _resolve_offline_results(self, results: list) -> None:
         """Resolve pending futures whose request_id appears in offline results."""
+        # Pass 1: decode the rows we are waiting on. The server returns raw DB rows
+        # where "result" is a JSON string; request_ids are normalised to int when
+        # numeric. Rows with no pending future are skipped before their JSON is parsed.
+        loads = orjson.loads
+        pending = self._pending
+        parsed_items: list[tuple[int | str, dict]] = []
         for item in results:
             rid = item.get("request_id")
             if rid is None:
                 continue
-
-            # The server returns raw DB rows where "result" is a JSON string
-            result_str = item.get("result")
-            if isinstance(result_str, str):
+            rid = _norm_id(rid)
+            if rid not in pending:
+                continue
+            parsed = item.get("result")
+            if isinstance(parsed, str):
                 try:
-                    parsed = json.loads(result_str)
-                except json.JSONDecodeError:
+                    parsed = loads(parsed)
+                except orjson.JSONDecodeError:
                     continue
-            elif isinstance(result_str, dict):
-                parsed = result_str
-            else:
+            if not isinstance(parsed, dict):
                 continue
+            parsed_items.append((rid, parsed))
 
+        # Pass 2: one pending lookup per row
+        pending_pop = pending.pop
+        for rid, parsed in parsed_items:
+            future = pending_pop(rid, None)
+            if future is None or future.done():
+                continue
             status = parsed.get("status")
             data = parsed.get("data")
-
-            # Try both string and int forms of the request_id
-            for key in (
-                rid,
-                int(rid) if isinstance(rid, str) and rid.isdigit() else rid,
-            ):
-                future = self._pending.pop(key, None)
-                if future is not None and not future.done():
-                    if status == "executed":
-                        future.set_result(data)
-                    elif status == "denied":
-                        future.set_exception(
-                            AgentPassDenied(-32001, data if isinstance(data, str) else "Denied")
-                        )
-                    elif status == "error":
-                        future.set_exception(
-                            AgentPassError(
-                                -32004, data if isinstance(data, str) else "Execution failed"
-                            )
-                        )
+            if status == "executed":
+                future.set_result(data)
+            elif status == "denied":
+                future.set_exception(
+                    AgentPassDenied(-32001, data if isinstance(data, str) else "Denied")
+                )
+            elif status == "error":
+                future.set_exception(
+                    AgentPassError(-32004, data if isinstance(data, str) else "Execution failed")
+                )
 
     async def _backoff_sleep(self, delay: float) -> None:
         """Sleep for the given delay. Override in tests to skip real waits."""
@@ -307,7 +421,9 @@ class AgentPassClient:
                 await self._backoff_sleep(delay)
                 if self._closed:
                     return
-                self._ws = await websockets.connect(self.url)
+                self._ws = await websockets.connect(self.url, **_CONNECT_OPTIONS)
+                if self._low_latency:
+                    self._tune_socket()
                 await self._authenticate()
                 self._connected.set()
                 # Auto-fetch pending results
@@ -327,18 +443,9 @@ class AgentPassClient:
         if not self._pending:
             return
         request_id = self._next_id()
-        await self._ws.send(
-            json.dumps(
-                {
-                    "jsonrpc": "2.0",
-                    "method": "get_pending_results",
-                    "params": {},
-                    "id": request_id,
-                }
-            )
-        )
+        await self._ws.send(_encode_frame(_GET_PENDING_RESULTS_PREFIX, request_id))
         raw = await self._ws.recv()
-        msg = json.loads(raw)
+        msg = orjson.loads(raw)
         if "error" not in msg:
             results = msg.get("result", {}).get("results", [])
             self._resolve_offline_results(results)
@@ -2,14 +2,26 @@
 
 from __future__ import annotations
 
+import contextlib
+import functools
+import glob
+import hashlib
+import mmap
 import os
 import re
+import sys
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+import orjson
 import yaml
 
+try:
+    from yaml import CSafeLoader as _YAML_LOADER
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YAML_LOADER
+
 
 class ConfigError(Exception):
     """Raised on configuration loading or validation errors."""
@@ -29,31 +41,46 @@ def _replacer(match: re.Match) -> str:
 
 
 def substitute_env_vars(obj: Any) -> Any:
-    """Recursively substitute ${VAR} in all string values."""
+    """Substitute ${VAR} in all string values of a parsed tree.
+
+    Dicts and lists are updated in place (and returned); strings without "${"
+    are left untouched, so unchanged subtrees allocate nothing.
+    """
     if isinstance(obj, str):
-        return _ENV_VAR_RE.sub(_replacer, obj)
-    if isinstance(obj, dict):
-        return {k: substitute_env_vars(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [substitute_env_vars(item) for item in obj]
+        return _ENV_VAR_RE.sub(_replacer, obj) if "${" in obj else obj
+    if not isinstance(obj, (dict, list)):
+        return obj
+
+    stack: list[dict | list] = [obj]
+    while stack:
+        node = stack.pop()
+        items = node.items() if isinstance(node, dict) else enumerate(node)
+        for key, value in items:
+            if isinstance(value, str):
+                if "${" in value:
+                    node[key] = _ENV_VAR_RE.sub(_replacer, value)
+            elif isinstance(value, (dict, list)):
+                stack.append(value)
     return obj
 
 
 def substitute_env_vars_in_text(text: str) -> str:
     """Substitute ${VAR} in raw text before YAML parsing."""
+    if "${" not in text:
+        return text  # Common case: one memchr-speed scan, no regex pass
     return _ENV_VAR_RE.sub(_replacer, text)
 
 
 # --- Config dataclasses ---
 
 
-@dataclass
+@dataclass(slots=True)
 class TLSConfig:
     cert: str
     key: str
 
 
-@dataclass
+@dataclass(slots=True)
 class GatewayConfig:
     host: str
     port: int
@@ -62,37 +89,37 @@ class GatewayConfig:
     health_host: str = "127.0.0.1"
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentConfig:
     token: str
 
 
-@dataclass
+@dataclass(slots=True)
 class TelegramConfig:
     token: str
     chat_id: int
     allowed_users: list[int]
 
 
-@dataclass
+@dataclass(slots=True)
 class MessengerConfig:
     type: str
     telegram: TelegramConfig | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class StorageConfig:
     type: str
     path: str
 
 
-@dataclass
+@dataclass(slots=True)
 class RateLimitConfig:
     max_pending_approvals: int = 10
     max_requests_per_minute: int = 60
 
 
-@dataclass
+@dataclass(slots=True)
 class Config:
     gateway: GatewayConfig
     agent: AgentConfig
@@ -106,25 +133,25 @@ class Config:
 # --- Tool / Service dataclasses (extensible tools) ---
 
 
-@dataclass
+@dataclass(slots=True)
 class ArgDefinition:
     required: bool = False
     validate: str | None = None  # regex pattern string
 
 
-@dataclass
+@dataclass(slots=True)
 class RequestDefinition:
     method: str  # GET, POST, PUT, DELETE, PATCH
     path: str  # "/api/states/{entity_id}"
     body_exclude: list[str] | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ResponseDefinition:
     wrap: str | None = None  # wrap response in {wrap: data}
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolDefinition:
     name: str
     service_name: str
@@ -135,7 +162,7 @@ class ToolDefinition:
     response: ResponseDefinition | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class AuthConfig:
     type: str  # bearer, header, query, basic
     token: str = ""
@@ -145,20 +172,20 @@ class AuthConfig:
     password: str = ""  # for type=basic
 
 
-@dataclass
+@dataclass(slots=True)
 class HealthCheckConfig:
     method: str = "GET"
     path: str = "/"
     expect_status: int = 200
 
 
-@dataclass
+@dataclass(slots=True)
 class ErrorMapping:
     status: int
     message: str  # supports {status}, {body} templates
 
 
-@dataclass
+@dataclass(slots=True)
 class ServiceConfig:
     name: str
     url: str
@@ -174,14 +201,14 @@ class ServiceConfig:
 # --- Permission dataclasses ---
 
 
-@dataclass
+@dataclass(slots=True)
 class PermissionRule:
     pattern: str
     action: str
     description: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class Permissions:
     defaults: list[PermissionRule]
     rules: list[PermissionRule]
@@ -197,6 +224,11 @@ def _require(data: dict, key: str, context: str) -> Any:
     return data[key]
 
 
+def _intern(value: Any) -> Any:
+    """Intern identifier-like strings so lookups and compares can short-circuit on identity."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
 def _coerce_int(value: Any, field_name: str) -> int:
     """Coerce a value to int (handles env-substituted strings)."""
     try:
@@ -205,6 +237,94 @@ def _coerce_int(value: Any, field_name: str) -> int:
         raise ConfigError(f"Cannot convert {field_name} to int: {value!r}") from None
 
 
+# Below this size a plain read() beats mapping the file
+_MMAP_MIN_SIZE = 4096
+
+
+def _write_yaml_cache(path: Path, cache_path: Path, raw: Any) -> None:
+    """Write parsed YAML as JSON next to its source; best effort, never raises."""
+    try:
+        data = orjson.dumps(raw)
+    except TypeError:
+        return  # e.g. non-string mapping keys
+    if orjson.loads(data) != raw:
+        return  # JSON would change the value (e.g. YAML dates become strings)
+
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, cache_path)
+        _remove_yaml_caches(path, keep=cache_path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            tmp_path.unlink(missing_ok=True)
+
+
+def _remove_yaml_caches(path: Path, keep: Path | None = None) -> None:
+    """Delete JSON caches of path other than keep."""
+    for stale in path.parent.glob(f".{glob.escape(path.name)}.*.json"):
+        if stale != keep:
+            stale.unlink(missing_ok=True)
+
+
+def _read_yaml_text(path: Path) -> tuple[str, bool]:
+    """Read a YAML file with ${VAR} substitution applied.
+
+    Returns (text, cacheable): text that referenced env vars is not cacheable,
+    since a cache would write the substituted values, often secrets, to disk.
+    Files from _MMAP_MIN_SIZE up are decoded straight from a read-only mmap of
+    the page cache; smaller ones take one read(), where mmap setup would dominate.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < _MMAP_MIN_SIZE:
+            text = f.read().decode()
+        else:
+            with (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+                memoryview(mm) as view,
+            ):
+                text = str(view, "utf-8")
+    return substitute_env_vars_in_text(text), "${" not in text
+
+
+def _parse_yaml(path: Path, text: str, cacheable: bool) -> Any:
+    """Parse substituted YAML text, reusing a JSON cache when fresh.
+
+    The cache is a hidden ``.<name>.<digest>.json`` file next to the source,
+    keyed by a digest of the text. Files that are not *cacheable* are parsed
+    directly, and caches left from earlier versions of them are removed.
+    """
+    if not cacheable:
+        with contextlib.suppress(OSError):
+            _remove_yaml_caches(path)
+        return yaml.load(text, Loader=_YAML_LOADER)
+
+    digest = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+    cache_path = path.with_name(f".{path.name}.{digest}.json")
+    try:
+        return orjson.loads(cache_path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        pass
+
+    raw = yaml.load(text, Loader=_YAML_LOADER)
+    _write_yaml_cache(path, cache_path, raw)
+    return raw
+
+
+def _load_yaml(path: Path) -> Any:
+    """Read and parse a YAML file with ${VAR} substitution; never cached on disk."""
+    text, _ = _read_yaml_text(path)
+    return _parse_yaml(path, text, cacheable=False)
+
+
+def clear_load_caches() -> None:
+    """Drop memoized permissions and tools files (e.g. between tests)."""
+    _build_permissions.cache_clear()
+    _build_tools.cache_clear()
+
+
 # --- Loaders ---
 
 
@@ -214,8 +334,8 @@ def load_config(path: str = "config.yaml") -> Config:
     if not p.exists():
         raise ConfigError(f"Config file not found: {path}")
 
-    with open(p) as f:
-        raw = yaml.safe_load(substitute_env_vars_in_text(f.read()))
+    # config.yaml holds credentials even without ${VAR}: no JSON cache for it
+    raw = _load_yaml(p)
 
     # Gateway
     gw_raw = _require(raw, "gateway", "")
@@ -249,7 +369,7 @@ def load_config(path: str = "config.yaml") -> Config:
 
     # Messenger
     msg_raw = _require(raw, "messenger", "")
-    msg_type = _require(msg_raw, "type", "messenger")
+    msg_type = _intern(_require(msg_raw, "type", "messenger"))
     if msg_type != "telegram":
         raise ConfigError(
             f"Unsupported messenger type: {msg_type!r} (only 'telegram' is supported)"
@@ -276,13 +396,14 @@ def load_config(path: str = "config.yaml") -> Config:
     svc_raw = _require(raw, "services", "")
     services: dict[str, ServiceConfig] = {}
     for svc_name, svc_data in svc_raw.items():
+        svc_name = _intern(svc_name)
         if not isinstance(svc_data, dict):
             raise ConfigError(f"Service '{svc_name}' must be a mapping")
         url = _require(svc_data, "url", f"services.{svc_name}")
 
         # Parse auth
         auth_raw = _require(svc_data, "auth", f"services.{svc_name}")
-        auth_type = _require(auth_raw, "type", f"services.{svc_name}.auth")
+        auth_type = _intern(_require(auth_raw, "type", f"services.{svc_name}.auth"))
         auth = AuthConfig(
             type=auth_type,
             token=auth_raw.get("token", ""),
@@ -383,14 +504,20 @@ def load_permissions(path: str = "permissions.yaml") -> Permissions:
     if not p.exists():
         raise ConfigError(f"Permissions file not found: {path}")
 
-    with open(p) as f:
-        raw = yaml.safe_load(substitute_env_vars_in_text(f.read()))
+    return _build_permissions(p, *_read_yaml_text(p))
+
+
+# Memoized on the substituted text, so a changed file or env var is a cache miss.
+# Results are shared between callers and must be treated as read-only.
+@functools.lru_cache(maxsize=32)
+def _build_permissions(p: Path, text: str, cacheable: bool) -> Permissions:
+    raw = _parse_yaml(p, text, cacheable)
 
     _VALID_ACTIONS = {"allow", "deny", "ask"}
 
     defaults = []
     for item in raw.get("defaults", []):
-        action = item["action"]
+        action = _intern(item["action"])
         if action not in _VALID_ACTIONS:
             raise ConfigError(f"Invalid permission action: {action!r} (must be allow/deny/ask)")
         defaults.append(
@@ -403,7 +530,7 @@ def load_permissions(path: str = "permissions.yaml") -> Permissions:
 
     rules = []
     for item in raw.get("rules", []) or []:
-        action = item["action"]
+        action = _intern(item["action"])
         if action not in _VALID_ACTIONS:
             raise ConfigError(f"Invalid permission action: {action!r} (must be allow/deny/ask)")
         rules.append(
@@ -421,7 +548,7 @@ def load_tools_file(path: str, service_name: str) -> list[ToolDefinition]:
     """Load and parse a tools YAML file, returning typed ToolDefinition objects.
 
     - Reads YAML file
-    - Runs substitute_env_vars() on it
+    - Substitutes ${VAR} references in the raw text
     - Validates each tool entry
     - Compiles validation regexes at load time (raise ConfigError if invalid)
     - Returns list of ToolDefinition objects
@@ -430,18 +557,28 @@ def load_tools_file(path: str, service_name: str) -> list[ToolDefinition]:
     if not p.exists():
         raise ConfigError(f"Tools file not found: {path}")
 
-    with open(p) as f:
-        raw = yaml.safe_load(substitute_env_vars_in_text(f.read()))
+    # Fresh list per call; the ToolDefinitions inside are shared and read-only
+    text, cacheable = _read_yaml_text(p)
+    return list(_build_tools(p, text, cacheable, service_name))
+
+
+@functools.lru_cache(maxsize=32)
+def _build_tools(
+    p: Path, text: str, cacheable: bool, service_name: str
+) -> tuple[ToolDefinition, ...]:
+    raw = _parse_yaml(p, text, cacheable)
 
     if raw is None:
-        return []
+        return ()
 
     tools_raw = raw.get("tools")
     if not tools_raw:
-        return []
+        return ()
 
+    service_name = _intern(service_name)
     result: list[ToolDefinition] = []
     for tool_name, tool_data in tools_raw.items():
+        tool_name = _intern(tool_name)
         if tool_data is None:
             tool_data = {}
 
@@ -494,4 +631,4 @@ def load_tools_file(path: str, service_name: str) -> list[ToolDefinition]:
             )
         )
 
-    return result
+    return tuple(result)
@@ -0,0 +1,255 @@
+"""Local sidecar daemon -- shares one gateway connection across CLI invocations.
+
+``agentpass daemon`` keeps an authenticated AgentPassClient open and serves it on a
+Unix socket. CLI commands that find the socket forward their call as one JSON line
+instead of opening (and authenticating) a fresh WebSocket per invocation.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import stat
+import tempfile
+from typing import Any
+
+import orjson
+
+from agentpass.client import (
+    AgentPassClient,
+    AgentPassConnectionError,
+    AgentPassDenied,
+    AgentPassError,
+    AgentPassTimeout,
+)
+
+# Pending-results payloads can be large; match the client's WebSocket max_size.
+_LINE_LIMIT = 2**22
+
+# Error "type" on the wire -> exception raised by DaemonClient
+_ERROR_TYPES: dict[str, type[AgentPassError]] = {
+    "denied": AgentPassDenied,
+    "timeout": AgentPassTimeout,
+    "connection": AgentPassConnectionError,
+    "error": AgentPassError,
+}
+
+
+def default_socket_path() -> str:
+    """Per-user socket path: $XDG_RUNTIME_DIR if set, else the temp dir."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"agentpass-{os.getuid()}.sock")
+
+
+def daemon_available(path: str) -> bool:
+    """True if path is a Unix socket owned by the current user."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+
+
+# ---------------------------------------------------------------------------
+# Client side (used by CLI commands)
+# ---------------------------------------------------------------------------
+
+
+class DaemonClient:
+    """Drop-in for AgentPassClient that forwards calls to a running daemon.
+
+    Raises the same AgentPassError subclasses as AgentPassClient.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def connect(self) -> DaemonClient:
+        """Connect to the daemon socket (no-op if already connected).
+
+        Raises OSError if nothing accepts on the socket, e.g. one left behind by
+        a killed daemon.
+        """
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_unix_connection(
+                self.path, limit=_LINE_LIMIT
+            )
+        return self
+
+    async def __aenter__(self) -> DaemonClient:
+        return await self.connect()
+
+    async def __aexit__(self, *exc: object) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            with contextlib.suppress(OSError):
+                await self._writer.wait_closed()
+
+    async def tool_request(self, tool: str, **kwargs: Any) -> Any:
+        """Send a tool request through the daemon."""
+        return await self._call("tool_request", {"tool": tool, "args": kwargs})
+
+    async def list_tools(self, timeout: float = 30.0) -> list:
+        """List tools through the daemon."""
+        async with asyncio.timeout(timeout):
+            return await self._call("list_tools", {})
+
+    async def get_pending_results(self) -> list:
+        """Retrieve pending results through the daemon."""
+        return await self._call("get_pending_results", {})
+
+    async def _call(self, method: str, params: dict) -> Any:
+        frame = orjson.dumps({"method": method, "params": params}, option=orjson.OPT_APPEND_NEWLINE)
+        self._writer.write(frame)
+        await self._writer.drain()
+
+        line = await self._reader.readline()
+        if not line:
+            raise AgentPassConnectionError(-1, "Daemon closed the connection")
+        msg = orjson.loads(line)
+        err = msg.get("error")
+        if err is not None:
+            if err.get("type") == "client_timeout":
+                raise TimeoutError(err.get("message", "Timed out"))
+            exc_cls = _ERROR_TYPES.get(err.get("type"), AgentPassError)
+            raise exc_cls(err.get("code", -1), err.get("message", "Unknown error"))
+        return msg.get("result")
+
+
+# ---------------------------------------------------------------------------
+# Daemon side
+# ---------------------------------------------------------------------------
+
+
+def _error(kind: str, code: int, message: str) -> dict:
+    return {"error": {"type": kind, "code": code, "message": message}}
+
+
+async def _handle_call(client: AgentPassClient, line: bytes, undelivered: list[dict]) -> dict:
+    """Run one forwarded call against the shared client; never raises.
+
+    get_pending_results also returns (and drains) undelivered: results the
+    daemon got for CLI callers that had disconnected by then.
+    """
+    try:
+        msg = orjson.loads(line)
+        method = msg["method"]
+        params = msg.get("params") or {}
+        if method == "tool_request":
+            result = await client.tool_request(params["tool"], **params.get("args", {}))
+        elif method == "list_tools":
+            result = await client.list_tools()
+        elif method == "get_pending_results":
+            result = [*undelivered, *await client.get_pending_results()]
+            undelivered.clear()
+        else:
+            return _error("error", -32601, f"Unknown method: {method}")
+    except AgentPassDenied as e:
+        return _error("denied", e.code, e.message)
+    except AgentPassTimeout as e:
+        return _error("timeout", e.code, e.message)
+    except AgentPassConnectionError as e:
+        return _error("connection", e.code, e.message)
+    except AgentPassError as e:
+        return _error("error", e.code, e.message)
+    except TimeoutError:
+        return _error("client_timeout", -1, "Timed out waiting for gateway")
+    except (orjson.JSONDecodeError, KeyError, TypeError, AttributeError):
+        return _error("error", -32600, "Invalid request")
+    return {"result": result}
+
+
+# Error "type" -> offline result status, as the gateway stores them for requests
+# resolved while the agent was disconnected
+_UNDELIVERED_STATUS = {"denied": "denied", "timeout": "denied", "error": "error"}
+
+
+def _keep_undelivered(undelivered: list[dict], line: bytes, response: dict) -> None:
+    """Hold on to a response whose CLI caller disconnected before it was written.
+
+    The daemon's own gateway connection stayed up, so the gateway stored no
+    offline result; without this an approved (and executed) request would be
+    lost. Tool results are kept in the gateway's offline result row format
+    (args and result as JSON text); undelivered pending results are put back.
+    """
+    error = response.get("error")
+    if error is not None and error.get("code") == -32600:
+        return  # invalid request: nothing was forwarded
+    msg = orjson.loads(line)
+    method = msg["method"]
+    if method == "get_pending_results":
+        undelivered[:0] = response.get("result") or []
+        return
+    if method != "tool_request":
+        return  # list_tools and unknown methods are safe to repeat
+    if error is None:
+        stored = {"status": "executed", "data": response.get("result")}
+    elif error.get("type") in _UNDELIVERED_STATUS:
+        stored = {"status": _UNDELIVERED_STATUS[error["type"]], "data": error.get("message")}
+    else:
+        return  # never reached the gateway, or no decision was made
+    params = msg["params"]
+    undelivered.append(
+        {
+            "tool_name": params["tool"],
+            "args": orjson.dumps(params.get("args", {})).decode(),
+            "result": orjson.dumps(stored, option=orjson.OPT_NON_STR_KEYS).decode(),
+        }
+    )
+
+
+class DaemonRunningError(OSError):
+    """Raised by serve_daemon when a live daemon already answers on the socket."""
+
+
+async def _socket_in_use(path: str) -> bool:
+    """True if something accepts connections on the Unix socket at path."""
+    try:
+        _, writer = await asyncio.open_unix_connection(path)
+    except OSError:
+        return False  # missing, not a socket, or nobody listening (stale)
+    writer.close()
+    with contextlib.suppress(OSError):
+        await writer.wait_closed()
+    return True
+
+
+async def serve_daemon(client: AgentPassClient, path: str) -> asyncio.Server:
+    """Serve client on a Unix socket at path (mode 0600). Replaces a stale socket.
+
+    Raises DaemonRunningError instead of taking over a socket a live daemon
+    still listens on.
+    """
+
+    undelivered: list[dict] = []  # shared by all connections
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                response = await _handle_call(client, line, undelivered)
+                # A CLI that timed out or was interrupted while waiting has
+                # closed its end by now; its result is kept for `pending`
+                if reader.at_eof():
+                    _keep_undelivered(undelivered, line, response)
+                    break
+                writer.write(orjson.dumps(response, option=orjson.OPT_APPEND_NEWLINE))
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    _keep_undelivered(undelivered, line, response)
+                    raise
+        except (ConnectionError, ValueError):
+            pass  # Peer went away, or a line exceeded _LINE_LIMIT
+        finally:
+            writer.close()
+
+    if await _socket_in_use(path):
+        raise DaemonRunningError(f"A daemon is already listening on {path}")
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
+    server = await asyncio.start_unix_server(handle, path, limit=_LINE_LIMIT)
+    os.chmod(path, 0o600)
+    return server
@@ -2,24 +2,58 @@
 
 from __future__ import annotations
 
+import calendar
+import contextlib
 import logging
+import math
+import time
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 from urllib.parse import urlencode
 
 import jinja2
+import orjson
 from aiohttp import web
 
 from agentpass.db import Database
 
+if TYPE_CHECKING:
+    import sqlite3
+
 logger = logging.getLogger("agentpass.dashboard")
 
 _db_key = web.AppKey("db", Database)
-_jinja2_key = web.AppKey("jinja2_env", jinja2.Environment)
+_audit_template_key = web.AppKey("audit_template", jinja2.Template)
 
 _TEMPLATE_DIR = Path(__file__).parent / "templates"
 
+# Bytes of encoded entries buffered between writes of a streamed API response
+_STREAM_CHUNK = 64 * 1024
+
+
+def _parse_iso(value: str) -> float:
+    """Parse a naive ISO datetime as UTC epoch seconds.
+
+    The <input type="datetime-local"> forms "YYYY-MM-DDTHH:MM[:SS]" are sliced
+    directly; anything else goes through datetime.fromisoformat().
+    """
+    seconds = len(value) == 19 and value[16] == ":"
+    if (len(value) == 16 or seconds) and value[4] + value[7] + value[10] + value[13] == "--T:":
+        parts = (value[:4], value[5:7], value[8:10], value[11:13], value[14:16], value[17:] or "00")
+        if all(part.isascii() and part.isdigit() for part in parts):
+            year, month, day, hour, minute, second = map(int, parts)
+            if (
+                year
+                and 1 <= month <= 12
+                and 1 <= day <= calendar.monthrange(year, month)[1]
+                and hour < 24
+                and minute < 60
+                and second < 60
+            ):
+                return float(calendar.timegm((year, month, day, hour, minute, second)))
+    return datetime.fromisoformat(value).replace(tzinfo=UTC).timestamp()
+
 
 def _parse_filters(request: web.Request) -> dict[str, Any]:
     """Extract filter params from query string."""
@@ -34,17 +68,11 @@ def _parse_filters(request: web.Request) -> dict[str, Any]:
         filters["resolution"] = params["resolution"]
 
     if params.get("from"):
-        try:
-            dt = datetime.fromisoformat(params["from"]).replace(tzinfo=UTC)
-            filters["from_ts"] = dt.timestamp()
-        except ValueError:
-            pass
+        with contextlib.suppress(ValueError):
+            filters["from_ts"] = _parse_iso(params["from"])
     if params.get("to"):
-        try:
-            dt = datetime.fromisoformat(params["to"]).replace(tzinfo=UTC)
-            filters["to_ts"] = dt.timestamp()
-        except ValueError:
-            pass
+        with contextlib.suppress(ValueError):
+            filters["to_ts"] = _parse_iso(params["to"])
 
     try:
         filters["per_page"] = max(1, min(200, int(params.get("per_page", 50))))
@@ -56,47 +84,119 @@ def _parse_filters(request: web.Request) -> dict[str, Any]:
     except ValueError:
         filters["page"] = 1
 
+    # Seek cursor "<timestamp>:<row_id>" from a previous page's next_cursor
+    if params.get("cursor"):
+        ts, _, row_id = params["cursor"].partition(":")
+        try:
+            cursor = (float(ts), int(row_id))
+        except ValueError:
+            cursor = None
+        if cursor is not None and math.isfinite(cursor[0]):
+            filters["cursor"] = cursor
+
     return filters
 
 
-def _entry_to_dict(entry: Any) -> dict[str, Any]:
-    """Convert an AuditEntry to a JSON-serializable dict."""
+def _next_cursor(last: tuple[float, int] | None, count: int, per_page: int) -> str | None:
+    """Cursor for the page after one ending at *last*, or None if this is the last page."""
+    if last is None or count < per_page:
+        return None
+    return f"{last[0]}:{last[1]}"
+
+
+def _pop_paging(filters: dict[str, Any]) -> tuple[int, int, tuple[float, int] | None, int]:
+    """Pop (per_page, page, cursor, offset) out of *filters*."""
+    per_page = filters.pop("per_page")
+    page = filters.pop("page")
+    cursor = filters.pop("cursor", None)
+    offset = 0 if cursor else (page - 1) * per_page
+    return per_page, page, cursor, offset
+
+
+def _page_info(
+    total: int, page: int, per_page: int, last: tuple[float, int] | None, count: int
+) -> dict[str, Any]:
+    """Paging fields returned alongside one page of entries."""
+    return {
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "pages": max(1, (total + per_page - 1) // per_page),
+        "next_cursor": _next_cursor(last, count, per_page),
+    }
+
+
+async def _fetch_page(db: Database, filters: dict[str, Any]) -> dict[str, Any]:
+    """Run the filtered query for one page; pops paging keys out of *filters*."""
+    per_page, page, cursor, offset = _pop_paging(filters)
+    entries, total = await db.get_audit_log_filtered(
+        limit=per_page, offset=offset, cursor=cursor, **filters
+    )
+    last = (entries[-1].timestamp, entries[-1].row_id) if entries else None
+    return {"entries": entries, **_page_info(total, page, per_page, last, len(entries))}
+
+
+def _row_to_dict(row: sqlite3.Row) -> dict[str, Any]:
+    """Convert a raw audit_log row to a dict for orjson.
+
+    The JSON columns are embedded as stored (orjson.Fragment), so they are
+    never parsed just to be serialized again.
+    """
+    result = row["execution_result"]
     return {
-        "request_id": entry.request_id,
-        "timestamp": entry.timestamp,
-        "tool_name": entry.tool_name,
-        "args": entry.args,
-        "signature": entry.signature,
-        "decision": entry.decision,
-        "resolution": entry.resolution,
-        "resolved_by": entry.resolved_by,
-        "resolved_at": entry.resolved_at,
-        "execution_result": entry.execution_result,
-        "agent_id": entry.agent_id,
+        "request_id": row["request_id"],
+        "timestamp": row["timestamp"],
+        "tool_name": row["tool_name"],
+        "args": orjson.Fragment(row["args"]),
+        "signature": row["signature"],
+        "decision": row["decision"],
+        "resolution": row["resolution"],
+        "resolved_by": row["resolved_by"],
+        "resolved_at": row["resolved_at"],
+        "execution_result": orjson.Fragment(result) if result else None,
+        "agent_id": row["agent_id"],
     }
 
 
-async def handle_api_log(request: web.Request) -> web.Response:
-    """GET /audit/api/log — JSON audit log with filtering and pagination."""
+async def handle_api_log(request: web.Request) -> web.StreamResponse:
+    """GET /audit/api/log — JSON audit log with filtering and pagination.
+
+    Entries are encoded one by one and streamed in _STREAM_CHUNK pieces, so no
+    list of entry dicts or whole-body buffer is built for large pages.
+    """
     db: Database = request.app[_db_key]
     filters = _parse_filters(request)
-    per_page = filters.pop("per_page")
-    page = filters.pop("page")
-    offset = (page - 1) * per_page
-
-    entries, total = await db.get_audit_log_filtered(limit=per_page, offset=offset, **filters)
-    pages = max(1, (total + per_page - 1) // per_page)
-
-    return web.json_response(
-        {
-            "entries": [_entry_to_dict(e) for e in entries],
-            "total": total,
-            "page": page,
-            "per_page": per_page,
-            "pages": pages,
-        }
+    per_page, page, cursor, offset = _pop_paging(filters)
+    rows, total = await db.iter_audit_rows_filtered(
+        limit=per_page, offset=offset, cursor=cursor, **filters
     )
 
+    resp = web.StreamResponse()
+    resp.content_type = "application/json"
+    buf = bytearray(b'{"entries":[')
+    last = None
+    count = 0
+    try:
+        await resp.prepare(request)
+        # Rows are encoded and written while the reader fetches the next batch
+        async for row in rows:
+            if count:
+                buf += b","
+            buf += orjson.dumps(_row_to_dict(row))
+            last = (row["timestamp"], row["id"])
+            count += 1
+            if len(buf) >= _STREAM_CHUNK:
+                await resp.write(buf)
+                buf = bytearray()
+    finally:
+        await rows.aclose()
+    # Close the array, then the paging fields: the metadata object minus its "{"
+    buf += b"],"
+    buf += orjson.dumps(_page_info(total, page, per_page, last, count))[1:]
+    await resp.write(buf)
+    await resp.write_eof()
+    return resp
+
 
 async def handle_api_stats(request: web.Request) -> web.Response:
     """GET /audit/api/stats — summary statistics."""
@@ -108,14 +208,8 @@ async def handle_api_stats(request: web.Request) -> web.Response:
 async def handle_audit_page(request: web.Request) -> web.Response:
     """GET /audit/ — HTML dashboard page."""
     db: Database = request.app[_db_key]
-    env: jinja2.Environment = request.app[_jinja2_key]
     filters = _parse_filters(request)
-    per_page = filters.pop("per_page")
-    page = filters.pop("page")
-    offset = (page - 1) * per_page
-
-    entries, total = await db.get_audit_log_filtered(limit=per_page, offset=offset, **filters)
-    pages = max(1, (total + per_page - 1) // per_page)
+    result = await _fetch_page(db, filters)
     stats = await db.get_audit_stats()
 
     tool_names = await db.get_distinct_tool_names()
@@ -127,13 +221,8 @@ async def handle_audit_page(request: web.Request) -> web.Response:
         params = {k: v for k, v in {**raw_params, **overrides}.items() if v}
         return urlencode(params)
 
-    template = env.get_template("audit.html")
-    html = template.render(
-        entries=entries,
-        total=total,
-        page=page,
-        per_page=per_page,
-        pages=pages,
+    html = request.app[_audit_template_key].render(
+        **result,
         stats=stats,
         tool_names=tool_names,
         filters=filters,
@@ -144,9 +233,12 @@ async def handle_audit_page(request: web.Request) -> web.Response:
 
 def _format_ts(epoch: float) -> str:
     """Format an epoch timestamp as a human-readable string."""
+    if epoch is None:  # time.gmtime(None) would format the current time
+        return str(epoch)
     try:
-        return datetime.fromtimestamp(epoch, tz=UTC).strftime("%Y-%m-%d %H:%M:%S")
-    except (TypeError, ValueError, OSError):
+        # C strftime on a struct_time beats %-formatting or an f-string over its fields
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(epoch))
+    except (TypeError, ValueError, OverflowError, OSError):
         return str(epoch)
 
 
@@ -154,12 +246,17 @@ def setup_dashboard(app: web.Application, db: Database) -> None:
     """Register dashboard routes on an aiohttp Application."""
     app[_db_key] = db
 
+    # Templates ship with the package: compile once here, no per-request
+    # lookup or mtime check. The bytecode cache (a private per-user temp dir)
+    # lets later starts skip compiling.
     env = jinja2.Environment(
         loader=jinja2.FileSystemLoader(str(_TEMPLATE_DIR)),
         autoescape=True,
+        auto_reload=False,
+        bytecode_cache=jinja2.FileSystemBytecodeCache(),
     )
     env.filters["format_ts"] = _format_ts
-    app[_jinja2_key] = env
+    app[_audit_template_key] = env.get_template("audit.html")
 
     app.router.add_get("/audit/", handle_audit_page)
     app.router.add_get("/audit/api/log", handle_api_log)
@@ -2,21 +2,30 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
+import contextlib
+import functools
+import itertools
+import logging
 import os
+import sqlite3
 import stat
-from datetime import UTC, datetime
+import time
+from collections.abc import AsyncIterator, Sequence
 from pathlib import Path
 from typing import Any
 
 import aiosqlite
+import orjson
 
 from agentpass.models import AuditEntry
 
+logger = logging.getLogger(__name__)
+
 _SCHEMA = """\
 CREATE TABLE IF NOT EXISTS audit_log (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
-    timestamp TEXT NOT NULL,
+    timestamp REAL NOT NULL,
     request_id TEXT NOT NULL,
     tool_name TEXT NOT NULL,
     args TEXT NOT NULL,
@@ -24,7 +33,7 @@ CREATE TABLE IF NOT EXISTS audit_log (
     decision TEXT NOT NULL,
     resolution TEXT,
     resolved_by TEXT,
-    resolved_at TEXT,
+    resolved_at REAL,
     execution_result TEXT,
     agent_id TEXT DEFAULT 'default'
 );
@@ -37,19 +46,177 @@ CREATE TABLE IF NOT EXISTS pending_requests (
     message_id TEXT,
     chat_id INTEGER,
     result TEXT,
-    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now')),
-    expires_at TEXT NOT NULL
+    created_at REAL NOT NULL DEFAULT ((julianday('now') - 2440587.5) * 86400.0),
+    expires_at REAL NOT NULL
 );
 
-CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_log(timestamp);
-CREATE INDEX IF NOT EXISTS idx_audit_tool ON audit_log(tool_name);
+-- Dashboard filters + ORDER BY timestamp DESC, id DESC: each index serves one
+-- equality filter (or none) as a backward range scan with no sort step
+CREATE INDEX IF NOT EXISTS idx_audit_ts_id ON audit_log(timestamp DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_audit_tool_ts ON audit_log(tool_name, timestamp DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_audit_decision_ts ON audit_log(decision, timestamp DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_audit_res_ts ON audit_log(resolution, timestamp DESC, id DESC);
+-- Superseded by the composites above (same leading column)
+DROP INDEX IF EXISTS idx_audit_timestamp;
+DROP INDEX IF EXISTS idx_audit_tool;
 CREATE INDEX IF NOT EXISTS idx_pending_expires ON pending_requests(expires_at);
+-- get_completed_results(): only rows holding an offline result, usually none
+CREATE INDEX IF NOT EXISTS idx_pending_completed ON pending_requests(request_id)
+    WHERE result IS NOT NULL;
+"""
+
+# Stored in PRAGMA user_version once _SCHEMA has been applied; bump it whenever
+# _SCHEMA changes so existing databases pick the change up on next start
+_SCHEMA_VERSION = 2
+
+# DELETE ... RETURNING needs SQLite 3.35; older system libraries select first
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+# One-shot rewrite of databases created when timestamps were ISO 8601 TEXT: a
+# TEXT column's affinity would store bound floats as text, so the tables are
+# rebuilt with the current schema and the old values converted to epoch seconds
+_AUDIT_COLUMNS = """id, timestamp, request_id, tool_name, args, signature, decision,
+    resolution, resolved_by, resolved_at, execution_result, agent_id"""
+_PENDING_COLUMNS = """request_id, tool_name, args, signature, message_id, chat_id, result,
+    created_at, expires_at"""
+_MIGRATE_ISO_TIMESTAMPS = f"""\
+BEGIN;
+ALTER TABLE audit_log RENAME TO audit_log_iso;
+ALTER TABLE pending_requests RENAME TO pending_requests_iso;
+-- Index names follow the renamed tables; free them for the new ones
+DROP INDEX IF EXISTS idx_audit_ts_id;
+DROP INDEX IF EXISTS idx_audit_tool_ts;
+DROP INDEX IF EXISTS idx_audit_decision_ts;
+DROP INDEX IF EXISTS idx_audit_res_ts;
+DROP INDEX IF EXISTS idx_pending_expires;
+{_SCHEMA}
+INSERT INTO audit_log ({_AUDIT_COLUMNS})
+SELECT id, CAST(strftime('%s', timestamp) AS REAL), request_id, tool_name, args, signature,
+       decision, resolution, resolved_by, CAST(strftime('%s', resolved_at) AS REAL),
+       execution_result, agent_id
+  FROM audit_log_iso;
+INSERT INTO pending_requests ({_PENDING_COLUMNS})
+SELECT request_id, tool_name, args, signature, message_id, chat_id, result,
+       CAST(strftime('%s', created_at) AS REAL), CAST(strftime('%s', expires_at) AS REAL)
+  FROM pending_requests_iso;
+DROP TABLE audit_log_iso;
+DROP TABLE pending_requests_iso;
+COMMIT;
+"""
+
+# Per-connection cache settings, for the writer and every pooled reader. Busy
+# waits come from aiosqlite.connect()'s timeout (5 s), not PRAGMA busy_timeout.
+_CONNECTION_PRAGMAS = """\
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;
+PRAGMA cache_size=-20000;
 """
 
+# WAL with synchronous=NORMAL: commits append to the WAL without an fsync each
+_PRAGMAS = f"""\
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+{_CONNECTION_PRAGMAS}PRAGMA analysis_limit=1000;
+"""
 
-def _epoch_to_iso(epoch: float) -> str:
-    """Convert epoch float to ISO 8601 string."""
-    return datetime.fromtimestamp(epoch, tz=UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+_INSERT_AUDIT = """INSERT INTO audit_log
+   (timestamp, request_id, tool_name, args, signature, decision,
+    resolution, resolved_by, resolved_at, execution_result, agent_id)
+   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+# Read-only connections for dashboard queries; each aiosqlite connection has its
+# own thread, and WAL lets them read while the writer commits
+_READ_POOL_SIZE = 4
+
+# sqlite3 keeps prepared statements per connection, keyed by SQL text (default
+# 128). The 64 filter shapes alone need 128 (count + page), plus the fixed queries
+_STATEMENT_CACHE = 256
+
+# Audit rows are group-committed: one executemany + commit per window. A plain
+# list drained by an on-demand flusher task, not an asyncio.Queue worker: reads
+# can flush it inline (read-your-writes) and no task idles between bursts
+_AUDIT_FLUSH_DELAY = 0.01  # seconds
+_AUDIT_BATCH_MAX = 256
+
+# delete_pending()/update_pending_result() calls are coalesced the same way.
+# Direct writes (insert_pending(), update_audit_resolution(), ...) take both
+# queues into their own transaction, so a request's writes share one commit.
+_PENDING_FLUSH_DELAY = 0.005  # seconds
+
+# Distinct tool names change rarely; log_audit() drops the cache on a new name
+_TOOL_NAMES_TTL = 60.0  # seconds
+
+
+_STATS_QUERY = """\
+SELECT 's', NULL, SUM(timestamp >= ?),
+       SUM(decision = 'ask' AND resolution = 'approved')
+  FROM audit_log
+UNION ALL
+SELECT 'd', decision, COUNT(*), NULL FROM audit_log GROUP BY decision
+UNION ALL
+SELECT 't', tool_name, cnt, NULL FROM (
+    SELECT tool_name, COUNT(*) AS cnt FROM audit_log
+     WHERE tool_name != '' GROUP BY tool_name ORDER BY cnt DESC LIMIT 10
+)"""
+
+
+# audit_log columns in AuditEntry field order (id last, as row_id), so rows map
+# onto entries by position without dict conversion or per-column lookups
+_AUDIT_ENTRY_COLUMNS = """request_id, timestamp, tool_name, args, signature, decision,
+    resolution, resolved_by, resolved_at, execution_result, agent_id, id"""
+
+# One predicate per get_audit_log_filtered() filter, in argument order
+_AUDIT_FILTERS = (
+    "tool_name = ?",
+    "decision = ?",
+    "resolution = ?",
+    "timestamp >= ?",
+    "timestamp <= ?",
+)
+
+
+@functools.cache
+def _audit_filter_sql(present: tuple[bool, ...], seek: bool) -> tuple[str, str]:
+    """(count_sql, page_sql) for one combination of filters; at most 64 shapes.
+
+    Identical SQL text for every call of a shape keeps sqlite3's per-connection
+    statement cache hitting instead of re-preparing each query.
+    """
+    conditions = [c for c, p in zip(_AUDIT_FILTERS, present, strict=True) if p]
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    count_sql = f"SELECT COUNT(*) FROM audit_log {where}"
+    if seek:
+        conditions.append("(timestamp, id) < (?, ?)")
+        where = f"WHERE {' AND '.join(conditions)}"
+    page_sql = (
+        f"SELECT {_AUDIT_ENTRY_COLUMNS} FROM audit_log {where}"
+        " ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?"
+    )
+    return count_sql, page_sql
+
+
+def dumps_json(obj: Any) -> bytes:
+    """Encode JSON as UTF-8 bytes; service results may use non-str dict keys."""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+
+# Rows fetched per hop to a connection's thread while iterating a cursor
+_FETCH_BATCH = 64
+
+
+async def _iter_rows(cursor: aiosqlite.Cursor) -> AsyncIterator[aiosqlite.Row]:
+    """Yield a cursor's rows in _FETCH_BATCH batches, then close it.
+
+    Rows are processed while SQLite produces the next batch, and at most one
+    batch is held in memory (fetchall() would build the whole result first).
+    """
+    cursor.arraysize = _FETCH_BATCH
+    try:
+        async for row in cursor:
+            yield row
+    finally:
+        await cursor.close()
 
 
 class Database:
@@ -58,40 +225,103 @@ class Database:
     def __init__(self, path: str) -> None:
         self._path = path
         self._conn: aiosqlite.Connection | None = None
+        self._readers: list[aiosqlite.Connection] = []
+        self._reader_turn = itertools.count()
+        self._audit_rows: list[tuple] = []
+        self._audit_flusher: asyncio.Task | None = None
+        self._write_lock = asyncio.Lock()  # one batch transaction at a time
+        self._pending_writes: list[tuple[str, tuple]] = []
+        self._pending_flusher: asyncio.Task | None = None
+        self._tool_names_cache: tuple[float, list[str]] | None = None
 
     async def initialize(self) -> None:
         """Create schema, open persistent connection, and set file permissions."""
         Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+        # Create the file 0600 up front: SQLite gives the -wal/-shm files its mode
+        with contextlib.suppress(FileExistsError):
+            os.close(os.open(self._path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600))
 
-        self._conn = await aiosqlite.connect(self._path)
+        self._conn = await aiosqlite.connect(self._path, cached_statements=_STATEMENT_CACHE)
         self._conn.row_factory = aiosqlite.Row
-        await self._conn.executescript(_SCHEMA)
+        await self._conn.executescript(_PRAGMAS)
+        cursor = await self._conn.execute("PRAGMA user_version")
+        if (await cursor.fetchone())[0] != _SCHEMA_VERSION:
+            await self._migrate_iso_timestamps()
+            await self._conn.executescript(_SCHEMA)
+            await self._conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        await self._analyze_once()
         await self._conn.commit()
 
         # Set file permissions to 0600
         os.chmod(self._path, stat.S_IRUSR | stat.S_IWUSR)
 
+        # Read pool (opened after the schema exists: mode=ro cannot create it)
+        uri = f"{Path(self._path).resolve().as_uri()}?mode=ro"
+        for _ in range(_READ_POOL_SIZE):
+            reader = await aiosqlite.connect(uri, uri=True, cached_statements=_STATEMENT_CACHE)
+            reader.row_factory = aiosqlite.Row
+            await reader.executescript(f"PRAGMA query_only=1;\n{_CONNECTION_PRAGMAS}")
+            self._readers.append(reader)
+
+    async def _analyze_once(self) -> None:
+        """Gather planner statistics for the audit indexes if none exist yet.
+
+        ANALYZE scans every index, so it only runs until the stats are there;
+        PRAGMA optimize on close() refreshes them once they drift.
+        """
+        conn = self._get_conn()
+        cursor = await conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+        )
+        if await cursor.fetchone():
+            cursor = await conn.execute("SELECT 1 FROM sqlite_stat1 WHERE idx = 'idx_audit_ts_id'")
+            if await cursor.fetchone():
+                return
+        await conn.execute("ANALYZE")
+
+    async def _migrate_iso_timestamps(self) -> None:
+        """Convert a database with ISO 8601 TEXT timestamps to REAL epoch seconds."""
+        conn = self._get_conn()
+        cursor = await conn.execute("PRAGMA table_info(audit_log)")
+        columns = {row["name"]: row["type"] for row in await cursor.fetchall()}
+        if columns.get("timestamp") != "TEXT":
+            return  # fresh database, or already migrated
+        logger.info("Migrating %s timestamps to epoch seconds", self._path)
+        await conn.executescript(_MIGRATE_ISO_TIMESTAMPS)
+
     def _get_conn(self) -> aiosqlite.Connection:
         """Return the persistent connection, or raise if not initialized."""
         if self._conn is None:
             raise RuntimeError("Database not initialized — call initialize() first")
         return self._conn
 
+    def _get_reader(self) -> aiosqlite.Connection:
+        """Return the next read-only connection, round-robin."""
+        if not self._readers:
+            return self._get_conn()
+        return self._readers[next(self._reader_turn) % len(self._readers)]
+
     async def log_audit(self, entry: AuditEntry) -> None:
-        """Insert an audit log entry."""
-        conn = self._get_conn()
-        timestamp = _epoch_to_iso(entry.timestamp)
-        resolved_at = _epoch_to_iso(entry.resolved_at) if entry.resolved_at else None
-        args_json = json.dumps(entry.args)
-        result_json = json.dumps(entry.execution_result) if entry.execution_result else None
-
-        await conn.execute(
-            """INSERT INTO audit_log
-               (timestamp, request_id, tool_name, args, signature, decision,
-                resolution, resolved_by, resolved_at, execution_result, agent_id)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        """Queue an audit log entry; it is committed with others in the same window.
+
+        Methods that read or update audit_log flush the queue first, so callers
+        always see their own writes.
+        """
+        self._get_conn()
+        if (
+            self._tool_names_cache is not None
+            and entry.tool_name
+            and entry.tool_name not in self._tool_names_cache[1]
+        ):
+            self._tool_names_cache = None
+        # Encoded here rather than via sqlite3.register_adapter(dict, ...): an
+        # adapter is process-wide and would still call orjson.dumps per value
+        args_json = dumps_json(entry.args)
+        result_json = dumps_json(entry.execution_result) if entry.execution_result else None
+
+        self._audit_rows.append(
             (
-                timestamp,
+                entry.timestamp,
                 entry.request_id,
                 entry.tool_name,
                 args_json,
@@ -99,81 +329,166 @@ class Database:
                 entry.decision,
                 entry.resolution,
                 entry.resolved_by,
-                resolved_at,
+                entry.resolved_at,
                 result_json,
                 entry.agent_id,
-            ),
+            )
         )
-        await conn.commit()
+        if len(self._audit_rows) >= _AUDIT_BATCH_MAX:
+            await self._flush_writes()
+        elif self._audit_flusher is None:
+            self._audit_flusher = asyncio.create_task(self._flush_audit_later())
+
+    async def _flush_audit_later(self) -> None:
+        """Background group commit; keeps draining while entries keep arriving."""
+        try:
+            while self._audit_rows:
+                await asyncio.sleep(_AUDIT_FLUSH_DELAY)
+                await self._flush_writes()
+        except Exception:
+            logger.exception("Failed to write audit log entries")
+        finally:
+            self._audit_flusher = None
+
+    @contextlib.asynccontextmanager
+    async def _write_transaction(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Open a write transaction that starts with every queued write.
+
+        Queued audit rows and pending_requests mutations (in order, runs of the
+        same statement through one executemany) are applied before the
+        caller's statements, and all of it is committed once on exit. Serialized
+        by a lock, so a caller that finds the queues empty still waits for a
+        commit already in flight (readers use other connections). On failure the
+        queued writes go back to the front of their queues and the error
+        propagates.
+        """
+        async with self._write_lock:
+            rows, self._audit_rows = self._audit_rows, []
+            writes, self._pending_writes = self._pending_writes, []
+            conn = self._get_conn()
+            try:
+                if rows:
+                    await conn.executemany(_INSERT_AUDIT, rows)
+                for sql, run in itertools.groupby(writes, key=lambda write: write[0]):
+                    await conn.executemany(sql, [params for _, params in run])
+                yield conn
+                if conn.in_transaction:
+                    await conn.commit()
+            except BaseException:
+                with contextlib.suppress(Exception):
+                    await conn.rollback()
+                self._audit_rows[:0] = rows
+                self._pending_writes[:0] = writes
+                raise
+
+    async def _flush_writes(self) -> None:
+        """Commit all queued audit rows and pending_requests mutations."""
+        async with self._write_transaction():
+            pass
 
     async def get_audit_log(self, limit: int = 100) -> list[AuditEntry]:
         """Query recent audit log entries in reverse chronological order."""
-        conn = self._get_conn()
+        return [entry async for entry in self.iter_audit_log(limit)]
+
+    async def iter_audit_log(self, limit: int | None = None) -> AsyncIterator[AuditEntry]:
+        """Yield audit log entries in reverse chronological order.
+
+        Rows are converted one fetch batch at a time, so exporting the whole
+        log (limit=None) does not materialize it in memory.
+        """
+        await self._flush_writes()
+        conn = self._get_reader()
+        # LIMIT -1 means "no limit" in SQLite.
         cursor = await conn.execute(
-            "SELECT * FROM audit_log ORDER BY timestamp DESC, id DESC LIMIT ?", (limit,)
+            f"SELECT {_AUDIT_ENTRY_COLUMNS} FROM audit_log"
+            " ORDER BY timestamp DESC, id DESC LIMIT ?",
+            (-1 if limit is None else limit,),
         )
-        rows = await cursor.fetchall()
-        return [self._row_to_audit_entry(dict(row)) for row in rows]
+        async with contextlib.aclosing(_iter_rows(cursor)) as rows:
+            async for row in rows:
+                yield self._row_to_audit_entry(row)
 
     @staticmethod
-    def _row_to_audit_entry(row: dict[str, Any]) -> AuditEntry:
-        """Convert a database row dict to an AuditEntry dataclass."""
-        # Parse ISO timestamp back to epoch float
-        ts = datetime.fromisoformat(row["timestamp"]).replace(tzinfo=UTC).timestamp()
-
-        # Parse resolved_at ISO back to epoch float if present
-        resolved_at: float | None = None
-        if row.get("resolved_at"):
-            resolved_at = datetime.fromisoformat(row["resolved_at"]).replace(tzinfo=UTC).timestamp()
-
-        # Parse JSON args back to dict
-        args = json.loads(row["args"]) if isinstance(row["args"], str) else row["args"]
-
-        # Parse execution_result JSON back to dict if present
-        execution_result: dict[str, Any] | None = None
-        if row.get("execution_result"):
-            execution_result = (
-                json.loads(row["execution_result"])
-                if isinstance(row["execution_result"], str)
-                else row["execution_result"]
-            )
-
+    def _row_to_audit_entry(row: Sequence[Any]) -> AuditEntry:
+        """Convert a row selected as _AUDIT_ENTRY_COLUMNS to an AuditEntry."""
+        (
+            request_id,
+            timestamp,
+            tool_name,
+            args,
+            signature,
+            decision,
+            resolution,
+            resolved_by,
+            resolved_at,
+            execution_result,
+            agent_id,
+            row_id,
+        ) = row
+        # JSON columns: BLOB from orjson, or TEXT in rows written before it
         return AuditEntry(
-            request_id=row["request_id"],
-            timestamp=ts,
-            tool_name=row["tool_name"],
-            args=args,
-            signature=row["signature"],
-            decision=row["decision"],
-            resolution=row.get("resolution"),
-            resolved_by=row.get("resolved_by"),
-            resolved_at=resolved_at,
-            execution_result=execution_result,
-            agent_id=row.get("agent_id", "default"),
+            request_id,
+            timestamp,
+            tool_name,
+            orjson.loads(args),
+            signature,
+            decision,
+            resolution,
+            resolved_by,
+            resolved_at,
+            orjson.loads(execution_result) if execution_result else None,
+            agent_id,
+            row_id,
         )
 
+    def _queue_pending_write(self, sql: str, params: tuple) -> None:
+        """Queue a pending_requests mutation for the next coalesced commit.
+
+        Methods that read or write pending_requests flush the queue first, so
+        callers always see their own writes.
+        """
+        self._get_conn()
+        self._pending_writes.append((sql, params))
+        if self._pending_flusher is None:
+            self._pending_flusher = asyncio.create_task(self._flush_pending_later())
+
+    async def _flush_pending_later(self) -> None:
+        """Background coalesced commit of queued pending_requests mutations."""
+        try:
+            while self._pending_writes:
+                await asyncio.sleep(_PENDING_FLUSH_DELAY)
+                await self._flush_writes()
+        except Exception:
+            logger.exception("Failed to write pending request updates")
+        finally:
+            self._pending_flusher = None
+
     async def insert_pending(
         self,
         request_id: str,
         tool_name: str,
         args: dict,
         signature: str,
-        expires_at: str,
+        expires_at: float,
     ) -> None:
-        """Insert a pending approval request."""
-        conn = self._get_conn()
-        args_json = json.dumps(args)
-        await conn.execute(
-            """INSERT INTO pending_requests
-               (request_id, tool_name, args, signature, expires_at)
-               VALUES (?, ?, ?, ?, ?)""",
-            (request_id, tool_name, args_json, signature, expires_at),
-        )
-        await conn.commit()
+        """Insert a pending approval request, committed with any queued writes.
+
+        The ask path logs its audit entry just before, so both share one commit.
+        """
+        # Decoded: pending rows are returned to clients and re-serialized as str
+        args_json = dumps_json(args).decode()
+        async with self._write_transaction() as conn:
+            await conn.execute(
+                """INSERT INTO pending_requests
+                   (request_id, tool_name, args, signature, expires_at)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (request_id, tool_name, args_json, signature, expires_at),
+            )
 
     async def get_pending(self, request_id: str) -> dict[str, Any] | None:
         """Get a single pending request, or None if not found."""
-        conn = self._get_conn()
+        await self._flush_writes()
+        conn = self._get_reader()
         cursor = await conn.execute(
             "SELECT * FROM pending_requests WHERE request_id = ?", (request_id,)
         )
@@ -181,49 +496,54 @@ class Database:
         return dict(row) if row else None
 
     async def delete_pending(self, request_id: str) -> None:
-        """Delete a resolved pending request."""
-        conn = self._get_conn()
-        await conn.execute("DELETE FROM pending_requests WHERE request_id = ?", (request_id,))
-        await conn.commit()
+        """Queue deletion of a resolved pending request (see _queue_pending_write)."""
+        self._queue_pending_write(
+            "DELETE FROM pending_requests WHERE request_id = ?", (request_id,)
+        )
 
     async def cleanup_stale_requests(self) -> list[dict[str, Any]]:
         """Delete expired pending requests and return them."""
-        conn = self._get_conn()
-        now = datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
-        cursor = await conn.execute("SELECT * FROM pending_requests WHERE expires_at <= ?", (now,))
-        stale = [dict(row) for row in await cursor.fetchall()]
-        if stale:
-            await conn.execute("DELETE FROM pending_requests WHERE expires_at <= ?", (now,))
-            await conn.commit()
-        return stale
+        now = time.time()
+        async with self._write_transaction() as conn:
+            if _HAS_RETURNING:
+                cursor = await conn.execute(
+                    "DELETE FROM pending_requests WHERE expires_at <= ? RETURNING *", (now,)
+                )
+                return [dict(row) async for row in _iter_rows(cursor)]
+            cursor = await conn.execute(
+                "SELECT * FROM pending_requests WHERE expires_at <= ?", (now,)
+            )
+            stale = [dict(row) async for row in _iter_rows(cursor)]
+            if stale:
+                await conn.execute("DELETE FROM pending_requests WHERE expires_at <= ?", (now,))
+            return stale
 
     async def update_pending_result(self, request_id: str, result: str) -> None:
-        """Write a JSON result string to the result column of a pending request."""
-        conn = self._get_conn()
-        await conn.execute(
-            "UPDATE pending_requests SET result = ? WHERE request_id = ?",
-            (result, request_id),
+        """Queue a JSON result string for the result column of a pending request."""
+        self._queue_pending_write(
+            "UPDATE pending_requests SET result = ? WHERE request_id = ?", (result, request_id)
         )
-        await conn.commit()
 
     async def get_completed_results(self) -> list[dict[str, Any]]:
-        """Return pending_requests rows where result IS NOT NULL."""
-        conn = self._get_conn()
+        """Return pending_requests rows where result IS NOT NULL.
+
+        Plain dicts: they are the get_pending_results wire format, sent as-is.
+        """
+        await self._flush_writes()
+        conn = self._get_reader()
         cursor = await conn.execute("SELECT * FROM pending_requests WHERE result IS NOT NULL")
-        rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
+        return [dict(row) async for row in _iter_rows(cursor)]
 
     async def delete_completed_results(self, request_ids: list[str]) -> None:
         """Delete pending_requests by request_id list."""
         if not request_ids:
             return
-        conn = self._get_conn()
-        placeholders = ",".join("?" for _ in request_ids)
-        await conn.execute(
-            f"DELETE FROM pending_requests WHERE request_id IN ({placeholders})",
-            request_ids,
-        )
-        await conn.commit()
+        async with self._write_transaction() as conn:
+            # One cached statement bound per id: no per-length SQL text, no variable limit
+            await conn.executemany(
+                "DELETE FROM pending_requests WHERE request_id = ?",
+                [(request_id,) for request_id in request_ids],
+            )
 
     async def update_audit_resolution(
         self,
@@ -233,17 +553,19 @@ class Database:
         resolved_at: float,
         execution_result: dict[str, Any] | None = None,
     ) -> None:
-        """Update an existing audit entry with resolution details."""
-        conn = self._get_conn()
-        resolved_at_iso = _epoch_to_iso(resolved_at)
-        result_json = json.dumps(execution_result) if execution_result else None
-        await conn.execute(
-            """UPDATE audit_log
-               SET resolution = ?, resolved_by = ?, resolved_at = ?, execution_result = ?
-               WHERE request_id = ?""",
-            (resolution, resolved_by, resolved_at_iso, result_json, request_id),
-        )
-        await conn.commit()
+        """Update an existing audit entry with resolution details.
+
+        Committed with any queued writes, e.g. the resolved request's pending row
+        deletion queued just before.
+        """
+        result_json = dumps_json(execution_result) if execution_result else None
+        async with self._write_transaction() as conn:
+            await conn.execute(
+                """UPDATE audit_log
+                   SET resolution = ?, resolved_by = ?, resolved_at = ?, execution_result = ?
+                   WHERE request_id = ?""",
+                (resolution, resolved_by, resolved_at, result_json, request_id),
+            )
 
     async def get_audit_log_filtered(
         self,
@@ -254,84 +576,93 @@ class Database:
         to_ts: float | None = None,
         limit: int = 50,
         offset: int = 0,
+        cursor: tuple[float, int] | None = None,
     ) -> tuple[list[AuditEntry], int]:
-        """Return (entries, total_count) with filtering and pagination."""
-        conn = self._get_conn()
-        conditions: list[str] = []
-        params: list[Any] = []
-
-        if tool_name:
-            conditions.append("tool_name = ?")
-            params.append(tool_name)
-        if decision:
-            conditions.append("decision = ?")
-            params.append(decision)
-        if resolution:
-            conditions.append("resolution = ?")
-            params.append(resolution)
-        if from_ts is not None:
-            conditions.append("timestamp >= ?")
-            params.append(_epoch_to_iso(from_ts))
-        if to_ts is not None:
-            conditions.append("timestamp <= ?")
-            params.append(_epoch_to_iso(to_ts))
-
-        where = ""
-        if conditions:
-            where = "WHERE " + " AND ".join(conditions)
+        """Return (entries, total_count) with filtering and pagination.
+
+        *cursor* is the (timestamp, row_id) of the last entry of the previous
+        page; when given, the page starts right after it (seek pagination, cost
+        independent of depth) and *offset* is ignored. total_count ignores it.
+        """
+        rows, total = await self._select_audit_filtered(
+            tool_name, decision, resolution, from_ts, to_ts, limit, offset, cursor
+        )
+        return [self._row_to_audit_entry(r) async for r in rows], total
+
+    async def iter_audit_rows_filtered(
+        self, **filters: Any
+    ) -> tuple[AsyncIterator[aiosqlite.Row], int]:
+        """Like get_audit_log_filtered(), but yields raw rows as SQLite produces them.
+
+        ``args`` and ``execution_result`` are left as the stored JSON, for
+        callers that only re-serialize them. The iterator should be consumed
+        (or closed) promptly: it holds a cursor on a read connection.
+        """
+        return await self._select_audit_filtered(**filters)
+
+    async def _select_audit_filtered(
+        self,
+        tool_name: str | None = None,
+        decision: str | None = None,
+        resolution: str | None = None,
+        from_ts: float | None = None,
+        to_ts: float | None = None,
+        limit: int = 50,
+        offset: int = 0,
+        cursor: tuple[float, int] | None = None,
+    ) -> tuple[AsyncIterator[aiosqlite.Row], int]:
+        """Shared query behind the filtered audit log readers: (rows, total)."""
+        await self._flush_writes()
+        conn = self._get_reader()
+        values = (tool_name, decision, resolution, from_ts, to_ts)
+        present = (
+            bool(tool_name),
+            bool(decision),
+            bool(resolution),
+            from_ts is not None,
+            to_ts is not None,
+        )
+        params = tuple(v for v, p in zip(values, present, strict=True) if p)
+        count_sql, page_sql = _audit_filter_sql(present, cursor is not None)
 
         # Get total count
-        count_cursor = await conn.execute(f"SELECT COUNT(*) FROM audit_log {where}", params)
+        count_cursor = await conn.execute(count_sql, params)
         row = await count_cursor.fetchone()
         total = row[0] if row else 0
 
         # Get paginated entries
-        cursor = await conn.execute(
-            f"SELECT * FROM audit_log {where} ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
-            [*params, limit, offset],
-        )
-        rows = await cursor.fetchall()
-        return [self._row_to_audit_entry(dict(r)) for r in rows], total
+        if cursor is not None:
+            params += tuple(cursor)
+            offset = 0
+        rows_cursor = await conn.execute(page_sql, (*params, limit, offset))
+        return _iter_rows(rows_cursor), total
 
     async def get_audit_stats(self) -> dict[str, Any]:
         """Return summary statistics from the audit log."""
-        conn = self._get_conn()
-
-        # Total requests
-        cursor = await conn.execute("SELECT COUNT(*) FROM audit_log")
-        row = await cursor.fetchone()
-        total = row[0] if row else 0
-
-        # Last 24 hours
-        cutoff = _epoch_to_iso(datetime.now(UTC).timestamp() - 86400)
-        cursor = await conn.execute(
-            "SELECT COUNT(*) FROM audit_log WHERE timestamp >= ?", (cutoff,)
-        )
-        row = await cursor.fetchone()
-        last_24h = row[0] if row else 0
-
-        # Decision breakdown
-        cursor = await conn.execute("SELECT decision, COUNT(*) FROM audit_log GROUP BY decision")
+        await self._flush_writes()
+        conn = self._get_reader()
+
+        # One round-trip: a scalar row (last 24h, approved asks), the decision
+        # breakdown, and the top 10 tools, tagged by kind
+        cutoff = time.time() - 86400
+        cursor = await conn.execute(_STATS_QUERY, (cutoff,))
+        last_24h = approved_count = 0
         decision_breakdown: dict[str, int] = {}
-        for r in await cursor.fetchall():
-            decision_breakdown[r[0]] = r[1]
-
-        # Approval rate (approved out of all ask decisions that resolved)
+        top_tools: list[dict[str, Any]] = []
+        async for kind, key, count, extra in _iter_rows(cursor):
+            if kind == "s":
+                last_24h, approved_count = count or 0, extra or 0
+            elif kind == "d":
+                decision_breakdown[key] = count
+            else:
+                top_tools.append({"name": key, "count": count})
+        top_tools.sort(key=lambda t: -t["count"])  # stable: keeps SQL order for ties
+
+        total = sum(decision_breakdown.values())
+        # Approval rate (approved out of all ask decisions)
         ask_total = decision_breakdown.get("ask", 0)
-        cursor = await conn.execute(
-            "SELECT COUNT(*) FROM audit_log WHERE decision = 'ask' AND resolution = 'approved'"
-        )
-        row = await cursor.fetchone()
-        approved_count = row[0] if row else 0
         approval_rate = approved_count / ask_total if ask_total > 0 else 0.0
 
-        # Top tools
-        cursor = await conn.execute(
-            "SELECT tool_name, COUNT(*) as cnt FROM audit_log "
-            "WHERE tool_name != '' GROUP BY tool_name ORDER BY cnt DESC LIMIT 10"
-        )
-        top_tools = [{"name": r[0], "count": r[1]} for r in await cursor.fetchall()]
-
         return {
             "total_requests": total,
             "last_24h": last_24h,
@@ -341,12 +672,21 @@ class Database:
         }
 
     async def get_distinct_tool_names(self) -> list[str]:
-        """Return sorted list of distinct tool names from the audit log."""
-        conn = self._get_conn()
+        """Return sorted list of distinct tool names from the audit log.
+
+        Cached for _TOOL_NAMES_TTL seconds, or until a new tool name is logged.
+        """
+        now = time.monotonic()
+        if self._tool_names_cache is not None and now - self._tool_names_cache[0] < _TOOL_NAMES_TTL:
+            return list(self._tool_names_cache[1])
+        await self._flush_writes()
+        conn = self._get_reader()
         cursor = await conn.execute(
             "SELECT DISTINCT tool_name FROM audit_log WHERE tool_name != '' ORDER BY tool_name"
         )
-        return [r[0] for r in await cursor.fetchall()]
+        names = [r[0] async for r in _iter_rows(cursor)]
+        self._tool_names_cache = (now, names)
+        return list(names)
 
     async def health_check(self) -> bool:
         """Return True if the database connection is alive."""
@@ -358,7 +698,15 @@ class Database:
             return False
 
     async def close(self) -> None:
-        """Close the persistent connection."""
+        """Write queued audit entries and pending updates, then close the connection."""
+        for flusher in (self._audit_flusher, self._pending_flusher):
+            if flusher is not None:
+                await flusher  # lets an in-flight commit finish
+        for reader in self._readers:
+            await reader.close()
+        self._readers = []
         if self._conn is not None:
+            await self._flush_writes()
+            await self._conn.execute("PRAGMA optimize")
             await self._conn.close()
             self._conn = None
@@ -3,7 +3,10 @@
 from __future__ import annotations
 
 import re
-from fnmatch import fnmatch
+from collections import OrderedDict
+from collections.abc import Callable
+from fnmatch import translate
+from itertools import groupby
 from typing import TYPE_CHECKING
 
 from agentpass.config import Permissions
@@ -12,8 +15,15 @@ from agentpass.models import Decision
 if TYPE_CHECKING:
     from agentpass.registry import ToolRegistry
 
-# Characters forbidden in ANY argument value (prevents glob/signature injection)
-FORBIDDEN_CHARS_RE = re.compile(r"[*?\[\](),\x00-\x1f]")
+# Explicit rules are checked by action in this order, whatever their file order
+_RULE_PRECEDENCE = ("deny", "allow", "ask")
+
+# Validated signatures remembered per engine for repeated (tool, args) combinations
+_SIGNATURE_CACHE_SIZE = 1024
+
+# Characters forbidden in ANY argument value (prevents glob/signature injection).
+# A set membership scan runs entirely in C, without regex engine setup per call.
+FORBIDDEN_CHARS = frozenset("*?[](),") | frozenset(map(chr, range(0x20)))
 
 
 def validate_args(tool_name: str, args: dict, registry: ToolRegistry | None = None) -> None:
@@ -23,29 +33,29 @@ def validate_args(tool_name: str, args: dict, registry: ToolRegistry | None = No
     is used (required args, per-arg regex patterns).  Otherwise only global
     forbidden-character checks apply.
     """
-    # Global: forbidden chars always checked first
+    tool = registry.get_tool(tool_name) if registry else None
+    if tool is None:
+        # Global: forbidden chars only
+        for key, value in args.items():
+            if isinstance(value, str) and not FORBIDDEN_CHARS.isdisjoint(value):
+                raise ValueError(f"Argument '{key}' contains forbidden characters")
+        return
+
+    # One pass: forbidden chars, then the YAML pattern for the same arg
+    validators = registry.get_arg_validators(tool_name)
     for key, value in args.items():
         if not isinstance(value, str):
             continue
-        if FORBIDDEN_CHARS_RE.search(value):
+        if not FORBIDDEN_CHARS.isdisjoint(value):
             raise ValueError(f"Argument '{key}' contains forbidden characters")
+        pattern = validators.get(key)
+        if pattern and not pattern.match(value):
+            raise ValueError(f"Invalid value for {key}: {value!r}")
 
-    if registry:
-        tool = registry.get_tool(tool_name)
-        if tool:
-            # Check required args
-            required = registry.get_required_args(tool_name)
-            for req_arg in required:
-                if req_arg not in args:
-                    raise ValueError(f"Missing required argument: {req_arg}")
-            # Check per-arg validation patterns from YAML
-            validators = registry.get_arg_validators(tool_name)
-            for key, value in args.items():
-                if not isinstance(value, str):
-                    continue
-                pattern = validators.get(key)
-                if pattern and not pattern.match(value):
-                    raise ValueError(f"Invalid value for {key}: {value!r}")
+    # Required args: set difference against the keys seen above
+    missing = registry.get_required_args(tool_name).difference(args)
+    if missing:
+        raise ValueError(f"Missing required argument: {min(missing)}")
 
 
 def build_signature(tool_name: str, args: dict, registry: ToolRegistry | None = None) -> str:
@@ -75,27 +85,91 @@ def build_signature(tool_name: str, args: dict, registry: ToolRegistry | None =
     return f"{tool_name}({', '.join(parts)})" if parts else tool_name
 
 
+def _signature_key(tool_name: str, args: dict) -> tuple | None:
+    """Hashable cache key for (tool_name, args), or None if args can't be keyed.
+
+    Value types are part of the key: 1, 1.0 and True hash alike but render
+    differently in a signature.
+    """
+    try:
+        key = (tool_name, tuple(sorted((k, type(v), v) for k, v in args.items())))
+        hash(key)
+    except TypeError:
+        return None  # unhashable values (lists, dicts) or unsortable keys
+    return key
+
+
+def _compile_globs(patterns: list[str]) -> Callable[[str], re.Match | None]:
+    """Compile fnmatch-style globs into one alternation; returns its match function.
+
+    The regex engine tries every alternative in a single native call, so a bucket
+    of N rules costs one match instead of N Python-level iterations.
+    """
+    return re.compile("|".join(f"(?:{translate(p)})" for p in patterns)).match
+
+
+def _compile_decider(
+    steps: list[tuple[Callable[[str], re.Match | None], Decision]],
+) -> Callable[[str], Decision]:
+    """Generate one straight-line function trying each (match, decision) in order.
+
+    The source only references steps by index; patterns and decisions are bound
+    through the exec namespace, so no config text ever reaches exec.
+    """
+    namespace: dict[str, object] = {"_fallback": Decision.ASK}
+    lines = ["def _decide(sig):"]
+    for i, (match, decision) in enumerate(steps):
+        namespace[f"_m{i}"] = match
+        namespace[f"_d{i}"] = decision
+        lines.append(f"    if _m{i}(sig): return _d{i}")
+    lines.append("    return _fallback")
+    exec("\n".join(lines), namespace)
+    return namespace["_decide"]
+
+
 class PermissionEngine:
     """Evaluates tool requests against permission rules."""
 
     def __init__(self, permissions: Permissions, registry: ToolRegistry | None = None) -> None:
         self._permissions = permissions
         self._registry = registry
+        # Globs are translated once here instead of by fnmatch on every evaluation.
+        # Explicit rules: one combined pattern per action, in precedence order.
+        self._rules: list[tuple[Decision, Callable[[str], re.Match | None]]] = []
+        for action in _RULE_PRECEDENCE:
+            patterns = [r.pattern for r in permissions.rules if r.action == action]
+            if patterns:
+                self._rules.append((Decision(action), _compile_globs(patterns)))
+        # Defaults are first-match-wins, so only consecutive runs with the same
+        # action can share a pattern without changing the outcome.
+        self._defaults: list[tuple[Callable[[str], re.Match | None], Decision]] = [
+            (_compile_globs([d.pattern for d in run]), Decision(action))
+            for action, run in groupby(permissions.defaults, key=lambda d: d.action)
+        ]
+        # Rules, then defaults, then the ASK fallback as one generated function
+        self._decide = _compile_decider(
+            [(match, decision) for decision, match in self._rules] + self._defaults
+        )
+        self._signature_cache: OrderedDict[tuple, str] = OrderedDict()
 
     def evaluate(self, tool_name: str, args: dict) -> Decision:
         """Evaluate a tool request and return allow/deny/ask."""
+        # Explicit rules (deny > allow > ask), then defaults (first match wins),
+        # then the global ASK fallback
+        return self._decide(self._signature(tool_name, args))
+
+    def _signature(self, tool_name: str, args: dict) -> str:
+        """build_signature() behind a bounded LRU; invalid args are never cached."""
+        key = _signature_key(tool_name, args)
+        if key is None:
+            return build_signature(tool_name, args, self._registry)
+        cache = self._signature_cache
+        signature = cache.get(key)
+        if signature is not None:
+            cache.move_to_end(key)
+            return signature
         signature = build_signature(tool_name, args, self._registry)
-
-        # Phase 1: Check explicit rules (deny > allow > ask)
-        for action_type in ("deny", "allow", "ask"):
-            for rule in self._permissions.rules:
-                if rule.action == action_type and fnmatch(signature, rule.pattern):
-                    return Decision(action_type)
-
-        # Phase 2: Check defaults (first match wins)
-        for default in self._permissions.defaults:
-            if fnmatch(signature, default.pattern):
-                return Decision(default.action)
-
-        # Phase 3: Global fallback
-        return Decision.ASK
+        cache[key] = signature
+        if len(cache) > _SIGNATURE_CACHE_SIZE:
+            cache.popitem(last=False)
+        return signature
@@ -24,13 +24,12 @@ class Executor:
     ) -> None:
         self._services = services
         self._registry = registry
+        # Tool -> service routes, bound once so dispatch skips the registry call
+        self._route: dict[str, str] = registry.tool_services() if registry else {}
 
     async def execute(self, tool_name: str, args: dict[str, Any]) -> dict[str, Any]:
         """Dispatch a tool request to the appropriate service handler."""
-        service_name = None
-        if self._registry:
-            service_name = self._registry.get_service_name(tool_name)
-
+        service_name = self._route.get(tool_name)
         if service_name is None:
             raise ExecutionError(f"Unknown tool: {tool_name}")
         handler = self._services.get(service_name)
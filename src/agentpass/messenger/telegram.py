@@ -3,6 +3,7 @@
 import asyncio
 import logging
 import time
+from collections import OrderedDict
 from collections.abc import Awaitable, Callable
 from pathlib import Path
 
@@ -11,6 +12,7 @@ from telegram.ext import (
     Application,
     CallbackQueryHandler,
     InvalidCallbackData,
+    PersistenceInput,
     PicklePersistence,
 )
 
@@ -24,6 +26,9 @@ from agentpass.messenger.base import (
 
 logger = logging.getLogger(__name__)
 
+# Resolved request_ids remembered to reject late button presses; oldest dropped
+_RESOLVED_MAX = 10_000
+
 
 class TelegramAdapter(MessengerAdapter):
     """Telegram-based guardian approval bot.
@@ -34,7 +39,8 @@ class TelegramAdapter(MessengerAdapter):
     Configuration:
         - arbitrary_callback_data=True with PicklePersistence so callback data
           (Python dicts) survives restarts.
-        - Each pending approval gets an asyncio timeout task.
+        - Each pending approval gets a loop timer (call_later); only a timer
+          that fires spawns a task.
         - asyncio.Lock ensures race-safe resolution between user callback and timeout.
     """
 
@@ -45,15 +51,22 @@ class TelegramAdapter(MessengerAdapter):
         persistence_path: str | None = None,
     ) -> None:
         self._config = config
+        self._allowed_users = frozenset(config.allowed_users)  # checked on every tap
         self._callback: Callable[[ApprovalResult], Awaitable[None]] | None = None
-        self._pending: dict[str, asyncio.Task] = {}  # request_id -> timeout task
+        self._pending: dict[str, asyncio.TimerHandle] = {}  # request_id -> timeout timer
+        self._timeout_tasks: set[asyncio.Task] = set()  # fired timeouts still resolving
         self._resolve_lock = asyncio.Lock()
-        self._resolved: set[str] = set()  # already-resolved request_ids
+        self._resolved: OrderedDict[str, None] = OrderedDict()  # already-resolved request_ids
 
         # Persistence for arbitrary callback data survival across restarts
         pp = persistence_path or "data/callback_data.pickle"
         Path(pp).parent.mkdir(parents=True, exist_ok=True)
-        persistence = PicklePersistence(filepath=pp)
+        # Only callback data is used. Default update_interval (60 s): it is
+        # pickled in batches, not per approval message
+        persistence = PicklePersistence(
+            filepath=pp,
+            store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=False),
+        )
 
         self._app = (
             Application.builder()
@@ -100,12 +113,11 @@ class TelegramAdapter(MessengerAdapter):
         lines = [f"\U0001f6a8 {request.tool_name}"]
         if request.signature:
             lines.append(request.signature)
-        # Show args not captured by the signature template
+        # Show args not captured by the signature template. A substring test, not
+        # a set of rendered values: composite parts ("{domain}.{service}") embed
+        # a value without rendering it alone, and signatures are a line long
         sig_text = request.signature or ""
-        extra = {k: v for k, v in request.args.items() if str(v) not in sig_text}
-        if extra:
-            for k, v in extra.items():
-                lines.append(f"  {k}: {v}")
+        lines.extend(f"  {k}: {v}" for k, v in request.args.items() if str(v) not in sig_text)
 
         msg = await self._app.bot.send_message(
             chat_id=self._config.chat_id,
@@ -119,8 +131,11 @@ class TelegramAdapter(MessengerAdapter):
 
         Best-effort: logs a warning on failure, never raises.
         """
+        await self._edit_message(message_id, f"{status}\n\n{detail}")
+
+    async def _edit_message(self, message_id: str | int, text: str) -> None:
+        """Replace a message's text; logs a warning on failure, never raises."""
         try:
-            text = f"{status}\n\n{detail}"
             await self._app.bot.edit_message_text(
                 chat_id=self._config.chat_id,
                 message_id=int(message_id),
@@ -129,6 +144,19 @@ class TelegramAdapter(MessengerAdapter):
         except Exception:
             logger.warning("Failed to edit Telegram message %s", message_id, exc_info=True)
 
+    async def _finish(self, edit: Awaitable[None], result: ApprovalResult) -> None:
+        """Run the message edit and the approval callback concurrently.
+
+        They are independent, so the agent resumes without waiting on the
+        Telegram round trip. A failing callback is logged, not raised.
+        """
+        if self._callback is None:
+            await edit
+            return
+        _, outcome = await asyncio.gather(edit, self._callback(result), return_exceptions=True)
+        if isinstance(outcome, Exception):
+            logger.error("Approval callback failed for %s", result.request_id, exc_info=outcome)
+
     async def on_approval_callback(
         self, callback: Callable[[ApprovalResult], Awaitable[None]]
     ) -> None:
@@ -139,10 +167,12 @@ class TelegramAdapter(MessengerAdapter):
         """Start listening — actual PTB lifecycle is managed by __main__.py."""
 
     async def stop(self) -> None:
-        """Cancel all pending timeout tasks and clean up."""
-        for task in self._pending.values():
-            task.cancel()
+        """Cancel all pending timeouts, including ones already resolving."""
+        for handle in self._pending.values():
+            handle.cancel()
         self._pending.clear()
+        for task in self._timeout_tasks:
+            task.cancel()
 
     async def health_check(self) -> bool:
         """Return True if the Telegram bot application is running."""
@@ -151,36 +181,47 @@ class TelegramAdapter(MessengerAdapter):
         except Exception:
             return False
 
+    def _mark_resolved(self, request_id: str) -> None:
+        """Remember *request_id* as resolved; call with _resolve_lock held."""
+        self._resolved[request_id] = None
+        if len(self._resolved) > _RESOLVED_MAX:
+            self._resolved.popitem(last=False)
+
     # ------------------------------------------------------------------
     # Timeout scheduling
     # ------------------------------------------------------------------
 
     def schedule_timeout(self, request_id: str, timeout: int, message_id: str) -> None:
-        """Schedule an asyncio task that auto-denies after *timeout* seconds."""
-        task = asyncio.create_task(self._timeout_handler(request_id, timeout, message_id))
-        self._pending[request_id] = task
+        """Schedule a timer that auto-denies after *timeout* seconds."""
+        loop = asyncio.get_running_loop()
+        self._pending[request_id] = loop.call_later(
+            timeout, self._on_timeout, request_id, message_id
+        )
 
-    async def _timeout_handler(self, request_id: str, timeout: int, message_id: str) -> None:
-        """Fire after *timeout* seconds — resolve as deny if still pending."""
-        await asyncio.sleep(timeout)
+    def _on_timeout(self, request_id: str, message_id: str) -> None:
+        """Timer callback: run the (awaiting) resolution as a task."""
+        task = asyncio.create_task(self._timeout_handler(request_id, message_id))
+        self._timeout_tasks.add(task)
+        task.add_done_callback(self._timeout_tasks.discard)
 
+    async def _timeout_handler(self, request_id: str, message_id: str) -> None:
+        """Resolve as deny if still pending once the timeout has elapsed."""
         async with self._resolve_lock:
             if request_id in self._resolved:
                 return  # Already resolved by a user callback
-            self._resolved.add(request_id)
+            self._mark_resolved(request_id)
             self._pending.pop(request_id, None)
 
         # Best-effort edit (may fail if message was already edited, network, etc.)
-        await self.update_approval(message_id, "\u23f0 Expired", "Approval timed out")
-
-        if self._callback:
-            result = ApprovalResult(
-                request_id=request_id,
-                action="deny",
-                user_id="timeout",
-                timestamp=time.time(),
-            )
-            await self._callback(result)
+        result = ApprovalResult(
+            request_id=request_id,
+            action="deny",
+            user_id="timeout",
+            timestamp=time.time(),
+        )
+        await self._finish(
+            self.update_approval(message_id, "\u23f0 Expired", "Approval timed out"), result
+        )
 
     # ------------------------------------------------------------------
     # PTB callback query handlers
@@ -196,7 +237,7 @@ class TelegramAdapter(MessengerAdapter):
             return
 
         # FR5-AC2: only allowed users
-        if query.from_user.id not in self._config.allowed_users:
+        if query.from_user.id not in self._allowed_users:
             return  # silently ignore
 
         data = query.data  # dict: {"request_id": ..., "action": ...}
@@ -207,11 +248,11 @@ class TelegramAdapter(MessengerAdapter):
             if request_id in self._resolved:
                 await query.answer("Already resolved")
                 return
-            self._resolved.add(request_id)
-            # Cancel the timeout task
-            timeout_task = self._pending.pop(request_id, None)
-            if timeout_task:
-                timeout_task.cancel()
+            self._mark_resolved(request_id)
+            # Cancel the timeout timer
+            timeout_handle = self._pending.pop(request_id, None)
+            if timeout_handle:
+                timeout_handle.cancel()
 
         await query.answer()
 
@@ -224,25 +265,14 @@ class TelegramAdapter(MessengerAdapter):
 
         resolved_text = "\n".join([header, *detail_lines])
 
-        try:
-            await self._app.bot.edit_message_text(
-                chat_id=self._config.chat_id,
-                message_id=int(query.message.message_id),
-                text=resolved_text,
-            )
-        except Exception:
-            logger.warning(
-                "Failed to edit Telegram message %s", query.message.message_id, exc_info=True
-            )
-
-        if self._callback:
-            result = ApprovalResult(
-                request_id=request_id,
-                action=action,
-                user_id=str(query.from_user.id),
-                timestamp=time.time(),
-            )
-            await self._callback(result)
+        result = ApprovalResult(
+            request_id=request_id,
+            action=action,
+            user_id=str(query.from_user.id),
+            # Tap time: query.message.date is when the approval was *sent*
+            timestamp=time.time(),
+        )
+        await self._finish(self._edit_message(query.message.message_id, resolved_text), result)
 
     async def _handle_invalid_callback(self, update: Update, context: object) -> None:
         """Handle stale callback data from buttons that survived a restart."""
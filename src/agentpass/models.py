@@ -59,5 +59,7 @@ class AuditEntry:
     resolution: str | None = None
     resolved_by: str | None = None
     resolved_at: float | None = None
+    # Parsed; the JSON API streams the stored text instead of this dataclass
     execution_result: dict[str, Any] | None = None
     agent_id: str = "default"
+    row_id: int | None = None  # audit_log.id once stored; keyset pagination cursor
@@ -3,15 +3,39 @@
 from __future__ import annotations
 
 import re
+import sys
 
 from agentpass.config import ConfigError, ServiceConfig, ToolDefinition
 
+_SIGNATURE_ARG_RE = re.compile(r"\{(\w+)\}")
+
+# One signature part as (is_arg, text) segments: "{domain}.{service}" ->
+# ((True, "domain"), (False, "."), (True, "service"))
+_SignaturePart = tuple[tuple[bool, str], ...]
+
+
+def _compile_signature(signature: str) -> tuple[_SignaturePart, ...]:
+    """Split a signature template into parts of literal and {arg} segments."""
+    if not signature:
+        return ()
+    parts: list[_SignaturePart] = []
+    for part in signature.split(","):
+        # re.split alternates literal text and captured arg names
+        pieces = _SIGNATURE_ARG_RE.split(part.strip())
+        parts.append(tuple((i % 2 == 1, text) for i, text in enumerate(pieces) if text))
+    return tuple(parts)
+
 
 class ToolRegistry:
     """Central registry mapping tool names to definitions and services."""
 
     def __init__(self, tools: dict[str, ToolDefinition]) -> None:
-        self._tools = tools
+        # Interned keys let lookups by config-derived names match on identity
+        self._tools = {sys.intern(name): tool for name, tool in tools.items()}
+        # Reverse index for dispatch: one dict probe per request
+        self._tool_to_service: dict[str, str] = {
+            name: tool.service_name for name, tool in self._tools.items()
+        }
         # Pre-compile arg validators
         self._validators: dict[str, dict[str, re.Pattern]] = {}
         for name, tool in tools.items():
@@ -20,6 +44,14 @@ class ToolRegistry:
                 if arg_def.validate:
                     validators[arg_name] = re.compile(arg_def.validate)
             self._validators[name] = validators
+        self._required: dict[str, frozenset[str]] = {
+            name: frozenset(arg for arg, arg_def in tool.args.items() if arg_def.required)
+            for name, tool in self._tools.items()
+        }
+        # Pre-compile signature templates so evaluation does no regex work
+        self._signatures: dict[str, tuple[_SignaturePart, ...]] = {
+            name: _compile_signature(tool.signature) for name, tool in tools.items()
+        }
 
     def get_tool(self, name: str) -> ToolDefinition | None:
         """Return the tool definition for the given name, or None."""
@@ -27,8 +59,11 @@ class ToolRegistry:
 
     def get_service_name(self, name: str) -> str | None:
         """Return the service name for the given tool, or None."""
-        tool = self._tools.get(name)
-        return tool.service_name if tool else None
+        return self._tool_to_service.get(name)
+
+    def tool_services(self) -> dict[str, str]:
+        """Return the tool name -> service name map (shared; treat as read-only)."""
+        return self._tool_to_service
 
     def get_signature_parts(self, name: str, args: dict) -> list[str] | None:
         """Build signature parts from the tool's signature template.
@@ -38,34 +73,28 @@ class ToolRegistry:
 
         Returns None if tool not in registry (caller should use fallback).
         """
-        tool = self._tools.get(name)
-        if tool is None:
+        template = self._signatures.get(name)
+        if template is None:
             return None
-        if not tool.signature:
-            return []
-        # Split by ", " to get parts, then interpolate each part
-        parts = [p.strip() for p in tool.signature.split(",")]
+        get = args.get
         result: list[str] = []
-        for part in parts:
-            # Replace {arg_name} with actual values, support {a}.{b} composites
-            def replacer(m: re.Match, _args: dict = args) -> str:
-                key = m.group(1)
-                return str(_args.get(key, ""))
-
-            interpolated = re.sub(r"\{(\w+)\}", replacer, part)
-            result.append(interpolated)
+        for segments in template:
+            if len(segments) == 1 and segments[0][0]:
+                # Common case: the whole part is a single {arg}
+                result.append(str(get(segments[0][1], "")))
+            else:
+                result.append(
+                    "".join(str(get(text, "")) if is_arg else text for is_arg, text in segments)
+                )
         return result
 
     def get_arg_validators(self, name: str) -> dict[str, re.Pattern]:
         """Return pre-compiled regex validators for the tool's args."""
         return self._validators.get(name, {})
 
-    def get_required_args(self, name: str) -> set[str]:
+    def get_required_args(self, name: str) -> frozenset[str]:
         """Return the set of required argument names for the tool."""
-        tool = self._tools.get(name)
-        if tool is None:
-            return set()
-        return {arg_name for arg_name, arg_def in tool.args.items() if arg_def.required}
+        return self._required.get(name, frozenset())
 
     def all_tools(self) -> list[ToolDefinition]:
         """Return all tool definitions in the registry."""
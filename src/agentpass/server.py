@@ -3,19 +3,21 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import time
 import uuid
-from datetime import UTC, datetime
+from collections import deque
 from typing import TYPE_CHECKING, Any
 
+import orjson
 from websockets.exceptions import ConnectionClosed
 
 if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
     from agentpass.registry import ToolRegistry
 
-from agentpass.db import Database
+from agentpass.db import Database, dumps_json
 from agentpass.engine import PermissionEngine, build_signature, validate_args
 from agentpass.executor import ExecutionError, Executor
 from agentpass.messenger.base import (
@@ -41,10 +43,49 @@ RATE_LIMIT_EXCEEDED = -32006
 
 AUTH_TIMEOUT = 10  # seconds
 
-
-def _epoch_to_iso(epoch: float) -> str:
-    """Convert epoch float to ISO 8601 string."""
-    return datetime.fromtimestamp(epoch, tz=UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+# Largest JSON-RPC batch accepted in one frame (the client sends at most 32)
+MAX_BATCH_SIZE = 32
+
+# Frames handled concurrently per connection, on top of the ones waiting on an
+# approval (at most max_pending_approvals). Further frames are not read until
+# a handler finishes.
+MAX_CONCURRENT_MESSAGES = 64
+
+
+def _dumps_result(result: dict[str, Any]) -> str:
+    """Encode an offline result for pending_requests.result (TEXT, sent to clients as-is)."""
+    return dumps_json(result).decode()
+
+
+def _error_prefix(code: int, message: str) -> bytes:
+    """Encode an error response up to its id: ``{...,"error":{...},"id":``."""
+    error = orjson.dumps({"code": code, "message": message})
+    return b'{"jsonrpc":"2.0","error":%s,"id":' % error
+
+
+# Envelopes for the fixed error messages, so the hot error paths (rate limit,
+# parse and auth failures) only encode the id. Messages built from request
+# data are encoded per call and not cached, which keeps this table bounded.
+_ERROR_PREFIXES: dict[tuple[int, str], bytes] = {
+    (code, message): _error_prefix(code, message)
+    for code, message in (
+        (PARSE_ERROR, "Parse error"),
+        (INVALID_REQUEST, "Empty batch"),
+        (INVALID_REQUEST, "Invalid request"),
+        (INVALID_REQUEST, "Missing method"),
+        (INVALID_REQUEST, "Missing request id"),
+        (INVALID_REQUEST, "Missing tool name"),
+        (APPROVAL_DENIED, "Denied by user"),
+        (APPROVAL_TIMEOUT, "Approval timed out"),
+        (POLICY_DENIED, "Denied by policy"),
+        (EXECUTION_FAILED, "Internal execution error"),
+        (NOT_AUTHENTICATED, "Authentication timeout"),
+        (NOT_AUTHENTICATED, "Not authenticated"),
+        (NOT_AUTHENTICATED, "Invalid token"),
+        (RATE_LIMIT_EXCEEDED, "Rate limit exceeded"),
+        (RATE_LIMIT_EXCEEDED, "Too many pending approvals"),
+    )
+}
 
 
 class RateLimiter:
@@ -52,16 +93,20 @@ class RateLimiter:
 
     def __init__(self, max_per_minute: int) -> None:
         self._max = max_per_minute
-        self._timestamps: list[float] = []
+        self._timestamps: deque[float] = deque()  # monotonic, oldest first
 
     def check(self) -> bool:
         """Return True if request is allowed, False if rate limited."""
+        # Float seconds: monotonic_ns() ints are heap objects too at this size,
+        # and measured slower here (larger values, int subtraction)
         now = time.monotonic()
-        # Remove timestamps older than 60 seconds
-        self._timestamps = [t for t in self._timestamps if now - t < 60]
-        if len(self._timestamps) >= self._max:
+        # Drop timestamps older than 60 seconds; they are all at the head
+        timestamps = self._timestamps
+        while timestamps and now - timestamps[0] >= 60:
+            timestamps.popleft()
+        if len(timestamps) >= self._max:
             return False
-        self._timestamps.append(now)
+        timestamps.append(now)
         return True
 
 
@@ -98,6 +143,12 @@ class GatewayServer:
         self._agent_connected = False
         self._agent_ws: Any = None  # Current WebSocket connection
         self._resolve_lock = asyncio.Lock()
+        # JSON-RPC method -> handler(websocket, msg, msg_id)
+        self._methods: dict[str, Callable[[Any, dict, Any], Awaitable[None]]] = {
+            "tool_request": self._handle_tool_request,
+            "get_pending_results": self._handle_get_pending_results,
+            "list_tools": self._handle_list_tools,
+        }
 
     async def health_status(self) -> dict[str, Any]:
         """Return health status of all components."""
@@ -133,12 +184,35 @@ class GatewayServer:
             if not authenticated:
                 return
 
-            # Phase 2: Message loop — each message gets its own task
+            # Phase 2: Message loop — tool requests (and batches, which may
+            # hold them) can wait minutes on an approval, so each gets its own
+            # task, up to the in-flight limit; past it, reading pauses
+            # (backpressure). Everything else is answered inline, without a task.
             tasks: set[asyncio.Task] = set()
+            # Per connection: tasks of a dropped connection still waiting on an
+            # approval must not eat into the budget of the agent that reconnects
+            inflight = asyncio.Semaphore(self._max_pending + MAX_CONCURRENT_MESSAGES)
             async for raw_message in websocket:
-                task = asyncio.create_task(self._handle_message(websocket, raw_message))
+                try:
+                    msg = orjson.loads(raw_message)
+                except orjson.JSONDecodeError:
+                    await self._send_error(websocket, PARSE_ERROR, "Parse error", None)
+                    continue
+
+                if isinstance(msg, dict) and msg.get("method") != "tool_request":
+                    try:
+                        await self._dispatch(websocket, msg)
+                    except ConnectionClosed:
+                        raise
+                    except Exception:
+                        logger.exception("Unhandled error in request")
+                    continue
+
+                await inflight.acquire()
+                task = asyncio.create_task(self._handle_message(websocket, msg))
                 tasks.add(task)
                 task.add_done_callback(tasks.discard)
+                task.add_done_callback(lambda _: inflight.release())
 
             # Wait for in-flight message tasks to finish
             if tasks:
@@ -160,8 +234,8 @@ class GatewayServer:
             return False
 
         try:
-            msg = json.loads(raw)
-        except json.JSONDecodeError:
+            msg = orjson.loads(raw)
+        except orjson.JSONDecodeError:
             await self._send_error(websocket, PARSE_ERROR, "Parse error", None)
             await websocket.close()
             return False
@@ -182,13 +256,39 @@ class GatewayServer:
         logger.info("Agent authenticated")
         return True
 
-    async def _handle_message(self, websocket: Any, raw_message: str) -> None:
-        """Process a single JSON-RPC message."""
-        # Parse
-        try:
-            msg = json.loads(raw_message)
-        except json.JSONDecodeError:
-            await self._send_error(websocket, PARSE_ERROR, "Parse error", None)
+    async def _handle_message(self, websocket: Any, msg: Any) -> None:
+        """Process a decoded JSON-RPC message or batch."""
+        if isinstance(msg, list):
+            await self._handle_batch(websocket, msg)
+        else:
+            await self._dispatch(websocket, msg)
+
+    async def _handle_batch(self, websocket: Any, batch: list) -> None:
+        """Process a JSON-RPC batch concurrently.
+
+        Each request is answered with its own response frame as soon as it
+        completes: approvals can take minutes, so fast results are not held
+        back to be returned together as a single array.
+        """
+        if not batch:
+            await self._send_error(websocket, INVALID_REQUEST, "Empty batch", None)
+            return
+        if len(batch) > MAX_BATCH_SIZE:
+            await self._send_error(
+                websocket, INVALID_REQUEST, f"Batch exceeds {MAX_BATCH_SIZE} requests", None
+            )
+            return
+        results = await asyncio.gather(
+            *(self._dispatch(websocket, m) for m in batch), return_exceptions=True
+        )
+        for exc in results:
+            if isinstance(exc, Exception):
+                logger.error("Unhandled error in batch request", exc_info=exc)
+
+    async def _dispatch(self, websocket: Any, msg: Any) -> None:
+        """Route one decoded JSON-RPC request to its method handler."""
+        if not isinstance(msg, dict):
+            await self._send_error(websocket, INVALID_REQUEST, "Invalid request", None)
             return
 
         msg_id = msg.get("id")
@@ -198,14 +298,12 @@ class GatewayServer:
             await self._send_error(websocket, INVALID_REQUEST, "Missing method", msg_id)
             return
 
-        if method == "tool_request":
-            await self._handle_tool_request(websocket, msg, msg_id)
-        elif method == "get_pending_results":
-            await self._handle_get_pending_results(websocket, msg_id)
-        elif method == "list_tools":
-            await self._handle_list_tools(websocket, msg_id)
-        else:
+        # Non-string methods (e.g. a JSON array) are unhashable; treat as unknown
+        handler = self._methods.get(method) if isinstance(method, str) else None
+        if handler is None:
             await self._send_error(websocket, METHOD_NOT_FOUND, f"Unknown method: {method}", msg_id)
+            return
+        await handler(websocket, msg, msg_id)
 
     async def _handle_tool_request(self, websocket: Any, msg: dict, msg_id: Any) -> None:
         """Process a tool_request."""
@@ -290,14 +388,13 @@ class GatewayServer:
         request_id = request.id
 
         # Store in DB
-        expires_at_epoch = time.time() + self._approval_timeout
-        expires_at_iso = _epoch_to_iso(expires_at_epoch)
+        expires_at = time.time() + self._approval_timeout
         await self._db.insert_pending(
             request_id=request_id,
             tool_name=request.tool_name,
             args=request.args,
             signature=request.signature,
-            expires_at=expires_at_iso,
+            expires_at=expires_at,
         )
 
         # Send to messenger
@@ -320,7 +417,7 @@ class GatewayServer:
             request=request,
             future=future,
             message_id=message_id,
-            expires_at=expires_at_epoch,
+            expires_at=expires_at,
         )
         self._pending[request_id] = pending
 
@@ -337,29 +434,25 @@ class GatewayServer:
 
             if result.action == "allow":
                 exec_result = await self._execute_and_respond(websocket, request, msg_id)
-                await self._db.update_audit_resolution(
-                    request_id=request_id,
-                    resolution=resolution,
-                    resolved_by=result.user_id,
-                    resolved_at=result.timestamp,
-                    execution_result=exec_result,
-                )
             else:
-                await self._db.update_audit_resolution(
-                    request_id=request_id,
-                    resolution=resolution,
-                    resolved_by=result.user_id,
-                    resolved_at=result.timestamp,
-                )
+                exec_result = None
                 error_code = APPROVAL_TIMEOUT if result.user_id == "timeout" else APPROVAL_DENIED
                 error_msg = (
                     "Approval timed out" if result.user_id == "timeout" else "Denied by user"
                 )
                 await self._send_error(websocket, error_code, error_msg, msg_id)
 
-            # Agent received the response, clean up DB
+            # Agent received the response, clean up DB. The queued pending row
+            # deletion is committed together with the audit update.
             self._pending.pop(request_id, None)
             await self._db.delete_pending(request_id)
+            await self._db.update_audit_resolution(
+                request_id=request_id,
+                resolution=resolution,
+                resolved_by=result.user_id,
+                resolved_at=result.timestamp,
+                execution_result=exec_result,
+            )
 
         except ConnectionClosed:
             # Agent disconnected while waiting — keep pending in DB for offline retrieval
@@ -416,15 +509,15 @@ class GatewayServer:
         if result.action == "allow":
             try:
                 exec_data = await self._executor.execute(request.tool_name, request.args)
-                result_json = json.dumps({"status": "executed", "data": exec_data})
+                stored = _dumps_result({"status": "executed", "data": exec_data})
             except Exception:
                 logger.exception("Offline execution failed for %s", request_id)
-                result_json = json.dumps({"status": "error", "data": "Execution failed"})
+                stored = _dumps_result({"status": "error", "data": "Execution failed"})
         else:
             reason = "Approval timed out" if result.user_id == "timeout" else "Denied by user"
-            result_json = json.dumps({"status": "denied", "data": reason})
+            stored = _dumps_result({"status": "denied", "data": reason})
 
-        await self._db.update_pending_result(request_id, result_json)
+        await self._db.update_pending_result(request_id, stored)
 
     @staticmethod
     def _resolution_label(result: ApprovalResult) -> str:
@@ -442,7 +535,7 @@ class GatewayServer:
             if pending and not pending.future.done():
                 pending.future.set_result(result)
 
-    async def _handle_get_pending_results(self, websocket: Any, msg_id: Any) -> None:
+    async def _handle_get_pending_results(self, websocket: Any, msg: dict, msg_id: Any) -> None:
         """Return any stored results from approvals resolved while agent was disconnected."""
         results = await self._db.get_completed_results()
         await self._send_result(websocket, {"results": results}, msg_id)
@@ -452,7 +545,7 @@ class GatewayServer:
             request_ids = [r["request_id"] for r in results]
             await self._db.delete_completed_results(request_ids)
 
-    async def _handle_list_tools(self, websocket: Any, msg_id: Any) -> None:
+    async def _handle_list_tools(self, websocket: Any, msg: dict, msg_id: Any) -> None:
         """Return available tool definitions."""
         if self._registry is None:
             await self._send_result(websocket, {"tools": []}, msg_id)
@@ -479,14 +572,19 @@ class GatewayServer:
         await self._send_result(websocket, {"tools": tools}, msg_id)
 
     async def resolve_all_pending(self, reason: str = "gateway_shutdown") -> None:
-        """Resolve all pending approvals (called during shutdown)."""
-        for request_id, pending in list(self._pending.items()):
+        """Resolve all pending approvals (called during shutdown).
+
+        set_result() only schedules each waiter, so they all resume together in
+        the next loop pass; the futures are done when this returns.
+        """
+        now = time.time()
+        for pending in tuple(self._pending.values()):
             if not pending.future.done():
                 result = ApprovalResult(
-                    request_id=request_id,
+                    request_id=pending.request.id,
                     action="deny",
                     user_id=reason,
-                    timestamp=time.time(),
+                    timestamp=now,
                 )
                 pending.future.set_result(result)
 
@@ -495,13 +593,9 @@ class GatewayServer:
     async def _send_result(self, websocket: Any, result: Any, msg_id: Any) -> None:
         """Send a JSON-RPC success response."""
         response = {"jsonrpc": "2.0", "result": result, "id": msg_id}
-        await websocket.send(json.dumps(response))
+        await websocket.send(dumps_json(response), text=True)
 
     async def _send_error(self, websocket: Any, code: int, message: str, msg_id: Any) -> None:
         """Send a JSON-RPC error response."""
-        response = {
-            "jsonrpc": "2.0",
-            "error": {"code": code, "message": message},
-            "id": msg_id,
-        }
-        await websocket.send(json.dumps(response))
+        prefix = _ERROR_PREFIXES.get((code, message)) or _error_prefix(code, message)
+        await websocket.send(b"%s%s}" % (prefix, dumps_json(msg_id)), text=True)
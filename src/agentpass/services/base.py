@@ -9,6 +9,9 @@ from typing import Any
 class ServiceHandler(ABC):
     """Interface for service integrations."""
 
+    async def start(self) -> None:  # noqa: B027 -- optional hook, no-op by default
+        """Acquire long-lived resources before the first call."""
+
     @abstractmethod
     async def execute(self, tool_name: str, args: dict[str, Any]) -> dict[str, Any]:
         """Execute a tool call and return the result."""
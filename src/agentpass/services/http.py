@@ -2,14 +2,101 @@
 
 from __future__ import annotations
 
+import asyncio
 import re
+from collections.abc import Callable
+from dataclasses import dataclass
 from typing import Any
 
 import aiohttp
+import orjson
 
 from agentpass.config import ServiceConfig, ToolDefinition
 from agentpass.services.base import ServiceHandler
 
+_PATH_ARG_RE = re.compile(r"\{(\w+)\}")
+
+# A path template as (is_arg, text) segments: "/api/states/{entity_id}" ->
+# ((False, "/api/states/"), (True, "entity_id"))
+_PathTemplate = tuple[tuple[bool, str], ...]
+
+
+def _compile_path(path: str) -> _PathTemplate:
+    """Split a path template into literal and {arg} segments."""
+    # re.split alternates literal text and captured arg names
+    pieces = _PATH_ARG_RE.split(path)
+    return tuple((i % 2 == 1, text) for i, text in enumerate(pieces) if text)
+
+
+# One connection pool (and DNS cache) for every HTTP service on the gateway
+_CONNECTOR_LIMIT = 100
+_DNS_CACHE_TTL = 300
+_KEEPALIVE_TIMEOUT = 60
+
+# (event loop, connector): a connector is bound to the loop it was created on
+_shared_connector: tuple[asyncio.AbstractEventLoop, aiohttp.TCPConnector] | None = None
+
+
+def _get_connector() -> aiohttp.TCPConnector:
+    """Return the shared connector for the running loop, creating it if needed."""
+    global _shared_connector
+    loop = asyncio.get_running_loop()
+    if _shared_connector is not None:
+        owner, connector = _shared_connector
+        if owner is loop and not connector.closed:
+            return connector
+    connector = aiohttp.TCPConnector(
+        limit=_CONNECTOR_LIMIT,
+        ttl_dns_cache=_DNS_CACHE_TTL,
+        keepalive_timeout=_KEEPALIVE_TIMEOUT,
+    )
+    _shared_connector = (loop, connector)
+    return connector
+
+
+async def close_shared_connector() -> None:
+    """Close the shared connection pool; call once at shutdown, after all services."""
+    global _shared_connector
+    if _shared_connector is not None:
+        _, connector = _shared_connector
+        _shared_connector = None
+        await connector.close()
+
+
+def _json_dumps(obj: Any) -> str:
+    """orjson-backed serializer for aiohttp's json= (which expects str)."""
+    return orjson.dumps(obj).decode()
+
+
+_BODY_METHODS = frozenset({"POST", "PUT", "PATCH"})
+
+
+@dataclass(frozen=True, slots=True)
+class _CompiledRequest:
+    """Per-tool request plumbing resolved once from its RequestDefinition."""
+
+    method: str  # as written in YAML, e.g. "GET"
+    url: _PathTemplate  # base URL folded into the leading literal segment
+    send_body: bool
+    body_exclude: frozenset[str]
+    wrap: str | None
+
+
+def _compile_request(base_url: str, tool: ToolDefinition) -> _CompiledRequest:
+    """Build the _CompiledRequest for a tool that has a request definition."""
+    path = _compile_path(tool.request.path)
+    if path and not path[0][0]:
+        url = ((False, base_url + path[0][1]), *path[1:])
+    else:
+        url = ((False, base_url), *path)
+    return _CompiledRequest(
+        method=tool.request.method,
+        url=url,
+        send_body=tool.request.method in _BODY_METHODS,
+        body_exclude=frozenset(tool.request.body_exclude or ()),
+        wrap=tool.response.wrap if tool.response else None,
+    )
+
 
 class HTTPServiceError(Exception):
     """Raised when a generic HTTP service call fails."""
@@ -28,37 +115,67 @@ class GenericHTTPService(ServiceHandler):
         self._config = config
         self._base_url = config.url.rstrip("/")
         self._session: aiohttp.ClientSession | None = None
+        # Bound session methods keyed by HTTP method ("GET" -> session.get)
+        self._method_fns: dict[str, Callable] = {}
         # Index tools by name for fast lookup
         self._tools: dict[str, ToolDefinition] = {t.name: t for t in config.tools}
+        # Resolve URL template, body rules and wrapping once per tool
+        self._requests: dict[str, _CompiledRequest] = {
+            t.name: _compile_request(self._base_url, t)
+            for t in config.tools
+            if t.request is not None
+        }
+        # Resolve auth once: session-level headers/basic auth, or per-request query params
+        auth = config.auth
+        self._auth_headers: dict[str, str] = {}
+        self._auth_basic: aiohttp.BasicAuth | None = None
+        self._auth_query_params: dict[str, str] | None = None
+        if auth.type == "bearer":
+            self._auth_headers["Authorization"] = f"Bearer {auth.token}"
+        elif auth.type == "header":
+            self._auth_headers[auth.header_name] = auth.token
+        elif auth.type == "basic":
+            self._auth_basic = aiohttp.BasicAuth(auth.username, auth.password)
+        elif auth.type == "query":
+            self._auth_query_params = {auth.query_param: auth.token}
 
     def _get_session(self) -> aiohttp.ClientSession:
         """Return existing session or create new one with auth headers."""
         if self._session is None or self._session.closed:
-            headers: dict[str, str] = {}
-            auth_obj: aiohttp.BasicAuth | None = None
-
-            if self._config.auth.type == "bearer":
-                headers["Authorization"] = f"Bearer {self._config.auth.token}"
-            elif self._config.auth.type == "header":
-                headers[self._config.auth.header_name] = self._config.auth.token
-            elif self._config.auth.type == "basic":
-                auth_obj = aiohttp.BasicAuth(self._config.auth.username, self._config.auth.password)
-            # query auth is handled per-request in _execute_request
-
-            self._session = aiohttp.ClientSession(headers=headers, auth=auth_obj)
+            self._session = aiohttp.ClientSession(
+                headers=self._auth_headers,
+                auth=self._auth_basic,
+                json_serialize=_json_dumps,
+                connector=_get_connector(),
+                connector_owner=False,
+            )
+            self._method_fns.clear()
         return self._session
 
+    def _method_fn(self, session: aiohttp.ClientSession, method: str) -> Callable:
+        """Return the session's bound request method for an HTTP method name."""
+        fn = self._method_fns.get(method)
+        if fn is None:
+            fn = self._method_fns[method] = getattr(session, method.lower())
+        return fn
+
+    async def start(self) -> None:
+        """Create the session up front so requests skip the lazy-init path."""
+        self._get_session()
+
     async def execute(self, tool_name: str, args: dict[str, Any]) -> dict[str, Any]:
         """Execute a tool request based on its YAML definition."""
-        tool = self._tools.get(tool_name)
-        if tool is None:
-            raise HTTPServiceError(f"Unknown tool: {tool_name}")
-        if tool.request is None:
+        request = self._requests.get(tool_name)
+        if request is None:
+            if tool_name not in self._tools:
+                raise HTTPServiceError(f"Unknown tool: {tool_name}")
             raise HTTPServiceError(f"Tool {tool_name} has no request definition")
 
-        session = self._get_session()
+        session = self._session
+        if session is None or session.closed:  # e.g. its shared connector was closed
+            session = self._get_session()
         try:
-            return await self._execute_request(session, tool, args)
+            return await self._execute_request(session, request, args)
         except HTTPServiceError:
             raise
         except aiohttp.ClientError as exc:
@@ -67,53 +184,44 @@ class GenericHTTPService(ServiceHandler):
     async def _execute_request(
         self,
         session: aiohttp.ClientSession,
-        tool: ToolDefinition,
+        request: _CompiledRequest,
         args: dict[str, Any],
     ) -> dict[str, Any]:
         """Build and send the HTTP request defined by the tool."""
-        # 1. Interpolate path template
-        path = self._interpolate_path(tool.request.path, args)
-        url = f"{self._base_url}{path}"
-
-        # 2. Build query params (for query auth)
-        params: dict[str, str] = {}
-        if self._config.auth.type == "query":
-            params[self._config.auth.query_param] = self._config.auth.token
+        # 1. Interpolate URL template
+        url = self._render_path(request.url, args)
 
-        # 3. Build body for POST/PUT/PATCH
+        # 2. Build body for POST/PUT/PATCH
         body: dict[str, Any] | None = None
-        if tool.request.method in ("POST", "PUT", "PATCH"):
-            body = self._build_body(tool, args)
+        if request.send_body:
+            body = self._build_body(request.body_exclude, args)
 
-        # 4. Make request
-        method = tool.request.method.lower()
-        method_fn = getattr(session, method)
-        async with method_fn(url, json=body, params=params or None) as resp:
+        # 3. Make request (query auth params are precomputed)
+        method_fn = self._method_fn(session, request.method)
+        async with method_fn(url, json=body, params=self._auth_query_params) as resp:
             await self._check_response(resp)
-            data = await resp.json()
+            data = await resp.json(loads=orjson.loads)
 
-            # 5. Response wrapping
-            if tool.response and tool.response.wrap:
-                return {tool.response.wrap: data}
+            # 4. Response wrapping
+            if request.wrap:
+                return {request.wrap: data}
             return data
 
     @staticmethod
-    def _interpolate_path(path: str, args: dict[str, Any]) -> str:
-        """Replace {arg_name} placeholders in path with actual values."""
-
-        def replacer(m: re.Match) -> str:
-            key = m.group(1)
-            val = args.get(key, "")
-            return str(val)
-
-        return re.sub(r"\{(\w+)\}", replacer, path)
+    def _render_path(template: _PathTemplate, args: dict[str, Any]) -> str:
+        """Fill {arg_name} segments of a compiled path with actual values."""
+        get = args.get
+        return "".join(str(get(text, "")) if is_arg else text for is_arg, text in template)
 
     @staticmethod
-    def _build_body(tool: ToolDefinition, args: dict[str, Any]) -> dict[str, Any]:
-        """Build request body, excluding specified args."""
-        if tool.request.body_exclude:
-            return {k: v for k, v in args.items() if k not in tool.request.body_exclude}
-        return dict(args)
+    def _build_body(exclude: frozenset[str], args: dict[str, Any]) -> dict[str, Any]:
+        """Build request body, excluding specified args.
+
+        Without exclusions args itself is the body (no copy); it is only serialized.
+        """
+        if exclude:
+            return {k: v for k, v in args.items() if k not in exclude}
+        return args
 
     async def _check_response(self, resp: aiohttp.ClientResponse) -> None:
         """Check HTTP response status, using service-level error mappings."""
@@ -142,7 +250,7 @@ class GenericHTTPService(ServiceHandler):
         try:
             session = self._get_session()
             health = self._config.health
-            method_fn = getattr(session, health.method.lower())
+            method_fn = self._method_fn(session, health.method)
             async with method_fn(
                 f"{self._base_url}{health.path}",
                 timeout=aiohttp.ClientTimeout(total=5),
@@ -155,7 +263,8 @@ class GenericHTTPService(ServiceHandler):
             return False
 
     async def close(self) -> None:
-        """Close the aiohttp session."""
+        """Close the aiohttp session (the shared connector stays open)."""
         if self._session is not None and not self._session.closed:
             await self._session.close()
         self._session = None
+        self._method_fns.clear()
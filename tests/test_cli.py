@@ -5,7 +5,7 @@ from __future__ import annotations
 import asyncio
 import json
 from argparse import Namespace
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -16,6 +16,7 @@ from agentpass.cli import (
     EXIT_SUCCESS,
     EXIT_TIMEOUT,
     parse_key_value_args,
+    run_client_command,
     run_pending,
     run_request,
     run_tools,
@@ -59,6 +60,10 @@ class TestParseKeyValueArgs:
         result = parse_key_value_args(["key=value=more"])
         assert result == {"key": "value=more"}
 
+    def test_empty_value(self):
+        """Trailing = yields an empty string value."""
+        assert parse_key_value_args(["key="]) == {"key": ""}
+
     def test_missing_equals_raises(self):
         """Argument without = sign raises ValueError."""
         with pytest.raises(ValueError, match="Invalid argument format"):
@@ -118,6 +123,26 @@ class TestRunRequest:
         output = json.loads(capsys.readouterr().out)
         assert output == {"state": "on", "attributes": {}}
 
+    @pytest.mark.asyncio
+    async def test_success_output_is_indented_utf8(self, capsys):
+        """Result JSON is indented and non-ASCII text is written as UTF-8."""
+        args = Namespace(
+            url="wss://gw:8443",
+            token="test-token",
+            tool="ha_get_state",
+            args=["entity_id=sensor.temp"],
+            timeout=900.0,
+        )
+        mock_client = _make_mock_client(
+            tool_request=AsyncMock(return_value={"state": "21.3 °C"}),
+        )
+
+        with patch(_CLI_PATCH, return_value=mock_client):
+            exit_code = await run_request(args)
+
+        assert exit_code == EXIT_SUCCESS
+        assert capsys.readouterr().out == '{\n  "state": "21.3 °C"\n}\n'
+
     @pytest.mark.asyncio
     async def test_denied_prints_error(self, capsys):
         """AgentPassDenied returns exit code 1 with error on stderr."""
@@ -240,7 +265,7 @@ class TestRunRequest:
 
     @pytest.mark.asyncio
     async def test_client_timeout(self, capsys):
-        """asyncio.TimeoutError from wait_for returns exit code 2."""
+        """asyncio.TimeoutError from the request timeout returns exit code 2."""
         args = Namespace(
             url="wss://gw:8443",
             token="test-token",
@@ -249,7 +274,7 @@ class TestRunRequest:
             timeout=0.001,
         )
 
-        # Make tool_request hang forever so wait_for times out
+        # Make tool_request hang forever so the timeout fires
         async def hang_forever(*args, **kwargs):
             await asyncio.sleep(999)
 
@@ -378,3 +403,34 @@ class TestRunPending:
         assert exit_code == EXIT_CONNECTION_ERROR
         stderr = capsys.readouterr().err
         assert "Connection failed" in stderr
+
+
+# ---------------------------------------------------------------------------
+# run_client_command tests
+# ---------------------------------------------------------------------------
+
+
+class TestRunClientCommand:
+    """Tests for the run_client_command() event-loop runner."""
+
+    def test_returns_coroutine_exit_code(self):
+        """Without uvloop the default asyncio loop runs the command."""
+
+        async def command() -> int:
+            return EXIT_TIMEOUT
+
+        with patch("agentpass.cli.uvloop", None):
+            assert run_client_command(command()) == EXIT_TIMEOUT
+
+    def test_uses_uvloop_when_installed(self):
+        """When uvloop is importable its loop factory is used."""
+        fake_uvloop = MagicMock()
+        fake_uvloop.new_event_loop = MagicMock(side_effect=asyncio.new_event_loop)
+
+        async def command() -> int:
+            return EXIT_SUCCESS
+
+        with patch("agentpass.cli.uvloop", fake_uvloop):
+            assert run_client_command(command()) == EXIT_SUCCESS
+
+        fake_uvloop.new_event_loop.assert_called_once()
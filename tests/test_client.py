@@ -5,17 +5,21 @@ from __future__ import annotations
 import asyncio
 import contextlib
 import json
-from unittest.mock import AsyncMock, patch
+import socket
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import orjson
 import pytest
 import websockets.exceptions
 
 from agentpass.client import (
+    _SO_BUSY_POLL,
     AgentPassClient,
     AgentPassConnectionError,
     AgentPassDenied,
     AgentPassError,
     AgentPassTimeout,
+    _norm_id,
 )
 
 # ---------------------------------------------------------------------------
@@ -34,8 +38,12 @@ class MockWebSocket:
     async def send(self, data: str) -> None:
         self._sent.append(data)
 
-    async def recv(self) -> str:
-        return await self._to_receive.get()
+    async def recv(self, decode: bool | None = None) -> str:
+        try:
+            return await asyncio.wait_for(self._to_receive.get(), timeout=0.1)
+        except TimeoutError:
+            # Nothing left to read: behave like a cleanly closed connection
+            raise websockets.exceptions.ConnectionClosedOK(None, None) from None
 
     async def close(self) -> None:
         self._closed = True
@@ -44,24 +52,15 @@ class MockWebSocket:
         """Queue a message for the client to receive."""
         self._to_receive.put_nowait(data)
 
-    def __aiter__(self):
-        return self
-
-    async def __anext__(self) -> str:
-        try:
-            return await asyncio.wait_for(self._to_receive.get(), timeout=0.1)
-        except (TimeoutError, asyncio.CancelledError):
-            raise StopAsyncIteration from None
-
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-AUTH_SUCCESS = json.dumps({"jsonrpc": "2.0", "result": {"status": "authenticated"}, "id": "auth-1"})
+AUTH_SUCCESS = json.dumps({"jsonrpc": "2.0", "result": {"status": "authenticated"}, "id": 0})
 
 
-def _tool_result(request_id: int, data: dict) -> str:
+def _tool_result(request_id: int | str, data: dict) -> str:
     return json.dumps(
         {
             "jsonrpc": "2.0",
@@ -142,8 +141,10 @@ class TestConnectAndAuthenticate:
         client = AgentPassClient("ws://localhost:8443", "test-token")
         await client.connect()
 
-        # Verify websockets.connect was called with the URL
-        patch_connect.assert_called_once_with("ws://localhost:8443")
+        # Verify websockets.connect was called with the URL, compression disabled
+        patch_connect.assert_called_once_with(
+            "ws://localhost:8443", compression=None, max_size=2**22
+        )
 
         # Verify auth message was sent
         assert len(mock_ws._sent) == 1
@@ -151,7 +152,7 @@ class TestConnectAndAuthenticate:
         assert auth_msg["jsonrpc"] == "2.0"
         assert auth_msg["method"] == "auth"
         assert auth_msg["params"]["token"] == "test-token"
-        assert auth_msg["id"] == "auth-1"
+        assert auth_msg["id"] == 0
 
         # Verify reader task is running
         assert client._reader_task is not None
@@ -159,6 +160,37 @@ class TestConnectAndAuthenticate:
 
         await client.close()
 
+    async def test_low_latency_tunes_socket(self, mock_ws, patch_connect):
+        """low_latency sets TCP_NODELAY and SO_BUSY_POLL on the underlying socket."""
+        mock_ws.feed(AUTH_SUCCESS)
+        sock = MagicMock()
+        mock_ws.transport = MagicMock()
+        mock_ws.transport.get_extra_info.return_value = sock
+
+        client = AgentPassClient("ws://localhost:8443", "test-token", low_latency=True)
+        with patch("agentpass.client.sys.platform", "linux"):
+            await client.connect()
+
+        mock_ws.transport.get_extra_info.assert_called_once_with("socket")
+        sock.setsockopt.assert_any_call(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt.assert_any_call(socket.SOL_SOCKET, _SO_BUSY_POLL, 50)
+
+        await client.close()
+
+    async def test_low_latency_ignores_permission_error(self, mock_ws, patch_connect):
+        """Busy polling without CAP_NET_ADMIN fails quietly; connect still succeeds."""
+        mock_ws.feed(AUTH_SUCCESS)
+        sock = MagicMock()
+        sock.setsockopt.side_effect = PermissionError(1, "Operation not permitted")
+        mock_ws.transport = MagicMock()
+        mock_ws.transport.get_extra_info.return_value = sock
+
+        client = AgentPassClient("ws://localhost:8443", "test-token", low_latency=True)
+        await client.connect()
+
+        assert client._connected.is_set()
+        await client.close()
+
     async def test_auth_failure_invalid_token(self, mock_ws, patch_connect):
         """Server returns error, client raises AgentPassConnectionError."""
         mock_ws.feed(
@@ -166,7 +198,7 @@ class TestConnectAndAuthenticate:
                 {
                     "jsonrpc": "2.0",
                     "error": {"code": -32005, "message": "Invalid token"},
-                    "id": "auth-1",
+                    "id": 0,
                 }
             )
         )
@@ -186,7 +218,7 @@ class TestConnectAndAuthenticate:
                 {
                     "jsonrpc": "2.0",
                     "result": {"status": "something_else"},
-                    "id": "auth-1",
+                    "id": 0,
                 }
             )
         )
@@ -353,6 +385,68 @@ class TestToolRequests:
 
         await client.close()
 
+    async def test_tool_request_sends_bytes_frame(self, mock_ws, patch_connect):
+        """Requests are sent as orjson-encoded bytes, not re-encoded str."""
+        mock_ws.feed(AUTH_SUCCESS)
+
+        client = AgentPassClient("ws://localhost:8443", "test-token")
+        await client.connect()
+
+        async def respond():
+            await asyncio.sleep(0.01)
+            mock_ws.feed(_tool_result(1, {"state": "on"}))
+
+        _task = asyncio.create_task(respond())  # noqa: RUF006
+        await client.tool_request("ha_get_state", entity_id="light.kitchen")
+
+        assert isinstance(mock_ws._sent[-1], bytes)
+        assert json.loads(mock_ws._sent[-1])["params"]["args"] == {"entity_id": "light.kitchen"}
+
+        await client.close()
+
+    async def test_tool_request_resolved_by_stringified_id(self, mock_ws, patch_connect):
+        """A response echoing the id as a digit string still resolves the request."""
+        mock_ws.feed(AUTH_SUCCESS)
+
+        client = AgentPassClient("ws://localhost:8443", "test-token")
+        await client.connect()
+
+        async def respond():
+            await asyncio.sleep(0.01)
+            mock_ws.feed(_tool_result("1", {"state": "off"}))
+
+        _task = asyncio.create_task(respond())  # noqa: RUF006
+        result = await client.tool_request("ha_get_state", entity_id="light.hall")
+        assert result == {"state": "off"}
+
+        await client.close()
+
+    async def test_tool_request_frame_escapes_spliced_values(self, mock_ws, patch_connect):
+        """Tool names and args spliced into the pre-encoded envelope stay valid JSON."""
+        mock_ws.feed(AUTH_SUCCESS)
+
+        client = AgentPassClient("ws://localhost:8443", 'tok"en')
+        await client.connect()
+
+        async def respond():
+            await asyncio.sleep(0.01)
+            mock_ws.feed(_tool_result(1, {}))
+
+        _task = asyncio.create_task(respond())  # noqa: RUF006
+        await client.tool_request('we"ird\\tool', note='quote " and ümlaut')
+
+        auth = json.loads(mock_ws._sent[0])
+        assert auth["params"]["token"] == 'tok"en'
+        sent = json.loads(mock_ws._sent[-1])
+        assert sent == {
+            "jsonrpc": "2.0",
+            "method": "tool_request",
+            "params": {"tool": 'we"ird\\tool', "args": {"note": 'quote " and ümlaut'}},
+            "id": 1,
+        }
+
+        await client.close()
+
 
 # ---------------------------------------------------------------------------
 # T1-4: Concurrent requests
@@ -429,6 +523,178 @@ class TestClose:
         assert reader_task.done()
         assert client._ws is None
 
+    async def test_close_cancels_writer(self, mock_ws, patch_connect):
+        """Writer task is cancelled on close."""
+        mock_ws.feed(AUTH_SUCCESS)
+
+        client = AgentPassClient("ws://localhost:8443", "test-token")
+        await client.connect()
+
+        writer_task = client._writer_task
+        assert writer_task is not None
+        assert not writer_task.done()
+
+        await client.close()
+
+        assert writer_task.done()
+
+    @pytest.mark.parametrize("method", ["tool_request", "list_tools", "get_pending_results"])
+    async def test_calls_after_close_raise(self, mock_ws, patch_connect, method):
+        """Every request method fails fast on a closed client and leaves nothing pending."""
+        mock_ws.feed(AUTH_SUCCESS)
+
+        client = AgentPassClient("ws://localhost:8443", "test-token")
+        await client.connect()
+        await client.close()
+
+        args = ("ha_get_state",) if method == "tool_request" else ()
+        with pytest.raises(AgentPassConnectionError, match="Client is closed"):
+            await getattr(client, method)(*args)
+        assert client._pending == {}
+
+
+# ---------------------------------------------------------------------------
+# T1-6b: Send queue / writer task
+# ---------------------------------------------------------------------------
+
+
+class TestWriteLoop:
+    async def test_queued_frames_sent_in_order(self, mock_ws, patch_connect):
+        """Frames queued by concurrent callers are written in FIFO order."""
+        mock_ws.feed(AUTH_SUCCESS)
+
+        client = AgentPassClient("ws://localhost:8443", "test-token")
+        await client.connect()
+
+        tasks = [
+            asyncio.create_task(client.tool_request("ha_get_state", entity_id=f"sensor.t{i}"))
+            for i in range(5)
+        ]
+        for _ in range(20):
+            await asyncio.sleep(0)
+
+        sent_ids = [json.loads(frame)["id"] for frame in mock_ws._sent[1:]]
+        assert sent_ids == [1, 2, 3, 4, 5]
+
+        for i in range(1, 6):
+            mock_ws.feed(_tool_result(i, {"n": i}))
+        results = await asyncio.gather(*tasks)
+        assert results == [{"n": i} for i in range(1, 6)]
+
+        await client.close()
+
+    async def test_batch_requests_sent_as_one_array(self, mock_ws, patch_connect):
+        """With batch_requests, frames drained together go out as one JSON-RPC batch."""
+        mock_ws.feed(AUTH_SUCCESS)
+
+        client = AgentPassClient("ws://localhost:8443", "test-token", batch_requests=True)
+        await client.connect()
+
+        tasks = [
+            asyncio.create_task(client.tool_request("ha_get_state", entity_id=f"sensor.t{i}"))
+            for i in range(3)
+        ]
+        for _ in range(20):
+            await asyncio.sleep(0)
+
+        assert len(mock_ws._sent) == 2
+        batch = json.loads(mock_ws._sent[1])
+        assert [m["id"] for m in batch] == [1, 2, 3]
+
+        mock_ws.feed(json.dumps([json.loads(_tool_result(i, {"n": i})) for i in (3, 1, 2)]))
+        results = await asyncio.gather(*tasks)
+        assert results == [{"n": 1}, {"n": 2}, {"n": 3}]
+
+        await client.close()
+
+    async def test_single_frame_not_wrapped_in_batch(self, mock_ws, patch_connect):
+        """A lone queued frame is sent as a plain envelope even with batching on."""
+        mock_ws.feed(AUTH_SUCCESS)
+
+        client = AgentPassClient("ws://localhost:8443", "test-token", batch_requests=True)
+        await client.connect()
+
+        async def respond():
+            await asyncio.sleep(0.01)
+            mock_ws.feed(_tool_result(1, {}))
+
+        _task = asyncio.create_task(respond())  # noqa: RUF006
+        await client.tool_request("ha_get_state", entity_id="sensor.temp")
+
+        assert json.loads(mock_ws._sent[-1])["id"] == 1
+
+        await client.close()
+
+    async def test_failed_send_fails_its_future(self, mock_ws, patch_connect):
+        """A frame that cannot be written fails the caller with a connection error."""
+        mock_ws.feed(AUTH_SUCCESS)
+
+        client = AgentPassClient("ws://localhost:8443", "test-token")
+        await client.connect()
+
+        mock_ws.send = AsyncMock(side_effect=websockets.exceptions.ConnectionClosed(None, None))
+
+        with pytest.raises(AgentPassConnectionError):
+            await asyncio.wait_for(
+                client.tool_request("ha_get_state", entity_id="sensor.temp"), timeout=1.0
+            )
+        assert 1 not in client._pending
+
+        await client.close()
+
+
+# ---------------------------------------------------------------------------
+# _norm_id
+# ---------------------------------------------------------------------------
+
+
+class TestNormId:
+    @pytest.mark.parametrize(
+        ("raw", "expected"),
+        [(7, 7), ("7", 7), ("a1b2-uuid", "a1b2-uuid"), ("-1", "-1"), (None, None)],
+    )
+    def test_norm_id(self, raw, expected):
+        assert _norm_id(raw) == expected
+        assert type(_norm_id(raw)) is type(expected)
+
+
+# ---------------------------------------------------------------------------
+# list_tools
+# ---------------------------------------------------------------------------
+
+
+class TestListTools:
+    async def test_list_tools_returns_tools(self, mock_ws, patch_connect):
+        """Returns the tools array from the response."""
+        mock_ws.feed(AUTH_SUCCESS)
+
+        client = AgentPassClient("ws://localhost:8443", "test-token")
+        await client.connect()
+
+        async def respond():
+            await asyncio.sleep(0.01)
+            mock_ws.feed(
+                json.dumps({"jsonrpc": "2.0", "result": {"tools": [{"name": "t"}]}, "id": 1})
+            )
+
+        _task = asyncio.create_task(respond())  # noqa: RUF006
+        tools = await client.list_tools()
+
+        assert tools == [{"name": "t"}]
+        await client.close()
+
+    async def test_list_tools_timeout(self, mock_ws, patch_connect):
+        """Raises TimeoutError when the gateway does not answer in time."""
+        mock_ws.feed(AUTH_SUCCESS)
+
+        client = AgentPassClient("ws://localhost:8443", "test-token")
+        await client.connect()
+
+        with pytest.raises(TimeoutError):
+            await client.list_tools(timeout=0.01)
+
+        await client.close()
+
 
 # ---------------------------------------------------------------------------
 # T1-7: get_pending_results
@@ -510,6 +776,49 @@ class TestGetPendingResults:
 
         await client.close()
 
+    async def test_resolve_offline_results_skips_bad_rows(self):
+        """Malformed and unknown rows are skipped; the rest resolve by normalised id."""
+        client = AgentPassClient("ws://localhost:8443", "test-token")
+        loop = asyncio.get_running_loop()
+        executed = loop.create_future()
+        denied = loop.create_future()
+        untouched = loop.create_future()
+        client._pending.update({7: executed, 8: denied, 9: untouched})
+
+        client._resolve_offline_results(
+            [
+                {"request_id": 9, "result": "not json {{{"},
+                {"request_id": 9, "result": "null"},
+                {"request_id": None, "result": json.dumps({"status": "executed"})},
+                {"request_id": "a1b2-uuid", "result": json.dumps({"status": "executed"})},
+                {"request_id": "7", "result": json.dumps({"status": "executed", "data": {}})},
+                {"request_id": 8, "result": {"status": "denied", "data": "Denied by user"}},
+            ]
+        )
+
+        assert executed.result() == {}
+        with pytest.raises(AgentPassDenied, match="Denied by user"):
+            denied.result()
+        assert not untouched.done()
+        assert client._pending == {9: untouched}
+
+    async def test_resolve_offline_results_skips_decoding_unmatched_rows(self):
+        """Rows with no pending future are never JSON-decoded."""
+        client = AgentPassClient("ws://localhost:8443", "test-token")
+        future = asyncio.get_running_loop().create_future()
+        client._pending[3] = future
+        rows = [
+            {"request_id": "a1b2-uuid", "result": json.dumps({"status": "executed"})},
+            {"request_id": 4, "result": json.dumps({"status": "executed"})},
+            {"request_id": 3, "result": json.dumps({"status": "executed", "data": 1})},
+        ]
+
+        with patch("agentpass.client.orjson.loads", wraps=orjson.loads) as loads:
+            client._resolve_offline_results(rows)
+
+        loads.assert_called_once_with(rows[2]["result"])
+        assert future.result() == 1
+
 
 # ---------------------------------------------------------------------------
 # T1-8: _next_id increments
@@ -533,8 +842,8 @@ class TestNextId:
 class ReconnectMockWebSocket(MockWebSocket):
     """MockWebSocket that can simulate disconnections.
 
-    Unlike the base MockWebSocket which raises StopAsyncIteration on timeout,
-    this one blocks indefinitely in __anext__ until a message arrives or
+    Unlike the base MockWebSocket which closes cleanly on timeout,
+    this one blocks indefinitely in recv until a message arrives or
     disconnect() is called, closely mimicking real websocket behavior.
     """
 
@@ -546,7 +855,7 @@ class ReconnectMockWebSocket(MockWebSocket):
         """Signal that the connection should be closed."""
         self._disconnect_event.set()
 
-    async def __anext__(self) -> str:
+    async def recv(self, decode: bool | None = None) -> str:
         # Race: either a message arrives or disconnect is signaled
         msg_task = asyncio.ensure_future(self._to_receive.get())
         disc_task = asyncio.ensure_future(self._disconnect_event.wait())
@@ -791,7 +1100,7 @@ class TestReauthOnReconnect:
             ]
             assert len(auth_messages) == 1
             assert auth_messages[0]["params"]["token"] == "my-secret-token"
-            assert auth_messages[0]["id"] == "auth-1"
+            assert auth_messages[0]["id"] == 0
 
             await client.close()
 
@@ -1051,3 +1360,46 @@ class TestReadLoopSurvivesMalformedJson:
         assert result == {"answer": "ok"}
 
         await client.close()
+
+    async def test_read_loop_survives_non_object_frames(self, mock_ws, patch_connect):
+        """Valid JSON that is not an object envelope is skipped, not fatal."""
+        mock_ws.feed(AUTH_SUCCESS)
+
+        client = AgentPassClient("ws://localhost:8443", "test-token")
+        await client.connect()
+
+        async def respond():
+            await asyncio.sleep(0.01)
+            mock_ws.feed("42")
+            mock_ws.feed('"hello"')
+            mock_ws.feed(_tool_result(1, {"answer": "ok"}))
+
+        _task = asyncio.create_task(respond())  # noqa: RUF006
+        result = await asyncio.wait_for(
+            client.tool_request("ha_get_state", entity_id="sensor.test"),
+            timeout=2.0,
+        )
+        assert result == {"answer": "ok"}
+
+        await client.close()
+
+    async def test_read_loop_drains_burst(self, mock_ws, patch_connect):
+        """A burst larger than the yield interval resolves every pending future."""
+        mock_ws.feed(AUTH_SUCCESS)
+
+        client = AgentPassClient("ws://localhost:8443", "test-token")
+        await client.connect()
+
+        tasks = [
+            asyncio.create_task(client.tool_request("ha_get_state", entity_id=f"sensor.t{i}"))
+            for i in range(100)
+        ]
+        for _ in range(20):
+            await asyncio.sleep(0)
+        for i in range(1, 101):
+            mock_ws.feed(_tool_result(i, {"n": i}))
+
+        results = await asyncio.wait_for(asyncio.gather(*tasks), timeout=2.0)
+        assert results == [{"n": i} for i in range(1, 101)]
+
+        await client.close()
@@ -3,15 +3,19 @@
 import os
 import shutil
 import textwrap
+from unittest.mock import patch
 
 import pytest
 
 from agentpass.config import (
     ConfigError,
     Permissions,
+    clear_load_caches,
     load_config,
     load_permissions,
+    load_tools_file,
     substitute_env_vars,
+    substitute_env_vars_in_text,
 )
 
 
@@ -43,6 +47,23 @@ class TestSubstituteEnvVars:
         with pytest.raises(ConfigError, match="UNSET_VAR_XYZ"):
             substitute_env_vars("${UNSET_VAR_XYZ}")
 
+    def test_updates_nested_containers_in_place(self, monkeypatch):
+        monkeypatch.setenv("TOKEN", "abc")
+        data = {"svc": [{"auth": {"token": "${TOKEN}"}}, "plain"]}
+        result = substitute_env_vars(data)
+        assert result is data
+        assert data == {"svc": [{"auth": {"token": "abc"}}, "plain"]}
+
+    def test_deep_nesting_does_not_recurse(self, monkeypatch):
+        monkeypatch.setenv("VAL", "x")
+        data = leaf = {}
+        for _ in range(5000):
+            leaf["n"] = {}
+            leaf = leaf["n"]
+        leaf["v"] = "${VAL}"
+        substitute_env_vars(data)
+        assert leaf["v"] == "x"
+
     def test_ignores_non_string_values(self):
         assert substitute_env_vars(42) == 42
         assert substitute_env_vars(True) is True
@@ -50,6 +71,18 @@ class TestSubstituteEnvVars:
         assert substitute_env_vars(3.14) == 3.14
 
 
+class TestSubstituteEnvVarsInText:
+    def test_replaces_in_text(self, monkeypatch):
+        monkeypatch.setenv("TOKEN", "abc")
+        assert substitute_env_vars_in_text("token: ${TOKEN}\n") == "token: abc\n"
+
+    def test_text_without_vars_returned_as_is(self):
+        text = "token: $TOKEN\nport: 8443\n"
+        with patch("agentpass.config._ENV_VAR_RE") as env_re:
+            assert substitute_env_vars_in_text(text) is text
+        env_re.sub.assert_not_called()
+
+
 # --- Fixtures for config/permissions YAML files ---
 
 VALID_CONFIG_YAML = textwrap.dedent("""\
@@ -478,3 +511,130 @@ class TestLoadPermissions:
         p.write_text(yaml_text)
         perms = load_permissions(str(p))
         assert perms.rules[0].description == ""
+
+
+class TestYamlJsonCache:
+    def test_cache_written_private(self, permissions_file):
+        load_permissions(str(permissions_file))
+        caches = list(permissions_file.parent.glob(".permissions.yaml.*.json"))
+        assert len(caches) == 1
+        assert caches[0].stat().st_mode & 0o777 == 0o600
+
+    def test_second_load_skips_yaml(self, permissions_file):
+        first = load_permissions(str(permissions_file))
+        clear_load_caches()
+        with patch("agentpass.config.yaml.load") as yaml_load:
+            second = load_permissions(str(permissions_file))
+        yaml_load.assert_not_called()
+        assert second == first
+
+    def test_edit_invalidates_and_prunes(self, permissions_file):
+        load_permissions(str(permissions_file))
+        permissions_file.write_text('defaults:\n  - pattern: "*"\n    action: deny\n')
+        perms = load_permissions(str(permissions_file))
+        assert perms.defaults[0].action == "deny"
+        assert len(list(permissions_file.parent.glob(".permissions.yaml.*.json"))) == 1
+
+    def test_env_change_invalidates(self, tmp_path, monkeypatch):
+        p = tmp_path / "permissions.yaml"
+        p.write_text('defaults:\n  - pattern: "*"\n    action: ${PERM_ACTION}\n')
+        monkeypatch.setenv("PERM_ACTION", "allow")
+        assert load_permissions(str(p)).defaults[0].action == "allow"
+        monkeypatch.setenv("PERM_ACTION", "deny")
+        assert load_permissions(str(p)).defaults[0].action == "deny"
+
+    def test_env_substituted_file_not_cached(self, tmp_path, monkeypatch):
+        """Substituted values may be secrets; they never reach a cache file."""
+        p = tmp_path / "permissions.yaml"
+        (tmp_path / ".permissions.yaml.0123.json").write_text("{}")  # from an older version
+        p.write_text('defaults:\n  - pattern: "*"\n    action: ${PERM_ACTION}\n')
+        monkeypatch.setenv("PERM_ACTION", "allow")
+        assert load_permissions(str(p)).defaults[0].action == "allow"
+        assert list(tmp_path.glob(".permissions.yaml.*")) == []
+
+    def test_config_never_cached(self, config_file):
+        """config.yaml holds credentials even without ${VAR}."""
+        load_config(str(config_file))
+        assert list(config_file.parent.glob(f".{config_file.name}.*")) == []
+
+    def test_non_json_values_not_cached(self, tmp_path):
+        p = tmp_path / "permissions.yaml"
+        p.write_text('defaults:\n  - pattern: "*"\n    action: ask\n    description: 2024-01-01\n')
+        load_permissions(str(p))
+        assert list(tmp_path.glob(".permissions.yaml.*.json")) == []
+
+    def test_unwritable_dir_still_loads(self, permissions_file):
+        with patch("agentpass.config.os.open", side_effect=PermissionError):
+            perms = load_permissions(str(permissions_file))
+        assert len(perms.defaults) == 2
+        assert list(permissions_file.parent.glob(".permissions.yaml.*")) == []
+
+
+class TestReadYamlText:
+    def test_large_file_read_through_mmap(self, tmp_path, monkeypatch):
+        """Files above the mmap threshold load the same as small ones."""
+        from agentpass import config
+
+        monkeypatch.setenv("PERM_ACTION", "deny")
+        body = "".join(
+            f'  - pattern: "tool_{i}_*"\n    action: ${{PERM_ACTION}}\n    description: "ü"\n'
+            for i in range(200)
+        )
+        p = tmp_path / "permissions.yaml"
+        p.write_text(f"defaults:\n{body}", encoding="utf-8")
+        assert p.stat().st_size >= config._MMAP_MIN_SIZE
+
+        perms = load_permissions(str(p))
+        assert len(perms.defaults) == 200
+        assert perms.defaults[-1].pattern == "tool_199_*"
+        assert perms.defaults[-1].action == "deny"
+        assert perms.defaults[-1].description == "ü"
+
+    def test_empty_file(self, tmp_path):
+        p = tmp_path / "tools.yaml"
+        p.write_text("")
+        assert load_tools_file(str(p), "svc") == []
+
+
+class TestLoaderMemoization:
+    def test_permissions_reused_until_file_changes(self, permissions_file):
+        first = load_permissions(str(permissions_file))
+        assert load_permissions(str(permissions_file)) is first
+
+        permissions_file.write_text('defaults:\n  - pattern: "*"\n    action: deny\n')
+        changed = load_permissions(str(permissions_file))
+        assert changed is not first
+        assert changed.defaults[0].action == "deny"
+
+    def test_tools_shared_but_list_fresh(self, _tools_dir):
+        path = str(_tools_dir / "homeassistant.yaml")
+        first = load_tools_file(path, "homeassistant")
+        second = load_tools_file(path, "homeassistant")
+        assert first is not second
+        assert first[0] is second[0]
+        assert load_tools_file(path, "other")[0].service_name == "other"
+
+    def test_clear_load_caches(self, permissions_file):
+        first = load_permissions(str(permissions_file))
+        clear_load_caches()
+        assert load_permissions(str(permissions_file)) is not first
+
+
+class TestConfigDataclasses:
+    def test_slot_backed(self, _tools_dir):
+        """Config objects carry no per-instance __dict__."""
+        tool = load_tools_file(str(_tools_dir / "homeassistant.yaml"), "homeassistant")[0]
+        assert not hasattr(tool, "__dict__")
+        assert not hasattr(tool.args["entity_id"], "__dict__")
+        with pytest.raises(AttributeError):
+            tool.extra = True
+
+    def test_identifiers_interned(self, _tools_dir, permissions_file):
+        """Tool, service and action names are interned at load time."""
+        import sys
+
+        tool = load_tools_file(str(_tools_dir / "homeassistant.yaml"), "homeassistant")[0]
+        assert tool.name is sys.intern(tool.name)
+        assert tool.service_name is sys.intern("homeassistant")
+        rule = load_permissions(str(permissions_file)).defaults[0]
+        assert rule.action is sys.intern(rule.action)
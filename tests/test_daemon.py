@@ -0,0 +1,275 @@
+"""Tests for agentpass.daemon — the local sidecar that shares one gateway connection."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import stat
+import tempfile
+from argparse import Namespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from agentpass.cli import (
+    EXIT_CONNECTION_ERROR,
+    EXIT_DENIED,
+    EXIT_SUCCESS,
+    run_daemon,
+    run_request,
+)
+from agentpass.client import AgentPassConnectionError, AgentPassDenied, AgentPassError
+from agentpass.daemon import (
+    DaemonClient,
+    DaemonRunningError,
+    daemon_available,
+    default_socket_path,
+    serve_daemon,
+)
+
+
+@pytest.fixture
+def socket_path():
+    # Short dir: Unix socket paths are limited to ~107 bytes
+    tmpdir = tempfile.mkdtemp(prefix="ap-")
+    yield os.path.join(tmpdir, "d.sock")
+    shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def _make_gateway_client() -> MagicMock:
+    client = MagicMock()
+    client.tool_request = AsyncMock(return_value={"state": "on"})
+    client.list_tools = AsyncMock(return_value=[{"name": "ha_get_state"}])
+    client.get_pending_results = AsyncMock(return_value=[])
+    return client
+
+
+class TestSocketPath:
+    def test_default_uses_xdg_runtime_dir(self, monkeypatch):
+        monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+        assert default_socket_path() == f"/run/user/1000/agentpass-{os.getuid()}.sock"
+
+    def test_missing_path_not_available(self, socket_path):
+        assert not daemon_available(socket_path)
+
+    def test_regular_file_not_available(self, socket_path):
+        with open(socket_path, "w"):
+            pass
+        assert not daemon_available(socket_path)
+
+
+class TestDaemonRoundTrip:
+    async def test_tool_request_forwarded(self, socket_path):
+        """Tool name and args reach the shared client; the result comes back."""
+        gateway = _make_gateway_client()
+        server = await serve_daemon(gateway, socket_path)
+        async with server:
+            assert daemon_available(socket_path)
+            assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+
+            async with DaemonClient(socket_path) as client:
+                result = await client.tool_request("ha_get_state", entity_id="sensor.temp")
+
+        assert result == {"state": "on"}
+        gateway.tool_request.assert_awaited_once_with("ha_get_state", entity_id="sensor.temp")
+
+    async def test_several_calls_on_one_connection(self, socket_path):
+        gateway = _make_gateway_client()
+        server = await serve_daemon(gateway, socket_path)
+        async with server, DaemonClient(socket_path) as client:
+            tools = await client.list_tools()
+            pending = await client.get_pending_results()
+
+        assert tools == [{"name": "ha_get_state"}]
+        assert pending == []
+
+    async def test_denied_maps_to_same_exception(self, socket_path):
+        gateway = _make_gateway_client()
+        gateway.tool_request.side_effect = AgentPassDenied(-32001, "Denied by user")
+        server = await serve_daemon(gateway, socket_path)
+        async with server, DaemonClient(socket_path) as client:
+            with pytest.raises(AgentPassDenied) as exc_info:
+                await client.tool_request("ha_call_service")
+
+        assert exc_info.value.code == -32001
+        assert exc_info.value.message == "Denied by user"
+
+    async def test_connection_error_maps_to_same_exception(self, socket_path):
+        gateway = _make_gateway_client()
+        gateway.get_pending_results.side_effect = AgentPassConnectionError(-1, "Connection lost")
+        server = await serve_daemon(gateway, socket_path)
+        async with server, DaemonClient(socket_path) as client:
+            with pytest.raises(AgentPassConnectionError):
+                await client.get_pending_results()
+
+    async def test_unknown_method_returns_error(self, socket_path):
+        server = await serve_daemon(_make_gateway_client(), socket_path)
+        async with server, DaemonClient(socket_path) as client:
+            with pytest.raises(AgentPassError) as exc_info:
+                await client._call("shutdown", {})
+
+        assert exc_info.value.code == -32601
+
+    async def test_stale_socket_file_replaced(self, socket_path):
+        with open(socket_path, "w"):
+            pass
+        server = await serve_daemon(_make_gateway_client(), socket_path)
+        async with server:
+            assert daemon_available(socket_path)
+
+    async def test_live_daemon_not_replaced(self, socket_path):
+        server = await serve_daemon(_make_gateway_client(), socket_path)
+        async with server:
+            with pytest.raises(DaemonRunningError):
+                await serve_daemon(_make_gateway_client(), socket_path)
+            async with DaemonClient(socket_path) as client:
+                assert await client.get_pending_results() == []
+
+
+class TestUndeliveredResults:
+    async def _disconnect_during_request(self, socket_path, gateway) -> asyncio.Event:
+        """Start a tool request through the daemon, then drop the CLI side."""
+        release = asyncio.Event()
+        outcome = gateway.tool_request.side_effect
+
+        async def slow_approval(tool, **args):
+            await release.wait()
+            if isinstance(outcome, Exception):
+                raise outcome
+            return {"state": "on"}
+
+        gateway.tool_request.side_effect = slow_approval
+        client = await DaemonClient(socket_path).connect()
+        call = asyncio.create_task(client.tool_request("ha_call_service", entity_id="light.x"))
+        await asyncio.sleep(0.05)
+        call.cancel()
+        await client.__aexit__(None, None, None)  # CLI timed out / interrupted
+        release.set()
+        await asyncio.sleep(0.05)
+        return release
+
+    async def test_approved_result_kept_for_pending(self, socket_path):
+        gateway = _make_gateway_client()
+        gateway.get_pending_results.return_value = [{"request_id": "r-1", "result": "{}"}]
+        server = await serve_daemon(gateway, socket_path)
+        async with server:
+            await self._disconnect_during_request(socket_path, gateway)
+            async with DaemonClient(socket_path) as client:
+                pending = await client.get_pending_results()
+                assert await client.get_pending_results() == [{"request_id": "r-1", "result": "{}"}]
+
+        assert pending[0] == {
+            "tool_name": "ha_call_service",
+            "args": '{"entity_id":"light.x"}',
+            "result": '{"status":"executed","data":{"state":"on"}}',
+        }
+        assert pending[1] == {"request_id": "r-1", "result": "{}"}
+
+    async def test_denied_result_kept_for_pending(self, socket_path):
+        gateway = _make_gateway_client()
+        gateway.tool_request.side_effect = AgentPassDenied(-32001, "Denied by user")
+        server = await serve_daemon(gateway, socket_path)
+        async with server:
+            await self._disconnect_during_request(socket_path, gateway)
+            async with DaemonClient(socket_path) as client:
+                [stored] = await client.get_pending_results()
+
+        assert stored["result"] == '{"status":"denied","data":"Denied by user"}'
+
+    async def test_connection_error_not_kept(self, socket_path):
+        gateway = _make_gateway_client()
+        gateway.tool_request.side_effect = AgentPassConnectionError(-1, "Connection lost")
+        server = await serve_daemon(gateway, socket_path)
+        async with server:
+            await self._disconnect_during_request(socket_path, gateway)
+            async with DaemonClient(socket_path) as client:
+                assert await client.get_pending_results() == []
+
+
+class TestRunDaemon:
+    def _args(self, socket_path: str) -> Namespace:
+        return Namespace(url="ws://gw", token="t", low_latency=False, socket=socket_path)
+
+    async def test_failed_connect_keeps_running_daemon_socket(self, socket_path, capsys):
+        server = await serve_daemon(_make_gateway_client(), socket_path)
+        async with server:
+            with patch("agentpass.cli.AgentPassClient") as client_cls:
+                client_cls.return_value.__aenter__.side_effect = ConnectionRefusedError()
+                exit_code = await run_daemon(self._args(socket_path))
+            assert exit_code == EXIT_CONNECTION_ERROR
+            assert daemon_available(socket_path)
+
+    async def test_second_daemon_refuses_to_start(self, socket_path, capsys):
+        server = await serve_daemon(_make_gateway_client(), socket_path)
+        async with server:
+            with patch("agentpass.cli.AgentPassClient") as client_cls:
+                client_cls.return_value.__aenter__.return_value = _make_gateway_client()
+                exit_code = await run_daemon(self._args(socket_path))
+            assert exit_code == EXIT_CONNECTION_ERROR
+            assert "already listening" in capsys.readouterr().err
+            assert daemon_available(socket_path)
+
+
+class TestCliUsesDaemon:
+    async def test_run_request_forwards_to_daemon(self, socket_path, capsys):
+        """With a daemon socket present, no url/token is needed."""
+        gateway = _make_gateway_client()
+        server = await serve_daemon(gateway, socket_path)
+        args = Namespace(
+            url="",
+            token="",
+            tool="ha_get_state",
+            args=["entity_id=sensor.temp"],
+            timeout=5.0,
+            socket=socket_path,
+        )
+        async with server:
+            exit_code = await run_request(args)
+
+        assert exit_code == EXIT_SUCCESS
+        assert '"state": "on"' in capsys.readouterr().out
+
+    async def test_run_request_denied_through_daemon(self, socket_path, capsys):
+        gateway = _make_gateway_client()
+        gateway.tool_request.side_effect = AgentPassDenied(-32003, "Policy denied")
+        server = await serve_daemon(gateway, socket_path)
+        args = Namespace(
+            url="",
+            token="",
+            tool="ha_call_service",
+            args=[],
+            timeout=5.0,
+            socket=socket_path,
+        )
+        async with server:
+            exit_code = await run_request(args)
+
+        assert exit_code == EXIT_DENIED
+        assert "Policy denied" in capsys.readouterr().err
+
+    async def test_stale_socket_falls_back_to_direct(self, socket_path, capsys):
+        """A socket left by a killed daemon refuses connections; connect directly."""
+        import socket
+
+        stale = socket.socket(socket.AF_UNIX)
+        stale.bind(socket_path)
+        stale.close()  # file stays, nobody listens
+        assert daemon_available(socket_path)
+
+        direct = AsyncMock()
+        direct.__aenter__.return_value = direct
+        direct.tool_request.return_value = {"state": "off"}
+        args = Namespace(
+            url="wss://gw:8443",
+            token="tok",
+            tool="ha_get_state",
+            args=[],
+            timeout=5.0,
+            socket=socket_path,
+        )
+        with patch("agentpass.cli.AgentPassClient", return_value=direct):
+            exit_code = await run_request(args)
+
+        assert exit_code == EXIT_SUCCESS
+        assert '"state": "off"' in capsys.readouterr().out
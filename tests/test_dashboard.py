@@ -1,6 +1,7 @@
 """Tests for agentpass.dashboard — audit dashboard routes and API."""
 
 import time
+from unittest.mock import patch
 
 import pytest
 from aiohttp import web
@@ -95,6 +96,75 @@ class TestApiLog:
         data = await resp.json()
         assert all(e["resolution"] == "executed" for e in data["entries"])
 
+    async def test_cursor_walks_all_pages(self, client, db):
+        """next_cursor pages through every entry once, newest first."""
+        await _seed_entries(db, 7)  # id breaks any timestamp ties
+        seen: list[str] = []
+        url = "/audit/api/log?per_page=3"
+        while True:
+            data = await (await client.get(url)).json()
+            seen += [e["request_id"] for e in data["entries"]]
+            if data["next_cursor"] is None:
+                break
+            url = f"/audit/api/log?per_page=3&cursor={data['next_cursor']}"
+        assert seen == [f"req-{i}" for i in reversed(range(7))]
+
+    async def test_invalid_cursor_ignored(self, client, db):
+        await _seed_entries(db, 3)
+        for bad in ("abc", "1.0:x", "nan:1", ":"):
+            data = await (await client.get(f"/audit/api/log?cursor={bad}")).json()
+            assert len(data["entries"]) == 3
+
+    async def test_json_columns_passed_through(self, client, db):
+        await db.log_audit(
+            AuditEntry(
+                request_id="r",
+                args={"entity_id": "light.x", "brightness": 128},
+                execution_result={"state": "on", "attrs": [1, None]},
+            )
+        )
+        resp = await client.get("/audit/api/log")
+        assert resp.content_type == "application/json"
+        [entry] = (await resp.json())["entries"]
+        assert entry["args"] == {"entity_id": "light.x", "brightness": 128}
+        assert entry["execution_result"] == {"state": "on", "attrs": [1, None]}
+        assert set(entry) == {
+            "request_id",
+            "timestamp",
+            "tool_name",
+            "args",
+            "signature",
+            "decision",
+            "resolution",
+            "resolved_by",
+            "resolved_at",
+            "execution_result",
+            "agent_id",
+        }
+
+    async def test_large_page_streamed_in_chunks(self, client, db):
+        for i in range(200):
+            await db.log_audit(AuditEntry(request_id=f"r-{i}", args={"blob": "x" * 1000}))
+        resp = await client.get("/audit/api/log?per_page=200")
+        assert resp.headers.get("Transfer-Encoding") == "chunked"
+        data = await resp.json()
+        assert len(data["entries"]) == 200
+        assert data["total"] == 200
+        assert data["next_cursor"] is not None
+        assert data["entries"][0]["args"] == {"blob": "x" * 1000}
+
+    async def test_filter_by_time_range(self, client, db):
+        for i, ts in enumerate((1704067200.0, 1704070800.0, 1704074400.0)):  # 00:00, 01:00, 02:00
+            await db.log_audit(AuditEntry(request_id=f"req-{i}", timestamp=ts))
+        resp = await client.get("/audit/api/log?from=2024-01-01T00:30&to=2024-01-01T01:00:00")
+        data = await resp.json()
+        assert [e["request_id"] for e in data["entries"]] == ["req-1"]
+
+    async def test_invalid_time_range_ignored(self, client, db):
+        await _seed_entries(db, 3)
+        resp = await client.get("/audit/api/log?from=2024-02-30T00:00&to=soon")
+        assert (await resp.json())["total"] == 3
+
     async def test_invalid_page_defaults(self, client, db):
         await _seed_entries(db, 3)
         resp = await client.get("/audit/api/log?page=abc&per_page=invalid")
@@ -144,6 +214,12 @@ class TestAuditPage:
         assert "agentpass" in text
         assert "Audit Dashboard" in text
 
+    async def test_template_not_reloaded_per_request(self, client):
+        with patch("jinja2.loaders.os.path.getmtime") as getmtime:
+            for _ in range(3):
+                assert (await client.get("/audit/")).status == 200
+        getmtime.assert_not_called()
+
     async def test_empty_state(self, client):
         resp = await client.get("/audit/")
         assert resp.status == 200
@@ -188,6 +264,37 @@ class TestFilteredQuery:
         assert total == 10
         assert len(entries) == 3
 
+    async def test_cursor_respects_filters(self, db):
+        await _seed_entries(db, 9)
+        first, total = await db.get_audit_log_filtered(tool_name="ha_get_state", limit=2)
+        last = first[-1]
+        rest, _ = await db.get_audit_log_filtered(
+            tool_name="ha_get_state", limit=2, cursor=(last.timestamp, last.row_id)
+        )
+        assert total == 3
+        assert [e.request_id for e in first + rest] == ["req-6", "req-3", "req-0"]
+
+    async def test_rows_keep_stored_json(self, db):
+        await db.log_audit(AuditEntry(request_id="r", args={"a": 1}))
+        rows, total = await db.iter_audit_rows_filtered(limit=10)
+        [row] = [r async for r in rows]
+        assert total == 1
+        assert row["args"] == b'{"a":1}'
+        assert row["execution_result"] is None
+
+    async def test_sql_reused_per_filter_shape(self, db):
+        queries: list[str] = []
+        for conn in db._readers:
+            conn.execute = _recording(conn.execute, queries)
+        await db.get_audit_log_filtered(tool_name="a", from_ts=1.0)
+        await db.get_audit_log_filtered(tool_name="b", from_ts=2.0)
+        await db.get_audit_log_filtered(decision="allow")
+        assert queries[0] is queries[2]  # same shape: the cached string itself
+        assert queries[1] is queries[3]
+        assert "tool_name = ? AND timestamp >= ?" in queries[0]
+        assert "decision = ?" in queries[4]
+        assert "tool_name" not in queries[4]
+
     async def test_empty_result(self, db):
         entries, total = await db.get_audit_log_filtered(tool_name="nonexistent")
         assert entries == []
@@ -215,6 +322,16 @@ class TestFilteredQuery:
         assert entries[0].request_id == "recent"
 
 
+def _recording(execute, queries: list[str]):
+    """Wrap a connection's execute to record each SQL statement."""
+
+    async def wrapper(sql, *args):
+        queries.append(sql)
+        return await execute(sql, *args)
+
+    return wrapper
+
+
 class TestAuditStats:
     async def test_approval_rate(self, db):
         for i in range(4):
@@ -243,3 +360,62 @@ class TestAuditStats:
         assert stats["top_tools"][0]["name"] == "tool_a"
         assert stats["top_tools"][0]["count"] == 5
         assert stats["top_tools"][1]["name"] == "tool_b"
+
+    async def test_last_24h_and_total(self, db):
+        now = time.time()
+        await db.log_audit(AuditEntry(request_id="old", timestamp=now - 2 * 86400, decision="ask"))
+        await db.log_audit(AuditEntry(request_id="new", timestamp=now, decision="deny"))
+
+        stats = await db.get_audit_stats()
+        assert stats["total_requests"] == 2
+        assert stats["last_24h"] == 1
+        assert stats["decision_breakdown"] == {"ask": 1, "deny": 1}
+        assert stats["approval_rate"] == 0.0
+
+    async def test_single_round_trip(self, db):
+        await db.log_audit(AuditEntry(request_id="r", tool_name="t", decision="allow"))
+        await db.get_audit_log()  # flush the queued write first
+
+        queries: list[str] = []
+        for conn in db._readers:
+            conn.execute = _recording(conn.execute, queries)
+        stats = await db.get_audit_stats()
+        assert len(queries) == 1
+        assert stats["top_tools"] == [{"name": "t", "count": 1}]
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2024-02-29T12:34",
+        "2024-02-29T12:34:56",
+        "2024-01-01 10:00",
+        "2024-01-01",
+        "2024-01-01T10:00:00.5",
+        "2024-01-01T10:00+02:00",
+        "2023-02-29T12:34",
+        "2024-01-01T24:00",
+        "2024-01-01T10:00:5x",
+    ],
+)
+def test_parse_iso_matches_fromisoformat(value):
+    """The datetime-local fast path agrees with datetime.fromisoformat(), errors included."""
+    from datetime import UTC, datetime
+
+    from agentpass.dashboard.routes import _parse_iso
+
+    try:
+        expected = datetime.fromisoformat(value).replace(tzinfo=UTC).timestamp()
+    except ValueError:
+        with pytest.raises(ValueError):
+            _parse_iso(value)
+    else:
+        assert _parse_iso(value) == expected
+
+
+def test_format_ts():
+    from agentpass.dashboard.routes import _format_ts
+
+    assert _format_ts(1700000000.9) == "2023-11-14 22:13:20"
+    assert _format_ts(None) == "None"
+    assert _format_ts(1e20) == "1e+20"
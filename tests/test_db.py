@@ -1,17 +1,51 @@
 """Tests for agentpass.db — SQLite storage for audit log and pending requests."""
 
+import asyncio
 import json
 import os
 import platform
+import sqlite3
 import stat
 import time
-from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
 from agentpass.db import Database
 from agentpass.models import AuditEntry
 
+# Schema as shipped before timestamps were stored as REAL epoch seconds
+_ISO_SCHEMA = """\
+CREATE TABLE audit_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    request_id TEXT NOT NULL,
+    tool_name TEXT NOT NULL,
+    args TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    decision TEXT NOT NULL,
+    resolution TEXT,
+    resolved_by TEXT,
+    resolved_at TEXT,
+    execution_result TEXT,
+    agent_id TEXT DEFAULT 'default'
+);
+CREATE TABLE pending_requests (
+    request_id TEXT PRIMARY KEY,
+    tool_name TEXT NOT NULL,
+    args TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    message_id TEXT,
+    chat_id INTEGER,
+    result TEXT,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now')),
+    expires_at TEXT NOT NULL
+);
+CREATE INDEX idx_audit_timestamp ON audit_log(timestamp);
+CREATE INDEX idx_audit_tool ON audit_log(tool_name);
+CREATE INDEX idx_pending_expires ON pending_requests(expires_at);
+"""
+
 
 @pytest.fixture()
 async def db(tmp_path):
@@ -39,9 +73,126 @@ class TestInitialize:
             "SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_%'"
         )
         indexes = [row[0] for row in await cursor.fetchall()]
-        assert "idx_audit_timestamp" in indexes
-        assert "idx_audit_tool" in indexes
+        assert "idx_audit_ts_id" in indexes
+        assert "idx_audit_tool_ts" in indexes
+        assert "idx_audit_decision_ts" in indexes
+        assert "idx_audit_res_ts" in indexes
         assert "idx_pending_expires" in indexes
+        assert "idx_pending_completed" in indexes
+
+    async def test_analyze_only_until_stats_exist(self, tmp_path):
+        path = str(tmp_path / "stats.db")
+        database = Database(path)
+        await database.initialize()
+        for i in range(3):
+            await database.log_audit(_audit(f"req-{i}"))
+        await database.close()
+
+        reopened = Database(path)
+        await reopened.initialize()
+        queries: list[str] = []
+        reopened._conn.execute = _recording(reopened._conn.execute, queries)
+        await reopened._analyze_once()  # initialize() above gathered the stats
+        await reopened.close()
+        assert "ANALYZE" not in queries
+
+    async def test_schema_applied_once_per_version(self, tmp_path, monkeypatch):
+        import aiosqlite
+
+        from agentpass.db import _SCHEMA, _SCHEMA_VERSION
+
+        path = str(tmp_path / "version.db")
+        database = Database(path)
+        await database.initialize()
+        cursor = await database._get_conn().execute("PRAGMA user_version")
+        assert (await cursor.fetchone())[0] == _SCHEMA_VERSION
+        await database.close()
+
+        scripts: list[str] = []
+        executescript = aiosqlite.Connection.executescript
+
+        async def recording(self, script):
+            scripts.append(script)
+            return await executescript(self, script)
+
+        monkeypatch.setattr(aiosqlite.Connection, "executescript", recording)
+        reopened = Database(path)
+        await reopened.initialize()
+        await reopened.close()
+        assert scripts
+        assert _SCHEMA not in scripts
+
+    async def test_analysis_limit_set(self, db):
+        cursor = await db._get_conn().execute("PRAGMA analysis_limit")
+        assert (await cursor.fetchone())[0] == 1000
+
+    async def test_filtered_page_avoids_sort(self, db):
+        """Filter + ORDER BY is served by an index; no temp b-tree sort."""
+        conn = db._get_conn()
+        for filter_col in ("tool_name", "decision", "resolution"):
+            cursor = await conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT * FROM audit_log WHERE {filter_col} = ? "
+                "ORDER BY timestamp DESC, id DESC LIMIT 50",
+                ("x",),
+            )
+            plan = " ".join(row[3] for row in await cursor.fetchall())
+            assert "USING INDEX" in plan
+            assert "TEMP B-TREE" not in plan
+
+    async def test_timestamps_stored_as_real(self, db):
+        await db.log_audit(AuditEntry(request_id="r", timestamp=1700000000.25, resolved_at=1.5))
+        await db.insert_pending("p", "test", {}, "test", 4070908800.0)
+        await db.get_audit_log()  # flush the queued write
+        conn = db._get_conn()
+        cursor = await conn.execute("SELECT typeof(timestamp), typeof(resolved_at) FROM audit_log")
+        assert tuple(await cursor.fetchone()) == ("real", "real")
+        cursor = await conn.execute(
+            "SELECT typeof(created_at), typeof(expires_at) FROM pending_requests"
+        )
+        assert tuple(await cursor.fetchone()) == ("real", "real")
+
+    async def test_migrates_iso_timestamps(self, tmp_path):
+        """A database from before REAL timestamps is rewritten on initialize()."""
+        db_path = str(tmp_path / "old.db")
+        with sqlite3.connect(db_path) as old:
+            old.executescript(_ISO_SCHEMA)
+            old.execute(
+                "INSERT INTO audit_log (timestamp, request_id, tool_name, args, signature,"
+                " decision, resolved_at) VALUES (?, 'r', 't', '{}', 't', 'ask', ?)",
+                ("2023-11-14T22:13:20Z", "2023-11-14T22:13:30Z"),
+            )
+            old.execute(
+                "INSERT INTO pending_requests (request_id, tool_name, args, signature,"
+                " expires_at) VALUES ('p', 't', '{}', 't', '2020-01-01T00:00:00Z')"
+            )
+        old.close()
+
+        database = Database(db_path)
+        await database.initialize()
+        try:
+            [entry] = await database.get_audit_log()
+            assert entry.timestamp == 1700000000.0
+            assert entry.resolved_at == 1700000010.0
+            assert entry.row_id == 1
+            [stale] = await database.cleanup_stale_requests()
+            assert stale["expires_at"] == 1577836800.0
+            conn = database._get_conn()
+            cursor = await conn.execute(
+                "SELECT name FROM sqlite_master WHERE name LIKE '%_iso'"
+                " OR (type='index' AND tbl_name NOT IN ('audit_log', 'pending_requests'))"
+            )
+            assert await cursor.fetchall() == []
+        finally:
+            await database.close()
+
+        # Already migrated: a second initialize() leaves the data alone
+        database = Database(db_path)
+        await database.initialize()
+        try:
+            [entry] = await database.get_audit_log()
+            assert entry.timestamp == 1700000000.0
+        finally:
+            await database.close()
 
     @pytest.mark.skipif(platform.system() == "Windows", reason="Unix permissions")
     async def test_file_permissions_0600(self, tmp_path):
@@ -77,6 +228,22 @@ class TestAuditLog:
         assert entries[0].args == {"entity_id": "sensor.temp"}
         assert entries[0].signature == "ha_get_state(sensor.temp)"
 
+    async def test_iter_audit_log_streams_all_entries(self, db):
+        for i in range(150):
+            await db.log_audit(
+                AuditEntry(
+                    request_id=f"req-{i}", timestamp=float(i), tool_name="t", decision="allow"
+                )
+            )
+
+        ids = [entry.request_id async for entry in db.iter_audit_log()]
+        assert ids == [f"req-{i}" for i in reversed(range(150))]
+
+        stream = db.iter_audit_log(limit=10)
+        first = await anext(stream)
+        await stream.aclose()
+        assert first.request_id == "req-149"
+
     async def test_timestamp_round_trips(self, db):
         now = time.time()
         entry = AuditEntry(request_id="req-1", timestamp=now, tool_name="test", decision="allow")
@@ -87,6 +254,41 @@ class TestAuditLog:
         # Timestamps should be close (within 1 second due to ISO truncation)
         assert abs(entries[0].timestamp - now) < 1.0
 
+    async def test_reads_text_json_rows(self, db):
+        """Rows written with json.dumps (TEXT) still parse."""
+        conn = db._get_conn()
+        await conn.execute(
+            "INSERT INTO audit_log (timestamp, request_id, tool_name, args, signature,"
+            " decision, execution_result) VALUES (1.0, 'r', 't', ?, 't', 'allow', ?)",
+            ('{"a": [1, 2]}', '{"ok": true}'),
+        )
+        await conn.commit()
+        [entry] = await db.get_audit_log()
+        assert entry.args == {"a": [1, 2]}
+        assert entry.execution_result == {"ok": True}
+
+    async def test_all_fields_round_trip(self, db):
+        """Every stored column lands on its own AuditEntry field."""
+        entry = AuditEntry(
+            request_id="req-1",
+            timestamp=1000.0,
+            tool_name="tool",
+            args={"a": 1},
+            signature="sig",
+            decision="ask",
+            resolution="approved",
+            resolved_by="telegram:1",
+            resolved_at=1010.0,
+            execution_result={"ok": True},
+            agent_id="agent-7",
+        )
+        await db.log_audit(entry)
+
+        [stored] = await db.get_audit_log()
+        assert stored == AuditEntry(**{**vars(entry), "row_id": 1})
+        [filtered], _ = await db.get_audit_log_filtered()
+        assert filtered == stored
+
     async def test_args_round_trip(self, db):
         args = {"entity_id": "sensor.temp", "extra": "val"}
         entry = AuditEntry(request_id="req-1", args=args, decision="allow")
@@ -113,6 +315,15 @@ class TestAuditLog:
         entries = await db.get_audit_log(limit=2)
         assert len(entries) == 2
 
+    async def test_results_span_fetch_batches(self, db):
+        from agentpass.db import _FETCH_BATCH
+
+        count = _FETCH_BATCH * 2 + 3
+        for i in range(count):
+            await db.log_audit(AuditEntry(request_id=f"req-{i}", timestamp=1000.0 + i))
+        entries = await db.get_audit_log(limit=count)
+        assert [e.request_id for e in entries] == [f"req-{i}" for i in reversed(range(count))]
+
     async def test_empty_audit_log(self, db):
         entries = await db.get_audit_log()
         assert entries == []
@@ -148,7 +359,7 @@ class TestAuditLog:
 
 class TestPendingRequests:
     async def test_insert_and_get(self, db):
-        expires = datetime.now(UTC).isoformat()
+        expires = time.time()
         await db.insert_pending(
             request_id="req-1",
             tool_name="ha_call_service",
@@ -167,18 +378,18 @@ class TestPendingRequests:
         assert result is None
 
     async def test_delete(self, db):
-        expires = datetime.now(UTC).isoformat()
+        expires = time.time()
         await db.insert_pending("req-1", "test", {}, "test", expires)
         await db.delete_pending("req-1")
         assert await db.get_pending("req-1") is None
 
     async def test_cleanup_stale_removes_expired(self, db):
         # Insert an expired request (expires_at in the past)
-        past = "2020-01-01T00:00:00Z"
+        past = 1577836800.0  # 2020-01-01
         await db.insert_pending("req-old", "test", {}, "test", past)
 
         # Insert a fresh request
-        future = "2099-01-01T00:00:00Z"
+        future = 4070908800.0  # 2099-01-01
         await db.insert_pending("req-new", "test", {}, "test", future)
 
         stale = await db.cleanup_stale_requests()
@@ -189,8 +400,26 @@ class TestPendingRequests:
         assert await db.get_pending("req-old") is None
         assert await db.get_pending("req-new") is not None
 
+    @pytest.mark.parametrize("returning", [True, False])
+    async def test_cleanup_stale_leaves_no_open_transaction(self, db, monkeypatch, returning):
+        monkeypatch.setattr("agentpass.db._HAS_RETURNING", returning)
+        await db.insert_pending("old", "t", {}, "t", time.time() - 10)
+        await db.insert_pending("new", "t", {}, "t", time.time() + 300)
+        for expected in (["old"], []):
+            stale = await db.cleanup_stale_requests()
+            assert [r["request_id"] for r in stale] == expected
+            assert not db._get_conn().in_transaction
+        assert await db.get_pending("new") is not None
+
+    async def test_completed_results_use_partial_index(self, db):
+        cursor = await db._get_conn().execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM pending_requests WHERE result IS NOT NULL"
+        )
+        plan = " ".join(row[3] for row in await cursor.fetchall())
+        assert "idx_pending_completed" in plan
+
     async def test_cleanup_stale_no_expired(self, db):
-        future = "2099-01-01T00:00:00Z"
+        future = 4070908800.0  # 2099-01-01
         await db.insert_pending("req-1", "test", {}, "test", future)
         stale = await db.cleanup_stale_requests()
         assert stale == []
@@ -199,7 +428,7 @@ class TestPendingRequests:
 class TestUpdatePendingResult:
     async def test_stores_result_json(self, db):
         """update_pending_result writes JSON to the result column."""
-        expires = "2099-01-01T00:00:00Z"
+        expires = 4070908800.0  # 2099-01-01
         await db.insert_pending(
             "req-1", "ha_get_state", {"entity_id": "sensor.temp"}, "sig", expires
         )
@@ -223,7 +452,7 @@ class TestUpdatePendingResult:
 class TestGetCompletedResults:
     async def test_returns_rows_with_result(self, db):
         """get_completed_results returns pending_requests where result IS NOT NULL."""
-        expires = "2099-01-01T00:00:00Z"
+        expires = 4070908800.0  # 2099-01-01
         await db.insert_pending("req-1", "tool_a", {}, "sig_a", expires)
         await db.insert_pending("req-2", "tool_b", {}, "sig_b", expires)
 
@@ -235,9 +464,16 @@ class TestGetCompletedResults:
         assert completed[0]["request_id"] == "req-1"
         assert completed[0]["result"] is not None
 
+    async def test_rows_are_json_serializable(self, db):
+        """Rows go straight into a JSON-RPC reply, so args must stay str."""
+        await db.insert_pending("req-1", "tool_a", {"x": 1}, "sig_a", 4070908800.0)
+        await db.update_pending_result("req-1", '{"status": "executed"}')
+        [row] = await db.get_completed_results()
+        assert json.loads(json.dumps(row))["args"] == '{"x":1}'
+
     async def test_returns_empty_when_no_results(self, db):
         """get_completed_results returns empty list when no results stored."""
-        expires = "2099-01-01T00:00:00Z"
+        expires = 4070908800.0  # 2099-01-01
         await db.insert_pending("req-1", "tool_a", {}, "sig_a", expires)
 
         completed = await db.get_completed_results()
@@ -252,7 +488,7 @@ class TestGetCompletedResults:
 class TestDeleteCompletedResults:
     async def test_deletes_specified_request_ids(self, db):
         """delete_completed_results removes rows by request_id."""
-        expires = "2099-01-01T00:00:00Z"
+        expires = 4070908800.0  # 2099-01-01
         await db.insert_pending("req-1", "tool_a", {}, "sig_a", expires)
         await db.insert_pending("req-2", "tool_b", {}, "sig_b", expires)
         await db.update_pending_result("req-1", '{"status": "ok"}')
@@ -266,7 +502,7 @@ class TestDeleteCompletedResults:
 
     async def test_deletes_multiple_ids(self, db):
         """delete_completed_results can delete multiple IDs at once."""
-        expires = "2099-01-01T00:00:00Z"
+        expires = 4070908800.0  # 2099-01-01
         await db.insert_pending("req-1", "tool_a", {}, "sig_a", expires)
         await db.insert_pending("req-2", "tool_b", {}, "sig_b", expires)
 
@@ -279,8 +515,35 @@ class TestDeleteCompletedResults:
         """delete_completed_results with empty list does not raise."""
         await db.delete_completed_results([])
 
+    async def test_more_ids_than_sql_variables(self, db):
+        """Past SQLite's old 999 host-parameter limit, in one commit."""
+        ids = [f"req-{i}" for i in range(1500)]
+        await db._get_conn().executemany(
+            "INSERT INTO pending_requests (request_id, tool_name, args, signature, expires_at)"
+            " VALUES (?, 't', '{}', 't', 0)",
+            [(i,) for i in ids],
+        )
+        await db._get_conn().commit()
+        await db.delete_completed_results([*ids[:-1], "missing"])
+        cursor = await db._get_conn().execute("SELECT request_id FROM pending_requests")
+        assert [r[0] for r in await cursor.fetchall()] == ["req-1499"]
+
 
 class TestUpdateAuditResolution:
+    async def test_non_str_keys_in_result(self, db):
+        """Service results with int keys are stored like json.dumps would (keys as str)."""
+        await db.log_audit(
+            AuditEntry(request_id="req-1", tool_name="t", decision="allow", execution_result={2: 1})
+        )
+        await db.log_audit(AuditEntry(request_id="req-2", tool_name="t", decision="ask"))
+        await db.update_audit_resolution(
+            "req-2", "approved", "12345", time.time(), execution_result={1: "a"}
+        )
+
+        entries = {e.request_id: e for e in await db.get_audit_log()}
+        assert entries["req-1"].execution_result == {"2": 1}
+        assert entries["req-2"].execution_result == {"1": "a"}
+
     async def test_updates_resolution_fields(self, db):
         """update_audit_resolution sets resolution, resolved_by, resolved_at, execution_result."""
         entry = AuditEntry(
@@ -341,6 +604,318 @@ class TestUpdateAuditResolution:
         )
 
 
+def _audit(request_id: str) -> AuditEntry:
+    return AuditEntry(
+        request_id=request_id,
+        tool_name="ha_get_state",
+        args={},
+        signature="ha_get_state",
+        decision="allow",
+    )
+
+
+def _recording(execute, queries: list[str]):
+    """Wrap a connection's execute to record each SQL statement."""
+
+    async def wrapper(sql, *args):
+        queries.append(sql)
+        return await execute(sql, *args)
+
+    return wrapper
+
+
+async def _raw_audit_count(db: Database) -> int:
+    cursor = await db._get_conn().execute("SELECT COUNT(*) FROM audit_log")
+    return (await cursor.fetchone())[0]
+
+
+class TestAuditGroupCommit:
+    async def test_wal_mode_enabled(self, db):
+        cursor = await db._get_conn().execute("PRAGMA journal_mode")
+        assert (await cursor.fetchone())[0] == "wal"
+
+    async def test_entries_committed_in_background(self, db):
+        for i in range(5):
+            await db.log_audit(_audit(f"req-{i}"))
+        assert await _raw_audit_count(db) == 0  # still queued
+
+        await asyncio.sleep(0.1)
+        assert await _raw_audit_count(db) == 5
+
+    async def test_full_batch_written_immediately(self, db):
+        from agentpass.db import _AUDIT_BATCH_MAX
+
+        for i in range(_AUDIT_BATCH_MAX):
+            await db.log_audit(_audit(f"req-{i}"))
+        assert await _raw_audit_count(db) == _AUDIT_BATCH_MAX
+
+    async def test_resolution_update_sees_queued_entry(self, db):
+        await db.log_audit(_audit("req-1"))
+        await db.update_audit_resolution("req-1", "approved", "user:1", time.time())
+        entries = await db.get_audit_log()
+        assert entries[0].resolution == "approved"
+
+    async def test_close_flushes_queue(self, tmp_path):
+        path = str(tmp_path / "flush.db")
+        database = Database(path)
+        await database.initialize()
+        await database.log_audit(_audit("req-1"))
+        await database.close()
+
+        reopened = Database(path)
+        await reopened.initialize()
+        assert len(await reopened.get_audit_log()) == 1
+        await reopened.close()
+
+    async def test_failed_flush_keeps_rows(self, db):
+        """A failed write requeues its batch ahead of newer entries; nothing is lost."""
+        conn = db._get_conn()
+        executemany = conn.executemany
+        conn.executemany = AsyncMock(side_effect=sqlite3.OperationalError("disk I/O error"))
+        await db.log_audit(_audit("req-1"))
+        await db.log_audit(_audit("req-2"))
+        with pytest.raises(sqlite3.OperationalError):
+            await db.get_audit_log()
+
+        await db.log_audit(_audit("req-3"))
+        conn.executemany = executemany
+        entries = await db.get_audit_log()
+        assert [e.request_id for e in entries] == ["req-3", "req-2", "req-1"]
+
+    async def test_background_flush_failure_retried(self, db, caplog):
+        conn = db._get_conn()
+        executemany = conn.executemany
+        conn.executemany = AsyncMock(side_effect=sqlite3.OperationalError("disk I/O error"))
+        await db.log_audit(_audit("req-1"))
+        await asyncio.sleep(0.1)
+        assert "Failed to write audit log entries" in caplog.text
+        assert db._audit_flusher is None
+
+        conn.executemany = executemany
+        await db.log_audit(_audit("req-2"))
+        await asyncio.sleep(0.1)
+        assert await _raw_audit_count(db) == 2
+
+    @pytest.mark.skipif(platform.system() == "Windows", reason="Unix permissions")
+    async def test_wal_files_private(self, db, tmp_path):
+        await db.log_audit(_audit("req-1"))
+        await db.get_audit_log()
+        wal = tmp_path / "test.db-wal"
+        assert wal.exists()
+        assert stat.S_IMODE(os.stat(wal).st_mode) == 0o600
+
+
+async def _insert_pending(db, *request_ids: str) -> None:
+    for request_id in request_ids:
+        await db.insert_pending(request_id, "t", {}, "t", time.time() + 300)
+
+
+async def _raw_pending(db) -> dict[str, str | None]:
+    """Committed pending rows, bypassing the queue flush."""
+    cursor = await db._get_reader().execute("SELECT request_id, result FROM pending_requests")
+    return {row[0]: row[1] for row in await cursor.fetchall()}
+
+
+class TestPendingCoalescing:
+    async def test_burst_committed_once(self, db):
+        await _insert_pending(db, "a", "b", "c")
+        commit = db._get_conn().commit
+        db._get_conn().commit = AsyncMock(side_effect=commit)
+
+        await db.update_pending_result("a", '{"status": "executed"}')
+        await db.delete_pending("b")
+        await db.delete_pending("c")
+        assert await _raw_pending(db) == {"a": None, "b": None, "c": None}  # still queued
+
+        await asyncio.sleep(0.05)
+        assert await _raw_pending(db) == {"a": '{"status": "executed"}'}
+        assert db._get_conn().commit.await_count == 1
+
+    async def test_mutations_applied_in_order(self, db):
+        await _insert_pending(db, "a")
+        await db.update_pending_result("a", "1")
+        await db.delete_pending("a")
+        await db.update_pending_result("a", "2")  # no row left: no-op
+        assert await db.get_pending("a") is None
+
+    async def test_reads_see_queued_mutations(self, db):
+        await _insert_pending(db, "a", "b")
+        await db.update_pending_result("a", "{}")
+        assert [r["request_id"] for r in await db.get_completed_results()] == ["a"]
+        await db.delete_pending("b")
+        assert await db.get_pending("b") is None
+
+    async def test_close_flushes_queue(self, tmp_path):
+        path = str(tmp_path / "flush.db")
+        database = Database(path)
+        await database.initialize()
+        await _insert_pending(database, "a")
+        await database.update_pending_result("a", "{}")
+        await database.close()
+
+        reopened = Database(path)
+        await reopened.initialize()
+        assert (await reopened.get_pending("a"))["result"] == "{}"
+        await reopened.close()
+
+    async def test_failed_flush_requeued(self, db, caplog):
+        await _insert_pending(db, "a")
+        conn = db._get_conn()
+        executemany = conn.executemany
+        conn.executemany = AsyncMock(side_effect=sqlite3.OperationalError("disk I/O error"))
+        await db.update_pending_result("a", "{}")
+        await asyncio.sleep(0.05)
+        assert "Failed to write pending request updates" in caplog.text
+        assert db._pending_flusher is None
+
+        conn.executemany = executemany
+        assert (await db.get_pending("a"))["result"] == "{}"
+
+
+class TestSharedCommit:
+    async def test_ask_path_commits_once(self, db):
+        commit = db._get_conn().commit
+        db._get_conn().commit = AsyncMock(side_effect=commit)
+
+        await db.log_audit(_audit("req-1"))
+        await db.insert_pending("req-1", "t", {}, "t", time.time() + 300)
+
+        assert db._get_conn().commit.await_count == 1
+        assert await _raw_audit_count(db) == 1
+        assert "req-1" in await _raw_pending(db)
+
+    async def test_resolution_commits_queued_delete(self, db):
+        await db.log_audit(_audit("req-1"))
+        await _insert_pending(db, "req-1")
+        commit = db._get_conn().commit
+        db._get_conn().commit = AsyncMock(side_effect=commit)
+
+        await db.delete_pending("req-1")
+        await db.update_audit_resolution("req-1", "approved", "user:1", time.time())
+
+        assert db._get_conn().commit.await_count == 1
+        assert await _raw_pending(db) == {}
+        assert db._pending_writes == []
+
+    async def test_failed_write_requeues_queued_writes(self, db):
+        await _insert_pending(db, "a")
+        await db.log_audit(_audit("req-1"))
+        await db.delete_pending("a")
+        conn = db._get_conn()
+        execute = conn.execute
+        conn.execute = AsyncMock(side_effect=sqlite3.OperationalError("disk I/O error"))
+        with pytest.raises(sqlite3.OperationalError):
+            await db.update_audit_resolution("req-1", "approved", "user:1", time.time())
+
+        conn.execute = execute
+        assert await _raw_audit_count(db) == 0
+        assert await _raw_pending(db) == {"a": None}
+        assert len(await db.get_audit_log()) == 1
+        assert await db.get_pending("a") is None
+
+
+class TestReadPool:
+    async def test_readers_are_read_only(self, db):
+        reader = db._get_reader()
+        assert reader is not db._get_conn()
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            await reader.execute("DELETE FROM audit_log")
+
+    async def test_connection_pragmas(self, db):
+        """Writer and readers share the cache settings and a 5 s busy wait."""
+        for conn in [db._get_conn(), *db._readers]:
+            values = []
+            for pragma in ("cache_size", "temp_store", "mmap_size", "busy_timeout"):
+                cursor = await conn.execute(f"PRAGMA {pragma}")
+                values.append((await cursor.fetchone())[0])
+            assert values == [-20000, 2, 268435456, 5000]
+        cursor = await db._get_conn().execute("PRAGMA synchronous")
+        assert (await cursor.fetchone())[0] == 1  # NORMAL
+
+    async def test_statement_cache_sized_for_filter_shapes(self, tmp_path, monkeypatch):
+        import aiosqlite
+
+        from agentpass.db import _READ_POOL_SIZE, _STATEMENT_CACHE
+
+        connect = MagicMock(wraps=aiosqlite.connect)
+        monkeypatch.setattr(aiosqlite, "connect", connect)
+        database = Database(str(tmp_path / "stmts.db"))
+        await database.initialize()
+        await database.close()
+        assert _STATEMENT_CACHE > 2 * 64  # count + page SQL per filter shape
+        assert connect.call_count == 1 + _READ_POOL_SIZE
+        assert all(
+            c.kwargs["cached_statements"] == _STATEMENT_CACHE for c in connect.call_args_list
+        )
+
+    async def test_round_robin(self, db):
+        from agentpass.db import _READ_POOL_SIZE
+
+        readers = {id(db._get_reader()) for _ in range(_READ_POOL_SIZE * 2)}
+        assert len(readers) == _READ_POOL_SIZE
+
+    async def test_pending_reads_use_pool(self, db, monkeypatch):
+        await db.insert_pending("a", "t", {}, "t", time.time() + 300)
+        await db.update_pending_result("a", "{}")
+        reader = MagicMock(wraps=db._get_reader)
+        monkeypatch.setattr(db, "_get_reader", reader)
+        assert (await db.get_pending("a"))["result"] == "{}"
+        assert [r["request_id"] for r in await db.get_completed_results()] == ["a"]
+        assert reader.call_count == 2
+
+    async def test_reads_see_background_commit_in_flight(self, db):
+        """A read racing the background flusher still sees the entry."""
+        await db.log_audit(_audit("req-1"))
+        await asyncio.sleep(0.011)  # flusher may be mid-commit
+        assert [e.request_id for e in await db.get_audit_log()] == ["req-1"]
+        _, total = await db.get_audit_log_filtered()
+        assert total == 1
+
+    async def test_close_closes_readers(self, tmp_path):
+        database = Database(str(tmp_path / "pool.db"))
+        await database.initialize()
+        await database.close()
+        assert database._readers == []
+
+
+class TestDistinctToolNames:
+    async def test_sorted_and_non_empty(self, db):
+        for tool in ("b_tool", "", "a_tool", "b_tool"):
+            await db.log_audit(AuditEntry(request_id="r", tool_name=tool))
+        assert await db.get_distinct_tool_names() == ["a_tool", "b_tool"]
+
+    async def test_cached_until_new_tool(self, db, monkeypatch):
+        """A known tool name keeps the cache; an unseen one invalidates it."""
+        await db.log_audit(AuditEntry(request_id="r1", tool_name="a_tool"))
+        assert await db.get_distinct_tool_names() == ["a_tool"]
+
+        reader = MagicMock(wraps=db._get_reader)
+        monkeypatch.setattr(db, "_get_reader", reader)
+        await db.log_audit(AuditEntry(request_id="r2", tool_name="a_tool"))
+        assert await db.get_distinct_tool_names() == ["a_tool"]
+        reader.assert_not_called()
+
+        await db.log_audit(AuditEntry(request_id="r3", tool_name="b_tool"))
+        assert await db.get_distinct_tool_names() == ["a_tool", "b_tool"]
+        reader.assert_called_once()
+
+    async def test_cache_expires(self, db, monkeypatch):
+        from agentpass import db as db_module
+
+        await db.log_audit(AuditEntry(request_id="r1", tool_name="a_tool"))
+        assert await db.get_distinct_tool_names() == ["a_tool"]
+        conn = db._get_conn()
+        await conn.execute(
+            "INSERT INTO audit_log (timestamp, request_id, tool_name, args, signature, decision)"
+            " VALUES (1.0, 'r2', 'c_tool', '{}', '', 'allow')"
+        )
+        await conn.commit()
+        assert await db.get_distinct_tool_names() == ["a_tool"]
+
+        monkeypatch.setattr(db_module, "_TOOL_NAMES_TTL", 0.0)
+        assert await db.get_distinct_tool_names() == ["a_tool", "c_tool"]
+
+
 class TestHealthCheck:
     async def test_returns_true_when_connected(self, db):
         """health_check returns True when database connection is alive."""
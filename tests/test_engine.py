@@ -1,5 +1,7 @@
 """Tests for agentpass.engine — signature building, validation, permission evaluation."""
 
+from unittest.mock import patch
+
 import pytest
 
 from agentpass.config import (
@@ -66,6 +68,20 @@ class TestValidateArgs:
         with pytest.raises(ValueError, match="forbidden"):
             validate_args("ha_get_state", {"entity_id": "light\x01"})
 
+    def test_forbidden_set_matches_previous_regex(self):
+        """The frozenset rejects exactly what the former regex class did."""
+        import re
+
+        old_re = re.compile(r"[*?\[\](),\x00-\x1f]")
+        for code in range(0x300):
+            ch = chr(code)
+            rejected = False
+            try:
+                validate_args("t", {"v": f"a{ch}b"})
+            except ValueError:
+                rejected = True
+            assert rejected == bool(old_re.search(ch)), repr(ch)
+
     def test_skips_non_string_values(self):
         # Should not raise — non-string values are skipped
         validate_args("some_tool", {"key": "valid", "number": 255})
@@ -104,6 +120,57 @@ class TestPermissionEngine:
         )
         assert result == Decision.DENY
 
+    @pytest.mark.parametrize(
+        ("pattern", "signature"),
+        [
+            ("ha_get_state(sensor.*)", "ha_get_state(sensor.temp)"),
+            ("ha_get_state(sensor.temp_?)", "ha_get_state(sensor.temp_1)"),
+            ("ha_get_state(sensor.[ab]*)", "ha_get_state(sensor.attic)"),
+            ("ha_get_state(sensor.[!ab]*)", "ha_get_state(sensor.attic)"),
+            ("ha_get_state", "ha_get_state(sensor.temp)"),
+            ("*", "anything"),
+        ],
+    )
+    def test_rule_matching_agrees_with_fnmatch(self, pattern, signature):
+        """Precompiled globs match exactly where fnmatch would."""
+        from fnmatch import fnmatchcase
+
+        engine = PermissionEngine(self._make_permissions(rules=[(pattern, "deny")]))
+        expected = Decision.DENY if fnmatchcase(signature, pattern) else Decision.ASK
+        name, _, rest = signature.partition("(")
+        args = {"a": rest.rstrip(")")} if rest else {}
+        assert build_signature(name, args) == signature
+        assert engine.evaluate(name, args) == expected
+
+    def test_interleaved_defaults_keep_order(self):
+        """Only consecutive same-action defaults are merged; order still decides."""
+        perms = self._make_permissions(
+            defaults=[
+                ("a_*", "allow"),
+                ("a_b*", "allow"),
+                ("a_*", "deny"),
+                ("c_*", "allow"),
+                ("*", "ask"),
+            ],
+        )
+        engine = PermissionEngine(perms)
+        assert len(engine._defaults) == 4
+        assert engine.evaluate("a_b", {}) == Decision.ALLOW
+        assert engine.evaluate("c_d", {}) == Decision.ALLOW
+        assert engine.evaluate("x", {}) == Decision.ASK
+
+    def test_no_rules_or_defaults_falls_back_to_ask(self):
+        engine = PermissionEngine(self._make_permissions())
+        assert engine.evaluate("anything", {"a": "b"}) == Decision.ASK
+
+    def test_generated_decider_ignores_pattern_text(self):
+        """Patterns never reach exec as source, so quotes/newlines are harmless."""
+        perms = self._make_permissions(
+            rules=[('x"\n    return 1', "deny")], defaults=[("*", "allow")]
+        )
+        engine = PermissionEngine(perms)
+        assert engine.evaluate("tool", {}) == Decision.ALLOW
+
     def test_allow_rule_when_no_deny(self, ha_registry):
         perms = self._make_permissions(
             rules=[("ha_get_state(sensor.*)", "allow")],
@@ -319,7 +386,7 @@ class TestValidateArgsWithRegistry:
         )
 
     def test_forbidden_chars_still_checked(self, ha_registry):
-        """Even with registry, FORBIDDEN_CHARS_RE applies before registry validation."""
+        """Even with registry, FORBIDDEN_CHARS applies before registry validation."""
         with pytest.raises(ValueError, match="forbidden"):
             validate_args(
                 "ha_get_state",
@@ -327,6 +394,15 @@ class TestValidateArgsWithRegistry:
                 registry=ha_registry,
             )
 
+    def test_bad_values_reported_before_missing_required(self, ha_registry):
+        """Value checks run in the same pass; missing args are reported after."""
+        with pytest.raises(ValueError, match="forbidden"):
+            validate_args("ha_call_service", {"entity_id": "light.*"}, registry=ha_registry)
+
+    def test_missing_required_reported_deterministically(self, ha_registry):
+        with pytest.raises(ValueError, match="Missing required argument: domain"):
+            validate_args("ha_call_service", {}, registry=ha_registry)
+
     def test_optional_arg_missing_is_ok(self, ha_registry):
         """ha_call_service has optional entity_id — missing is fine."""
         validate_args(
@@ -370,3 +446,36 @@ class TestPermissionEngineWithRegistry:
         engine = PermissionEngine(perms, registry=ha_registry)
         result = engine.evaluate("ha_get_state", {"entity_id": "sensor.temp"})
         assert result == Decision.ALLOW
+
+
+class TestSignatureCache:
+    def test_repeated_request_builds_signature_once(self, ha_registry):
+        engine = PermissionEngine(Permissions(defaults=[], rules=[]), registry=ha_registry)
+        with patch("agentpass.engine.build_signature", wraps=build_signature) as build:
+            for _ in range(3):
+                engine.evaluate("ha_get_state", {"entity_id": "sensor.temp"})
+        assert build.call_count == 1
+
+    def test_value_types_are_distinct_keys(self):
+        perms = Permissions(defaults=[], rules=[PermissionRule(pattern="t(True)", action="deny")])
+        engine = PermissionEngine(perms)
+        assert engine.evaluate("t", {"a": 1}) == Decision.ASK
+        assert engine.evaluate("t", {"a": True}) == Decision.DENY
+
+    def test_unhashable_args_bypass_cache(self):
+        engine = PermissionEngine(Permissions(defaults=[], rules=[]))
+        engine.evaluate("t", {"a": ["x"]})
+        assert len(engine._signature_cache) == 0
+
+    def test_invalid_args_raise_every_time(self, ha_registry):
+        engine = PermissionEngine(Permissions(defaults=[], rules=[]), registry=ha_registry)
+        for _ in range(2):
+            with pytest.raises(ValueError, match="forbidden"):
+                engine.evaluate("ha_get_state", {"entity_id": "sensor.*"})
+
+    def test_cache_is_bounded(self):
+        engine = PermissionEngine(Permissions(defaults=[], rules=[]))
+        with patch("agentpass.engine._SIGNATURE_CACHE_SIZE", 2):
+            for i in range(3):
+                engine.evaluate("t", {"a": str(i)})
+        assert [key[1][0][2] for key in engine._signature_cache] == ["1", "2"]
@@ -15,7 +15,7 @@ from agentpass.config import (
     ToolDefinition,
     load_tools_file,
 )
-from agentpass.services.http import GenericHTTPService, HTTPServiceError
+from agentpass.services.http import GenericHTTPService, HTTPServiceError, _compile_path
 
 # --- Test helpers ---
 
@@ -314,6 +314,18 @@ class TestGenericHTTPServiceAuth:
         call_kwargs = session.get.call_args[1]
         assert call_kwargs["params"]["api_key"] == "my-key"
 
+    async def test_non_query_auth_sends_no_params(self):
+        """Header-based auth resolves at construction and adds no query params."""
+        svc = GenericHTTPService(_make_ha_config())
+        assert svc._auth_headers == {"Authorization": "Bearer test-token"}
+        session = _mock_session()
+        session.get = MagicMock(return_value=_mock_response(json_data={}))
+        svc._session = session
+
+        await svc.execute("ha_get_state", {"entity_id": "sensor.temp"})
+
+        assert session.get.call_args[1]["params"] is None
+
     async def test_basic_auth(self):
         """Basic auth uses aiohttp.BasicAuth on the session."""
         config = ServiceConfig(
@@ -447,36 +459,66 @@ class TestGenericHTTPServiceMisc:
 
     async def test_path_interpolation(self):
         """Static method correctly replaces {key} placeholders."""
-        result = GenericHTTPService._interpolate_path(
-            "/api/states/{entity_id}", {"entity_id": "sensor.temp"}
+        result = GenericHTTPService._render_path(
+            _compile_path("/api/states/{entity_id}"), {"entity_id": "sensor.temp"}
         )
         assert result == "/api/states/sensor.temp"
 
     async def test_path_interpolation_multiple_placeholders(self):
         """Multiple placeholders are replaced."""
-        result = GenericHTTPService._interpolate_path(
-            "/api/services/{domain}/{service}",
+        result = GenericHTTPService._render_path(
+            _compile_path("/api/services/{domain}/{service}"),
             {"domain": "light", "service": "turn_on"},
         )
         assert result == "/api/services/light/turn_on"
 
     async def test_path_interpolation_missing_key(self):
         """Missing key in args results in empty string substitution."""
-        result = GenericHTTPService._interpolate_path("/api/states/{entity_id}", {})
+        result = GenericHTTPService._render_path(_compile_path("/api/states/{entity_id}"), {})
         assert result == "/api/states/"
 
+    async def test_path_interpolation_non_string_and_literal_braces(self):
+        """Non-string values are str()'d; braces around non-words stay literal."""
+        result = GenericHTTPService._render_path(
+            _compile_path("/api/{id}/{not-an-arg}/{}"), {"id": 42}
+        )
+        assert result == "/api/42/{not-an-arg}/{}"
+
     async def test_body_no_exclude(self):
         """All args appear in body when no body_exclude is set."""
+        args = {"a": 1, "b": 2, "c": 3}
+        body = GenericHTTPService._build_body(frozenset(), args)
+        assert body == {"a": 1, "b": 2, "c": 3}
+        assert body is args  # passed through without a copy
+
+    async def test_compiled_request_folds_base_url(self):
+        """The base URL is merged into the leading literal path segment."""
         from agentpass.config import RequestDefinition
 
-        tool = ToolDefinition(
-            name="test_tool",
-            service_name="test",
-            request=RequestDefinition(method="POST", path="/test"),
-            # no body_exclude
+        svc = GenericHTTPService(
+            ServiceConfig(
+                name="test",
+                url="http://example.com/",
+                auth=AuthConfig(type="bearer", token="tok"),
+                tools=[
+                    ToolDefinition(
+                        name="root_arg",
+                        service_name="test",
+                        request=RequestDefinition(method="PUT", path="{id}", body_exclude=["id"]),
+                    ),
+                ],
+            )
         )
-        body = GenericHTTPService._build_body(tool, {"a": 1, "b": 2, "c": 3})
-        assert body == {"a": 1, "b": 2, "c": 3}
+        request = svc._requests["root_arg"]
+        assert request.url == ((False, "http://example.com"), (True, "id"))
+        assert request.send_body
+        assert request.body_exclude == frozenset({"id"})
+        assert request.wrap is None
+
+        ha = GenericHTTPService(_make_ha_config())._requests["ha_get_states"]
+        assert ha.url == ((False, "http://ha-test:8123/api/states"),)
+        assert not ha.send_body
+        assert ha.wrap == "states"
 
     async def test_response_no_wrap(self):
         """Raw response when tool has no response.wrap defined."""
@@ -546,6 +588,96 @@ class TestGenericHTTPServiceMisc:
         assert not session2.closed
         await session2.close()
 
+    async def test_start_creates_session_eagerly(self):
+        """start() opens the session so execute() never takes the lazy path."""
+        svc = GenericHTTPService(_make_ha_config())
+        assert svc._session is None
+
+        await svc.start()
+        assert svc._session is not None
+        assert not svc._session.closed
+        await svc.close()
+
+    async def test_execute_replaces_session_closed_with_connector(self):
+        """A session whose shared connector was closed is recreated, not reused."""
+        from agentpass.services.http import close_shared_connector
+
+        svc = GenericHTTPService(_make_ha_config())
+        await svc.start()
+        stale = svc._session
+        await close_shared_connector()
+        assert stale.closed
+
+        svc._execute_request = AsyncMock(return_value={"state": "on"})
+        assert await svc.execute("ha_get_state", {"entity_id": "sensor.temp"}) == {"state": "on"}
+        used = svc._execute_request.await_args.args[0]
+        assert used is not stale
+        assert not used.closed
+        await svc.close()
+        await close_shared_connector()
+
+    async def test_json_uses_orjson(self):
+        """Responses decode with orjson.loads; bodies encode through _json_dumps."""
+        import orjson
+
+        from agentpass.services.http import _json_dumps
+
+        svc = GenericHTTPService(_make_ha_config())
+        session = _mock_session()
+        cm = _mock_response(json_data={"state": "on"})
+        session.get = MagicMock(return_value=cm)
+        svc._session = session
+
+        await svc.execute("ha_get_state", {"entity_id": "sensor.temp"})
+
+        resp = await cm.__aenter__()
+        resp.json.assert_awaited_once_with(loads=orjson.loads)
+
+        svc._session = None
+        real = svc._get_session()
+        assert real._json_serialize is _json_dumps
+        assert _json_dumps({"a": "ü", "b": [1, None]}) == '{"a":"ü","b":[1,null]}'
+        await svc.close()
+
+    async def test_method_fn_cached_per_session(self):
+        """The bound session method is looked up once, then reused."""
+        svc = GenericHTTPService(_make_ha_config())
+        session = _mock_session()
+        session.get = MagicMock(return_value=_mock_response(json_data={}))
+        svc._session = session
+
+        await svc.execute("ha_get_state", {"entity_id": "sensor.a"})
+        await svc.execute("ha_get_state", {"entity_id": "sensor.b"})
+
+        assert svc._method_fns == {"GET": session.get}
+        assert session.get.call_count == 2
+
+        session.close = AsyncMock()
+        await svc.close()
+        assert svc._method_fns == {}
+
+    async def test_services_share_one_connector(self):
+        """Sessions of different services pool connections through one connector."""
+        from agentpass.services.http import close_shared_connector
+
+        first = GenericHTTPService(_make_ha_config())
+        second = GenericHTTPService(_make_ha_config(base_url="http://other:8123"))
+        connector = first._get_session().connector
+        assert second._get_session().connector is connector
+
+        await first.close()
+        assert not connector.closed  # services don't own the connector
+
+        await second.close()
+        await close_shared_connector()
+        assert connector.closed
+
+        # A later session gets a fresh connector
+        third = GenericHTTPService(_make_ha_config())
+        assert third._get_session().connector is not connector
+        await third.close()
+        await close_shared_connector()
+
     async def test_error_mapping_with_templates(self):
         """Error mapping message supports {status} and {body} templates."""
         config = ServiceConfig(
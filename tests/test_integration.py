@@ -205,6 +205,20 @@ class TestAutoAllowedRequest:
         assert result == {"entity_id": "sensor.temp", "state": "21.3"}
 
 
+class TestBatchedRequests:
+    """Concurrent requests sent as a JSON-RPC batch each get their own result."""
+
+    async def test_batched_requests(self, gateway_env):
+        url, _messenger, _gateway, _db = gateway_env
+
+        async with AgentPassClient(url, TOKEN, batch_requests=True) as client:
+            results = await asyncio.gather(
+                *(client.tool_request("ha_get_state", entity_id=f"sensor.t{i}") for i in range(5))
+            )
+
+        assert results == [{"entity_id": f"sensor.t{i}", "state": "21.3"} for i in range(5)]
+
+
 class TestPolicyDeniedRequest:
     """FR10-AC4: A policy-denied request raises AgentPassDenied with -32003."""
 
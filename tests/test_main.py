@@ -3,8 +3,11 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import logging
 import signal
+import subprocess
+import sys
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -120,9 +123,9 @@ def _patch_health_server():
     """Patch aiohttp web module to prevent binding to real ports."""
     mock_runner, mock_site = _make_mock_health_server()
     with (
-        patch(f"{_PATCH_PREFIX}.web.Application", return_value=MagicMock()),
-        patch(f"{_PATCH_PREFIX}.web.AppRunner", return_value=mock_runner),
-        patch(f"{_PATCH_PREFIX}.web.TCPSite", return_value=mock_site),
+        patch("aiohttp.web.Application", return_value=MagicMock()),
+        patch("aiohttp.web.AppRunner", return_value=mock_runner),
+        patch("aiohttp.web.TCPSite", return_value=mock_site),
     ):
         yield
 
@@ -131,7 +134,8 @@ def _patch_health_server():
 # run() orchestration tests
 # ---------------------------------------------------------------------------
 
-# Common patch targets for run() tests
+# Common patch targets for run() tests; gateway components are patched where
+# they are defined, since run() imports them lazily
 _PATCH_PREFIX = "agentpass.__main__"
 
 
@@ -147,8 +151,8 @@ class TestRunTlsCheck:
         mock_config = _make_mock_config(tls=None)
 
         with (
-            patch(f"{_PATCH_PREFIX}.load_config", return_value=mock_config),
-            patch(f"{_PATCH_PREFIX}.load_permissions", return_value=_make_mock_permissions()),
+            patch("agentpass.config.load_config", return_value=mock_config),
+            patch("agentpass.config.load_permissions", return_value=_make_mock_permissions()),
             patch(f"{_PATCH_PREFIX}.sys") as mock_sys,
         ):
             # sys.exit raises SystemExit — simulate that
@@ -184,14 +188,14 @@ class TestRunTlsCheck:
         mock_stop_event.set = MagicMock()
 
         with (
-            patch(f"{_PATCH_PREFIX}.load_config", return_value=mock_config),
-            patch(f"{_PATCH_PREFIX}.load_permissions", return_value=_make_mock_permissions()),
-            patch(f"{_PATCH_PREFIX}.Database", return_value=mock_db),
-            patch(f"{_PATCH_PREFIX}.GenericHTTPService", return_value=mock_ha),
-            patch(f"{_PATCH_PREFIX}.build_registry", return_value=MagicMock()),
-            patch(f"{_PATCH_PREFIX}.TelegramAdapter", return_value=mock_telegram),
-            patch(f"{_PATCH_PREFIX}.GatewayServer", return_value=mock_gateway),
-            patch(f"{_PATCH_PREFIX}.websockets.asyncio.server.serve", return_value=mock_ws_cm),
+            patch("agentpass.config.load_config", return_value=mock_config),
+            patch("agentpass.config.load_permissions", return_value=_make_mock_permissions()),
+            patch("agentpass.db.Database", return_value=mock_db),
+            patch("agentpass.services.http.GenericHTTPService", return_value=mock_ha),
+            patch("agentpass.registry.build_registry", return_value=MagicMock()),
+            patch("agentpass.messenger.telegram.TelegramAdapter", return_value=mock_telegram),
+            patch("agentpass.server.GatewayServer", return_value=mock_gateway),
+            patch("websockets.asyncio.server.serve", return_value=mock_ws_cm),
             patch(f"{_PATCH_PREFIX}.asyncio.Event", return_value=mock_stop_event),
         ):
             await run(args)
@@ -265,14 +269,14 @@ class TestRunStartupSequence:
         mock_stop_event.wait = AsyncMock(side_effect=track_stop_wait)
 
         with (
-            patch(f"{_PATCH_PREFIX}.load_config", return_value=mock_config),
-            patch(f"{_PATCH_PREFIX}.load_permissions", return_value=_make_mock_permissions()),
-            patch(f"{_PATCH_PREFIX}.Database", return_value=mock_db),
-            patch(f"{_PATCH_PREFIX}.GenericHTTPService", return_value=mock_ha),
-            patch(f"{_PATCH_PREFIX}.build_registry", return_value=MagicMock()),
-            patch(f"{_PATCH_PREFIX}.TelegramAdapter", return_value=mock_telegram),
-            patch(f"{_PATCH_PREFIX}.GatewayServer", return_value=mock_gateway),
-            patch(f"{_PATCH_PREFIX}.websockets.asyncio.server.serve", return_value=mock_ws_cm),
+            patch("agentpass.config.load_config", return_value=mock_config),
+            patch("agentpass.config.load_permissions", return_value=_make_mock_permissions()),
+            patch("agentpass.db.Database", return_value=mock_db),
+            patch("agentpass.services.http.GenericHTTPService", return_value=mock_ha),
+            patch("agentpass.registry.build_registry", return_value=MagicMock()),
+            patch("agentpass.messenger.telegram.TelegramAdapter", return_value=mock_telegram),
+            patch("agentpass.server.GatewayServer", return_value=mock_gateway),
+            patch("websockets.asyncio.server.serve", return_value=mock_ws_cm),
             patch(f"{_PATCH_PREFIX}.asyncio.Event", return_value=mock_stop_event),
         ):
             await run(args)
@@ -283,6 +287,55 @@ class TestRunStartupSequence:
         assert call_order.index("ptb.start") < call_order.index("ptb.updater.start_polling")
         assert call_order.index("ptb.updater.start_polling") < call_order.index("ws_ready")
 
+    @pytest.mark.asyncio
+    async def test_stale_cleanup_does_not_delay_ready(self):
+        """Stale pending cleanup runs in the background and is awaited before db.close()."""
+        from agentpass.__main__ import run
+
+        args = argparse.Namespace(config="c.yaml", permissions="p.yaml", insecure=True)
+        mock_config = _make_mock_config(tls=None)
+        mock_telegram = AsyncMock()
+        mock_telegram.application = _make_mock_ptb_app()
+        mock_ha = AsyncMock()
+        mock_ha.health_check = AsyncMock(return_value=True)
+
+        call_order = []
+        release = asyncio.Event()
+
+        async def slow_cleanup():
+            await release.wait()
+            call_order.append("cleanup_done")
+            return [{"request_id": "old"}]
+
+        async def track_stop_wait():
+            call_order.append("ws_ready")
+            release.set()
+
+        async def track_close():
+            call_order.append("db.close")
+
+        mock_db = AsyncMock()
+        mock_db.cleanup_stale_requests = AsyncMock(side_effect=slow_cleanup)
+        mock_db.close = AsyncMock(side_effect=track_close)
+        mock_stop_event = AsyncMock()
+        mock_stop_event.wait = AsyncMock(side_effect=track_stop_wait)
+        mock_stop_event.set = MagicMock()
+
+        with (
+            patch("agentpass.config.load_config", return_value=mock_config),
+            patch("agentpass.config.load_permissions", return_value=_make_mock_permissions()),
+            patch("agentpass.db.Database", return_value=mock_db),
+            patch("agentpass.services.http.GenericHTTPService", return_value=mock_ha),
+            patch("agentpass.registry.build_registry", return_value=MagicMock()),
+            patch("agentpass.messenger.telegram.TelegramAdapter", return_value=mock_telegram),
+            patch("agentpass.server.GatewayServer", return_value=AsyncMock()),
+            patch("websockets.asyncio.server.serve", return_value=_make_ws_serve_cm()),
+            patch(f"{_PATCH_PREFIX}.asyncio.Event", return_value=mock_stop_event),
+        ):
+            await run(args)
+
+        assert call_order == ["ws_ready", "cleanup_done", "db.close"]
+
     @pytest.mark.asyncio
     async def test_logs_ready_message(self, caplog):
         """FR10-AC2: Logs 'ready' when startup completes."""
@@ -309,14 +362,14 @@ class TestRunStartupSequence:
         mock_stop_event.set = MagicMock()
 
         with (
-            patch(f"{_PATCH_PREFIX}.load_config", return_value=mock_config),
-            patch(f"{_PATCH_PREFIX}.load_permissions", return_value=_make_mock_permissions()),
-            patch(f"{_PATCH_PREFIX}.Database", return_value=mock_db),
-            patch(f"{_PATCH_PREFIX}.GenericHTTPService", return_value=mock_ha),
-            patch(f"{_PATCH_PREFIX}.build_registry", return_value=MagicMock()),
-            patch(f"{_PATCH_PREFIX}.TelegramAdapter", return_value=mock_telegram),
-            patch(f"{_PATCH_PREFIX}.GatewayServer", return_value=mock_gateway),
-            patch(f"{_PATCH_PREFIX}.websockets.asyncio.server.serve", return_value=mock_ws_cm),
+            patch("agentpass.config.load_config", return_value=mock_config),
+            patch("agentpass.config.load_permissions", return_value=_make_mock_permissions()),
+            patch("agentpass.db.Database", return_value=mock_db),
+            patch("agentpass.services.http.GenericHTTPService", return_value=mock_ha),
+            patch("agentpass.registry.build_registry", return_value=MagicMock()),
+            patch("agentpass.messenger.telegram.TelegramAdapter", return_value=mock_telegram),
+            patch("agentpass.server.GatewayServer", return_value=mock_gateway),
+            patch("websockets.asyncio.server.serve", return_value=mock_ws_cm),
             patch(f"{_PATCH_PREFIX}.asyncio.Event", return_value=mock_stop_event),
             caplog.at_level(logging.INFO, logger="agentpass"),
         ):
@@ -354,14 +407,14 @@ class TestRunHealthCheck:
         mock_stop_event.set = MagicMock()
 
         with (
-            patch(f"{_PATCH_PREFIX}.load_config", return_value=mock_config),
-            patch(f"{_PATCH_PREFIX}.load_permissions", return_value=_make_mock_permissions()),
-            patch(f"{_PATCH_PREFIX}.Database", return_value=mock_db),
-            patch(f"{_PATCH_PREFIX}.GenericHTTPService", return_value=mock_ha),
-            patch(f"{_PATCH_PREFIX}.build_registry", return_value=MagicMock()),
-            patch(f"{_PATCH_PREFIX}.TelegramAdapter", return_value=mock_telegram),
-            patch(f"{_PATCH_PREFIX}.GatewayServer", return_value=mock_gateway),
-            patch(f"{_PATCH_PREFIX}.websockets.asyncio.server.serve", return_value=mock_ws_cm),
+            patch("agentpass.config.load_config", return_value=mock_config),
+            patch("agentpass.config.load_permissions", return_value=_make_mock_permissions()),
+            patch("agentpass.db.Database", return_value=mock_db),
+            patch("agentpass.services.http.GenericHTTPService", return_value=mock_ha),
+            patch("agentpass.registry.build_registry", return_value=MagicMock()),
+            patch("agentpass.messenger.telegram.TelegramAdapter", return_value=mock_telegram),
+            patch("agentpass.server.GatewayServer", return_value=mock_gateway),
+            patch("websockets.asyncio.server.serve", return_value=mock_ws_cm),
             patch(f"{_PATCH_PREFIX}.asyncio.Event", return_value=mock_stop_event),
             caplog.at_level(logging.WARNING, logger="agentpass"),
         ):
@@ -372,6 +425,56 @@ class TestRunHealthCheck:
         # But startup should still complete (db.close confirms clean shutdown)
         mock_db.close.assert_awaited_once()
 
+    @pytest.mark.asyncio
+    async def test_health_checks_run_concurrently(self, caplog):
+        """Health checks for all services overlap; a raising check is only a warning."""
+        from agentpass.__main__ import run
+
+        args = argparse.Namespace(config="c.yaml", permissions="p.yaml", insecure=True)
+        mock_config = _make_mock_config(tls=None)
+        mock_config.services = {"a": MagicMock(handler="http"), "b": MagicMock(handler="http")}
+        mock_telegram = AsyncMock()
+        mock_telegram.application = _make_mock_ptb_app()
+
+        events = []
+
+        def _check(name, outcome):
+            async def health_check():
+                events.append(f"{name} start")
+                await asyncio.sleep(0)
+                events.append(f"{name} end")
+                if isinstance(outcome, Exception):
+                    raise outcome
+                return outcome
+
+            service = AsyncMock()
+            service.health_check = AsyncMock(side_effect=health_check)
+            return service
+
+        svc_a = _check("a", ConnectionError("refused"))
+        svc_b = _check("b", False)
+        mock_stop_event = AsyncMock()
+        mock_stop_event.set = MagicMock()
+
+        with (
+            patch("agentpass.config.load_config", return_value=mock_config),
+            patch("agentpass.config.load_permissions", return_value=_make_mock_permissions()),
+            patch("agentpass.db.Database", return_value=AsyncMock()),
+            patch("agentpass.services.http.GenericHTTPService", side_effect=[svc_a, svc_b]),
+            patch("agentpass.registry.build_registry", return_value=MagicMock()),
+            patch("agentpass.messenger.telegram.TelegramAdapter", return_value=mock_telegram),
+            patch("agentpass.server.GatewayServer", return_value=AsyncMock()),
+            patch("websockets.asyncio.server.serve", return_value=_make_ws_serve_cm()),
+            patch(f"{_PATCH_PREFIX}.asyncio.Event", return_value=mock_stop_event),
+            caplog.at_level(logging.WARNING, logger="agentpass"),
+        ):
+            await run(args)
+
+        assert events[:2] == ["a start", "b start"]
+        messages = [record.getMessage() for record in caplog.records]
+        assert any("'a' health check failed" in m and "refused" in m for m in messages)
+        assert any("'b' unreachable" in m for m in messages)
+
     @pytest.mark.asyncio
     async def test_successful_health_check_no_warning(self, caplog):
         """NFR3-AC1: Successful HA health check does NOT log a warning."""
@@ -398,14 +501,14 @@ class TestRunHealthCheck:
         mock_stop_event.set = MagicMock()
 
         with (
-            patch(f"{_PATCH_PREFIX}.load_config", return_value=mock_config),
-            patch(f"{_PATCH_PREFIX}.load_permissions", return_value=_make_mock_permissions()),
-            patch(f"{_PATCH_PREFIX}.Database", return_value=mock_db),
-            patch(f"{_PATCH_PREFIX}.GenericHTTPService", return_value=mock_ha),
-            patch(f"{_PATCH_PREFIX}.build_registry", return_value=MagicMock()),
-            patch(f"{_PATCH_PREFIX}.TelegramAdapter", return_value=mock_telegram),
-            patch(f"{_PATCH_PREFIX}.GatewayServer", return_value=mock_gateway),
-            patch(f"{_PATCH_PREFIX}.websockets.asyncio.server.serve", return_value=mock_ws_cm),
+            patch("agentpass.config.load_config", return_value=mock_config),
+            patch("agentpass.config.load_permissions", return_value=_make_mock_permissions()),
+            patch("agentpass.db.Database", return_value=mock_db),
+            patch("agentpass.services.http.GenericHTTPService", return_value=mock_ha),
+            patch("agentpass.registry.build_registry", return_value=MagicMock()),
+            patch("agentpass.messenger.telegram.TelegramAdapter", return_value=mock_telegram),
+            patch("agentpass.server.GatewayServer", return_value=mock_gateway),
+            patch("websockets.asyncio.server.serve", return_value=mock_ws_cm),
             patch(f"{_PATCH_PREFIX}.asyncio.Event", return_value=mock_stop_event),
             caplog.at_level(logging.WARNING, logger="agentpass"),
         ):
@@ -444,14 +547,14 @@ class TestRunShutdownSequence:
         mock_stop_event.set = MagicMock()
 
         with (
-            patch(f"{_PATCH_PREFIX}.load_config", return_value=mock_config),
-            patch(f"{_PATCH_PREFIX}.load_permissions", return_value=_make_mock_permissions()),
-            patch(f"{_PATCH_PREFIX}.Database", return_value=mock_db),
-            patch(f"{_PATCH_PREFIX}.GenericHTTPService", return_value=mock_ha),
-            patch(f"{_PATCH_PREFIX}.build_registry", return_value=MagicMock()),
-            patch(f"{_PATCH_PREFIX}.TelegramAdapter", return_value=mock_telegram),
-            patch(f"{_PATCH_PREFIX}.GatewayServer", return_value=mock_gateway),
-            patch(f"{_PATCH_PREFIX}.websockets.asyncio.server.serve", return_value=mock_ws_cm),
+            patch("agentpass.config.load_config", return_value=mock_config),
+            patch("agentpass.config.load_permissions", return_value=_make_mock_permissions()),
+            patch("agentpass.db.Database", return_value=mock_db),
+            patch("agentpass.services.http.GenericHTTPService", return_value=mock_ha),
+            patch("agentpass.registry.build_registry", return_value=MagicMock()),
+            patch("agentpass.messenger.telegram.TelegramAdapter", return_value=mock_telegram),
+            patch("agentpass.server.GatewayServer", return_value=mock_gateway),
+            patch("websockets.asyncio.server.serve", return_value=mock_ws_cm),
             patch(f"{_PATCH_PREFIX}.asyncio.Event", return_value=mock_stop_event),
         ):
             await run(args)
@@ -502,14 +605,14 @@ class TestRunSignalHandling:
         mock_loop.add_signal_handler = track_add_signal_handler
 
         with (
-            patch(f"{_PATCH_PREFIX}.load_config", return_value=mock_config),
-            patch(f"{_PATCH_PREFIX}.load_permissions", return_value=_make_mock_permissions()),
-            patch(f"{_PATCH_PREFIX}.Database", return_value=mock_db),
-            patch(f"{_PATCH_PREFIX}.GenericHTTPService", return_value=mock_ha),
-            patch(f"{_PATCH_PREFIX}.build_registry", return_value=MagicMock()),
-            patch(f"{_PATCH_PREFIX}.TelegramAdapter", return_value=mock_telegram),
-            patch(f"{_PATCH_PREFIX}.GatewayServer", return_value=mock_gateway),
-            patch(f"{_PATCH_PREFIX}.websockets.asyncio.server.serve", return_value=mock_ws_cm),
+            patch("agentpass.config.load_config", return_value=mock_config),
+            patch("agentpass.config.load_permissions", return_value=_make_mock_permissions()),
+            patch("agentpass.db.Database", return_value=mock_db),
+            patch("agentpass.services.http.GenericHTTPService", return_value=mock_ha),
+            patch("agentpass.registry.build_registry", return_value=MagicMock()),
+            patch("agentpass.messenger.telegram.TelegramAdapter", return_value=mock_telegram),
+            patch("agentpass.server.GatewayServer", return_value=mock_gateway),
+            patch("websockets.asyncio.server.serve", return_value=mock_ws_cm),
             patch(f"{_PATCH_PREFIX}.asyncio.Event", return_value=mock_stop_event),
             patch(f"{_PATCH_PREFIX}.asyncio.get_running_loop", return_value=mock_loop),
         ):
@@ -548,14 +651,14 @@ class TestRunPtbLifecycle:
         mock_stop_event.set = MagicMock()
 
         with (
-            patch(f"{_PATCH_PREFIX}.load_config", return_value=mock_config),
-            patch(f"{_PATCH_PREFIX}.load_permissions", return_value=_make_mock_permissions()),
-            patch(f"{_PATCH_PREFIX}.Database", return_value=mock_db),
-            patch(f"{_PATCH_PREFIX}.GenericHTTPService", return_value=mock_ha),
-            patch(f"{_PATCH_PREFIX}.build_registry", return_value=MagicMock()),
-            patch(f"{_PATCH_PREFIX}.TelegramAdapter", return_value=mock_telegram),
-            patch(f"{_PATCH_PREFIX}.GatewayServer", return_value=mock_gateway),
-            patch(f"{_PATCH_PREFIX}.websockets.asyncio.server.serve", return_value=mock_ws_cm),
+            patch("agentpass.config.load_config", return_value=mock_config),
+            patch("agentpass.config.load_permissions", return_value=_make_mock_permissions()),
+            patch("agentpass.db.Database", return_value=mock_db),
+            patch("agentpass.services.http.GenericHTTPService", return_value=mock_ha),
+            patch("agentpass.registry.build_registry", return_value=MagicMock()),
+            patch("agentpass.messenger.telegram.TelegramAdapter", return_value=mock_telegram),
+            patch("agentpass.server.GatewayServer", return_value=mock_gateway),
+            patch("websockets.asyncio.server.serve", return_value=mock_ws_cm),
             patch(f"{_PATCH_PREFIX}.asyncio.Event", return_value=mock_stop_event),
         ):
             await run(args)
@@ -610,16 +713,16 @@ class TestRunTlsContext:
         mock_serve = MagicMock(return_value=mock_ws_cm)
 
         with (
-            patch(f"{_PATCH_PREFIX}.load_config", return_value=mock_config),
-            patch(f"{_PATCH_PREFIX}.load_permissions", return_value=_make_mock_permissions()),
-            patch(f"{_PATCH_PREFIX}.Database", return_value=mock_db),
-            patch(f"{_PATCH_PREFIX}.GenericHTTPService", return_value=mock_ha),
-            patch(f"{_PATCH_PREFIX}.build_registry", return_value=MagicMock()),
-            patch(f"{_PATCH_PREFIX}.TelegramAdapter", return_value=mock_telegram),
-            patch(f"{_PATCH_PREFIX}.GatewayServer", return_value=mock_gateway),
-            patch(f"{_PATCH_PREFIX}.websockets.asyncio.server.serve", mock_serve),
+            patch("agentpass.config.load_config", return_value=mock_config),
+            patch("agentpass.config.load_permissions", return_value=_make_mock_permissions()),
+            patch("agentpass.db.Database", return_value=mock_db),
+            patch("agentpass.services.http.GenericHTTPService", return_value=mock_ha),
+            patch("agentpass.registry.build_registry", return_value=MagicMock()),
+            patch("agentpass.messenger.telegram.TelegramAdapter", return_value=mock_telegram),
+            patch("agentpass.server.GatewayServer", return_value=mock_gateway),
+            patch("websockets.asyncio.server.serve", mock_serve),
             patch(f"{_PATCH_PREFIX}.asyncio.Event", return_value=mock_stop_event),
-            patch(f"{_PATCH_PREFIX}.ssl.SSLContext", mock_ssl_class),
+            patch("ssl.SSLContext", mock_ssl_class),
         ):
             await run(args)
 
@@ -634,6 +737,21 @@ class TestRunTlsContext:
         _, kwargs = mock_serve.call_args
         assert kwargs.get("ssl") is mock_ssl_ctx
 
+    def test_ssl_context_settings(self):
+        """The server context is TLS 1.3-only, HTTP/1.1 ALPN, no renegotiation."""
+        import ssl
+
+        from agentpass.__main__ import _build_ssl_context
+
+        tls = MagicMock(cert="/path/to/cert.pem", key="/path/to/key.pem")
+        with patch.object(ssl.SSLContext, "load_cert_chain") as load_cert_chain:
+            ctx = _build_ssl_context(tls)
+        load_cert_chain.assert_called_once_with("/path/to/cert.pem", "/path/to/key.pem")
+        assert ctx.minimum_version is ssl.TLSVersion.TLSv1_3
+        assert ctx.options & ssl.OP_NO_RENEGOTIATION
+        assert ctx.options & ssl.OP_NO_COMPRESSION
+        assert ctx.verify_mode == ssl.CERT_NONE
+
 
 class TestRunTokenNeverLogged:
     """NFR1-AC2: Agent token must never be logged."""
@@ -665,14 +783,14 @@ class TestRunTokenNeverLogged:
         mock_stop_event.set = MagicMock()
 
         with (
-            patch(f"{_PATCH_PREFIX}.load_config", return_value=mock_config),
-            patch(f"{_PATCH_PREFIX}.load_permissions", return_value=_make_mock_permissions()),
-            patch(f"{_PATCH_PREFIX}.Database", return_value=mock_db),
-            patch(f"{_PATCH_PREFIX}.GenericHTTPService", return_value=mock_ha),
-            patch(f"{_PATCH_PREFIX}.build_registry", return_value=MagicMock()),
-            patch(f"{_PATCH_PREFIX}.TelegramAdapter", return_value=mock_telegram),
-            patch(f"{_PATCH_PREFIX}.GatewayServer", return_value=mock_gateway),
-            patch(f"{_PATCH_PREFIX}.websockets.asyncio.server.serve", return_value=mock_ws_cm),
+            patch("agentpass.config.load_config", return_value=mock_config),
+            patch("agentpass.config.load_permissions", return_value=_make_mock_permissions()),
+            patch("agentpass.db.Database", return_value=mock_db),
+            patch("agentpass.services.http.GenericHTTPService", return_value=mock_ha),
+            patch("agentpass.registry.build_registry", return_value=MagicMock()),
+            patch("agentpass.messenger.telegram.TelegramAdapter", return_value=mock_telegram),
+            patch("agentpass.server.GatewayServer", return_value=mock_gateway),
+            patch("websockets.asyncio.server.serve", return_value=mock_ws_cm),
             patch(f"{_PATCH_PREFIX}.asyncio.Event", return_value=mock_stop_event),
             caplog.at_level(logging.DEBUG, logger="agentpass"),
         ):
@@ -718,16 +836,16 @@ class TestRunGatewayServerWiring:
         mock_stop_event.set = MagicMock()
 
         with (
-            patch(f"{_PATCH_PREFIX}.load_config", return_value=mock_config),
-            patch(f"{_PATCH_PREFIX}.load_permissions", return_value=mock_permissions),
-            patch(f"{_PATCH_PREFIX}.Database", return_value=mock_db),
-            patch(f"{_PATCH_PREFIX}.GenericHTTPService", return_value=mock_ha),
-            patch(f"{_PATCH_PREFIX}.build_registry", return_value=MagicMock()),
-            patch(f"{_PATCH_PREFIX}.TelegramAdapter", return_value=mock_telegram),
-            patch(f"{_PATCH_PREFIX}.GatewayServer", mock_gateway_cls),
-            patch(f"{_PATCH_PREFIX}.PermissionEngine", mock_engine_cls),
-            patch(f"{_PATCH_PREFIX}.Executor", mock_executor_cls),
-            patch(f"{_PATCH_PREFIX}.websockets.asyncio.server.serve", return_value=mock_ws_cm),
+            patch("agentpass.config.load_config", return_value=mock_config),
+            patch("agentpass.config.load_permissions", return_value=mock_permissions),
+            patch("agentpass.db.Database", return_value=mock_db),
+            patch("agentpass.services.http.GenericHTTPService", return_value=mock_ha),
+            patch("agentpass.registry.build_registry", return_value=MagicMock()),
+            patch("agentpass.messenger.telegram.TelegramAdapter", return_value=mock_telegram),
+            patch("agentpass.server.GatewayServer", mock_gateway_cls),
+            patch("agentpass.engine.PermissionEngine", mock_engine_cls),
+            patch("agentpass.executor.Executor", mock_executor_cls),
+            patch("websockets.asyncio.server.serve", return_value=mock_ws_cm),
             patch(f"{_PATCH_PREFIX}.asyncio.Event", return_value=mock_stop_event),
         ):
             await run(args)
@@ -846,6 +964,117 @@ class TestParseArgsSubcommands:
         args = parse_args(["pending"])
         assert args.command == "pending"
 
+    def test_daemon_subcommand(self):
+        """'daemon' subcommand is recognized and takes a socket path."""
+        from agentpass.__main__ import parse_args
+
+        args = parse_args(["daemon", "--socket", "/tmp/ap.sock"])
+        assert args.command == "daemon"
+        assert args.socket == "/tmp/ap.sock"
+
+    def test_default_socket_skipped_for_explicit_gateway(self, monkeypatch):
+        """--url/--token win over the implicit per-user daemon socket."""
+        from agentpass.__main__ import parse_args
+        from agentpass.daemon import default_socket_path
+
+        monkeypatch.delenv("AGENTPASS_SOCKET", raising=False)
+        monkeypatch.setenv("AGENTPASS_URL", "wss://env")
+        assert parse_args(["tools"]).socket == default_socket_path()
+        assert parse_args(["tools"]).url == "wss://env"
+        assert parse_args(["tools", "--url", "wss://gw"]).socket is None
+        assert parse_args(["pending", "--token", "t"]).socket is None
+        assert parse_args(["tools", "--url", "wss://gw", "--socket", "/tmp/a.sock"]).socket == (
+            "/tmp/a.sock"
+        )
+        assert parse_args(["daemon", "--url", "wss://gw"]).socket == default_socket_path()
+
+        monkeypatch.setenv("AGENTPASS_SOCKET", "/tmp/env.sock")
+        assert parse_args(["tools", "--url", "wss://gw"]).socket == "/tmp/env.sock"
+
+
+class TestLazyImports:
+    def test_client_commands_skip_gateway_modules(self):
+        """Parsing a client command imports none of the gateway-only dependencies."""
+        code = (
+            "import sys\n"
+            "from agentpass.__main__ import parse_args\n"
+            "parse_args(['tools'])\n"
+            "print(sorted(m for m in ('aiohttp', 'telegram', 'jinja2', 'aiosqlite', 'yaml',"
+            " 'argparse')"
+            " if m in sys.modules))\n"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+        assert out.strip() == "[]"
+
+
+class TestFastParse:
+    """The hand-rolled parser agrees with argparse and defers to it otherwise."""
+
+    @pytest.mark.parametrize(
+        "argv",
+        [
+            [],
+            ["--insecure"],
+            ["--config", "c.yaml", "--insecure", "--permissions", "p.yaml"],
+            ["serve", "--config", "c.yaml"],
+            ["request", "ha_get_state"],
+            ["request", "ha_get_state", "entity_id=sensor.temp", "x=1", "--timeout", "5"],
+            ["request", "--url", "wss://gw", "t", "a=b", "--token", "tok", "--low-latency"],
+            ["request", "--timeout", "5", "t"],
+            ["tools", "--url", "wss://gw:8443"],
+            ["pending", "--socket", "/tmp/ap.sock"],
+            ["daemon", "--url", "wss://gw", "--token", "t", "--socket", "/tmp/ap.sock"],
+        ],
+    )
+    def test_matches_argparse(self, argv):
+        from agentpass.__main__ import _argparse_parse, parse_args
+
+        fast = parse_args(argv)
+        raw = argv if argv[:1] and argv[0] == fast.command else ["serve", *argv]
+        assert vars(fast) == vars(_argparse_parse(fast.command, raw))
+
+    @pytest.mark.parametrize(
+        "argv",
+        [
+            ["request", "t", "--timeout=5"],
+            ["tools", "--url=wss://gw"],
+        ],
+    )
+    def test_unrecognized_forms_go_to_argparse(self, argv):
+        from agentpass.__main__ import _argparse_parse, parse_args
+
+        with patch(f"{_PATCH_PREFIX}._argparse_parse", wraps=_argparse_parse) as fallback:
+            parse_args(argv)
+        fallback.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "argv", [["request"], ["tools", "--bogus"], ["request", "t", "--timeout", "x"]]
+    )
+    def test_usage_errors_exit(self, argv, capsys):
+        from agentpass.__main__ import parse_args
+
+        with pytest.raises(SystemExit) as exc_info:
+            parse_args(argv)
+        assert exc_info.value.code == 2
+        assert "usage:" in capsys.readouterr().err
+
+    def test_help_exits_cleanly(self, capsys):
+        from agentpass.__main__ import parse_args
+
+        with pytest.raises(SystemExit) as exc_info:
+            parse_args(["request", "--help"])
+        assert exc_info.value.code == 0
+        assert "--timeout" in capsys.readouterr().out
+
+    def test_positionals_split_by_option_rejected(self):
+        """argparse takes one run of positionals; so does the fast path."""
+        from agentpass.__main__ import parse_args
+
+        with pytest.raises(SystemExit):
+            parse_args(["request", "t", "--timeout", "5", "a=1"])
+
 
 class TestLogLevel:
     """LOG_LEVEL environment variable support."""
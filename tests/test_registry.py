@@ -125,6 +125,11 @@ class TestToolRegistryGetServiceName:
     def test_get_service_name_unknown_returns_none(self, registry):
         assert registry.get_service_name("nonexistent_tool") is None
 
+    def test_tool_services_covers_all_tools(self, registry):
+        routes = registry.tool_services()
+        assert set(routes) == {t.name for t in registry.all_tools()}
+        assert set(routes.values()) == {"homeassistant"}
+
 
 class TestToolRegistrySignatureParts:
     def test_get_signature_parts_call_service(self, registry):
@@ -156,6 +161,12 @@ class TestToolRegistrySignatureParts:
         )
         assert parts == ["light.turn_on", ""]
 
+    def test_get_signature_parts_literals_and_non_string_values(self):
+        tool = _make_tool("t", signature="path:{path} , {a}-{b}, {n}, {not-an-arg}")
+        registry = ToolRegistry({"t": tool})
+        parts = registry.get_signature_parts("t", {"path": "/x", "a": 1, "b": True, "n": 2.5})
+        assert parts == ["path:/x", "1-True", "2.5", "{not-an-arg}"]
+
 
 class TestToolRegistryArgValidators:
     def test_get_arg_validators(self, registry):
@@ -19,6 +19,7 @@ from agentpass.server import (
     APPROVAL_TIMEOUT,
     EXECUTION_FAILED,
     INVALID_REQUEST,
+    MAX_BATCH_SIZE,
     METHOD_NOT_FOUND,
     NOT_AUTHENTICATED,
     PARSE_ERROR,
@@ -37,14 +38,14 @@ class MockWebSocket:
     """Simulates a websockets connection for unit tests."""
 
     def __init__(self) -> None:
-        self.sent: list[str] = []
+        self.sent: list[str | bytes] = []
         self.to_recv: asyncio.Queue[str] = asyncio.Queue()
         self.closed = False
         self.close_code: int | None = None
         self.close_reason: str | None = None
         self._iter_timeout: float = 0.1
 
-    async def send(self, data: str) -> None:
+    async def send(self, data: str | bytes, text: bool | None = None) -> None:
         self.sent.append(data)
 
     async def recv(self) -> str:
@@ -174,6 +175,17 @@ class TestRateLimiter:
         rl._timestamps[0] -= 61
         assert rl.check() is True
 
+    def test_evicts_only_expired_timestamps(self):
+        rl = RateLimiter(max_per_minute=3)
+        for _ in range(3):
+            assert rl.check() is True
+        rl._timestamps[0] -= 61
+        rl._timestamps[1] -= 61
+        assert rl.check() is True
+        assert len(rl._timestamps) == 2
+        assert rl.check() is True
+        assert rl.check() is False
+
 
 # ---------------------------------------------------------------------------
 # Authentication tests
@@ -438,6 +450,107 @@ class TestToolRequests:
         ids = {r["id"] for r in responses}
         assert ids == {"auth-1", "r1", "r2", "r3"}
 
+    async def test_batch_requests_answered_individually(self):
+        """A JSON-RPC batch array is dispatched element by element."""
+        engine = MagicMock(spec=PermissionEngine)
+        engine.evaluate.return_value = Decision.ALLOW
+        executor = AsyncMock(spec=Executor)
+        executor.execute.return_value = {"result": "ok"}
+        server = _make_server(engine=engine, executor=executor)
+
+        ws = MockWebSocket()
+        ws.enqueue(_auth_msg())
+        ws.enqueue(json.dumps([_tool_request_msg(msg_id="b1"), _tool_request_msg(msg_id="b2")]))
+
+        await server.handle_connection(ws)
+
+        responses = ws.get_responses()
+        assert len(responses) == 3
+        assert {r["id"] for r in responses[1:]} == {"b1", "b2"}
+        assert all(r["result"]["status"] == "executed" for r in responses[1:])
+
+    async def test_empty_batch_returns_invalid_request(self):
+        """An empty batch array returns -32600."""
+        server = _make_server()
+        ws = MockWebSocket()
+        ws.enqueue(_auth_msg())
+        ws.enqueue("[]")
+
+        await server.handle_connection(ws)
+
+        responses = ws.get_responses()
+        assert responses[1]["error"]["code"] == INVALID_REQUEST
+
+    async def test_oversized_batch_rejected(self):
+        """A batch above MAX_BATCH_SIZE is refused as a whole, nothing dispatched."""
+        server = _make_server()
+        server._dispatch = AsyncMock()
+        ws = MockWebSocket()
+        ws.enqueue(_auth_msg())
+        ws.enqueue(
+            json.dumps([{"method": "list_tools", "id": i} for i in range(MAX_BATCH_SIZE + 1)])
+        )
+
+        await server.handle_connection(ws)
+
+        responses = ws.get_responses()
+        assert len(responses) == 2
+        assert responses[1]["error"]["code"] == INVALID_REQUEST
+        server._dispatch.assert_not_called()
+
+    async def test_batch_handler_error_logged(self, caplog):
+        server = _make_server()
+        server._dispatch = AsyncMock(side_effect=RuntimeError("boom"))
+        ws = MockWebSocket()
+        ws.enqueue(_auth_msg())
+        ws.enqueue(json.dumps([{"method": "list_tools", "id": 1}]))
+
+        await server.handle_connection(ws)
+
+        assert "Unhandled error in batch request" in caplog.text
+        assert "boom" in caplog.text
+
+    async def test_cheap_methods_answered_inline(self):
+        """Only tool requests and batches get a handler task."""
+        server = _make_server()
+        ws = MockWebSocket()
+        ws.enqueue(_auth_msg())
+        ws.enqueue({"jsonrpc": "2.0", "method": "list_tools", "id": 1})
+        ws.enqueue({"jsonrpc": "2.0", "method": "nonexistent", "id": 2})
+        ws.enqueue("not json")
+
+        with patch("agentpass.server.asyncio.create_task", wraps=asyncio.create_task) as spawn:
+            await server.handle_connection(ws)
+
+        spawn.assert_not_called()
+        assert [r["id"] for r in ws.get_responses()][1:] == [1, 2, None]
+
+    async def test_inline_handler_error_logged(self, caplog):
+        server = _make_server()
+        server._dispatch = AsyncMock(side_effect=[RuntimeError("boom"), None])
+        ws = MockWebSocket()
+        ws.enqueue(_auth_msg())
+        ws.enqueue({"jsonrpc": "2.0", "method": "list_tools", "id": 1})
+        ws.enqueue({"jsonrpc": "2.0", "method": "list_tools", "id": 2})
+
+        await server.handle_connection(ws)
+
+        assert "Unhandled error in request" in caplog.text
+        assert server._dispatch.await_count == 2
+
+    async def test_non_object_batch_element_returns_invalid_request(self):
+        """A batch element that is not an object returns -32600 for that element."""
+        server = _make_server()
+        ws = MockWebSocket()
+        ws.enqueue(_auth_msg())
+        ws.enqueue("[1]")
+
+        await server.handle_connection(ws)
+
+        responses = ws.get_responses()
+        assert responses[1]["error"]["code"] == INVALID_REQUEST
+        assert responses[1]["id"] is None
+
     async def test_malformed_json_returns_parse_error(self):
         """FR3-AC5: Malformed JSON returns -32700."""
         server = _make_server()
@@ -484,6 +597,19 @@ class TestToolRequests:
         error_resp = responses[1]
         assert error_resp["error"]["code"] == METHOD_NOT_FOUND
 
+    async def test_unhashable_method_returns_method_not_found(self):
+        """A non-string method (e.g. an array) is reported, not raised."""
+        server = _make_server()
+        ws = MockWebSocket()
+        ws.enqueue(_auth_msg())
+        ws.enqueue({"jsonrpc": "2.0", "method": ["list_tools"], "id": "u-2"})
+
+        await server.handle_connection(ws)
+
+        responses = ws.get_responses()
+        assert responses[1]["error"]["code"] == METHOD_NOT_FOUND
+        assert responses[1]["id"] == "u-2"
+
     async def test_missing_tool_name_returns_invalid_request(self):
         """FR3-AC5: Missing tool name in tool_request returns -32600."""
         server = _make_server()
@@ -624,6 +750,73 @@ class TestConnectionManagement:
         ws1.closed = True
         await _cancel_task(task1)
 
+    async def test_in_flight_messages_bounded(self):
+        """Frames past the in-flight limit wait until a handler finishes."""
+        server = _make_server(rate_limit_config=RateLimitConfig(max_pending_approvals=1))
+        release = asyncio.Event()
+        active = 0
+        peak = 0
+        handled = 0
+
+        async def slow_handler(websocket, msg):
+            nonlocal active, peak, handled
+            active += 1
+            peak = max(peak, active)
+            await release.wait()
+            active -= 1
+            handled += 1
+
+        server._handle_message = slow_handler
+        ws = MockWebSocket()
+        ws.enqueue(_auth_msg())
+        for _ in range(10):
+            ws.enqueue(_tool_request_msg())
+
+        with patch("agentpass.server.MAX_CONCURRENT_MESSAGES", 2):
+            task = asyncio.create_task(server.handle_connection(ws))
+            await asyncio.sleep(0.05)
+            assert active == 3
+            assert ws.to_recv.qsize() == 6  # the loop stopped reading
+
+            release.set()
+            await asyncio.wait_for(task, timeout=2)
+        assert peak == 3
+        assert handled == 10
+
+    async def test_in_flight_limit_is_per_connection(self):
+        """Handlers left waiting by a dropped connection don't shrink the next one's budget."""
+        from websockets.exceptions import ConnectionClosedError
+
+        server = _make_server(rate_limit_config=RateLimitConfig(max_pending_approvals=1))
+        release = asyncio.Event()
+        started = 0
+
+        async def parked_handler(websocket, msg):
+            nonlocal started
+            started += 1
+            await release.wait()
+
+        server._handle_message = parked_handler
+
+        class DroppingWebSocket(MockWebSocket):
+            async def __anext__(self):
+                if self.to_recv.empty():
+                    raise ConnectionClosedError(None, None)
+                return await super().__anext__()
+
+        with patch("agentpass.server.MAX_CONCURRENT_MESSAGES", 2):
+            for _ in range(2):
+                ws = DroppingWebSocket()
+                ws.enqueue(_auth_msg())
+                for _ in range(3):
+                    ws.enqueue(_tool_request_msg())
+                await asyncio.wait_for(server.handle_connection(ws), timeout=2)
+        await asyncio.sleep(0)
+
+        assert started == 6  # the second connection got all 3 of its slots
+        release.set()
+        await asyncio.sleep(0)  # let the parked handlers finish
+
 
 # ---------------------------------------------------------------------------
 # Audit logging tests
@@ -724,9 +917,23 @@ class TestResolveAllPending:
         for i in range(3):
             assert server._pending[f"p-{i}"].future.done()
             result = server._pending[f"p-{i}"].future.result()
+            assert result.request_id == f"p-{i}"
             assert result.action == "deny"
             assert result.user_id == "test_shutdown"
 
+    async def test_already_resolved_left_alone(self):
+        server = _make_server()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        approved = ApprovalResult(request_id="p-0", action="allow", user_id="1", timestamp=1.0)
+        future.set_result(approved)
+        req = ToolRequest(id="p-0", tool_name="ha_get_state", args={})
+        server._pending["p-0"] = PendingApproval(request=req, future=future)
+
+        await server.resolve_all_pending()
+
+        assert future.result() is approved
+
 
 # ---------------------------------------------------------------------------
 # Integration tests (real WebSocket)
@@ -754,9 +961,37 @@ class TestRealWebSocket:
             async with ws_connect(f"ws://127.0.0.1:{port}") as client:
                 await client.send(json.dumps(_auth_msg()))
                 raw = await asyncio.wait_for(client.recv(), timeout=2)
+                assert isinstance(raw, str)  # responses go out as text frames
                 resp = json.loads(raw)
                 assert resp["result"]["status"] == "authenticated"
 
+    async def test_binary_frames_and_non_str_keys_real_ws(self):
+        """Binary request frames are parsed; int-keyed results still encode."""
+        from websockets.asyncio.client import connect as ws_connect
+        from websockets.asyncio.server import serve as ws_serve
+
+        engine = MagicMock(spec=PermissionEngine)
+        engine.evaluate.return_value = Decision.ALLOW
+        executor = AsyncMock(spec=Executor)
+        executor.execute.return_value = {1: "on"}
+        server = GatewayServer(
+            agent_token=TOKEN,
+            engine=engine,
+            executor=executor,
+            messenger=AsyncMock(spec=MessengerAdapter),
+            db=AsyncMock(spec=Database),
+        )
+
+        async with ws_serve(server.handle_connection, "127.0.0.1", 0) as ws_server:
+            port = ws_server.sockets[0].getsockname()[1]
+            async with ws_connect(f"ws://127.0.0.1:{port}") as client:
+                await client.send(json.dumps(_auth_msg()).encode())
+                await asyncio.wait_for(client.recv(), timeout=2)
+
+                await client.send(json.dumps(_tool_request_msg()).encode())
+                raw = await asyncio.wait_for(client.recv(), timeout=2)
+                assert json.loads(raw)["result"]["data"] == {"1": "on"}
+
     async def test_tool_request_allow_real_ws(self):
         """FR3-AC2: tool_request -> allow -> result over real WebSocket."""
         from websockets.asyncio.client import connect as ws_connect
@@ -1296,3 +1531,32 @@ class TestHealthStatus:
 
         assert status["status"] == "healthy"
         assert status["checks"]["services"]["ha"] is False
+
+
+# ---------------------------------------------------------------------------
+# Error envelopes
+# ---------------------------------------------------------------------------
+
+
+class TestErrorEnvelopes:
+    async def test_matches_full_encoding(self):
+        """Cached and per-call envelopes encode exactly like the full response dict."""
+        from agentpass.server import _ERROR_PREFIXES
+
+        server = _make_server()
+        cases = [*_ERROR_PREFIXES, (METHOD_NOT_FOUND, 'Unknown method: "x"é')]
+        for code, message in cases:
+            for msg_id in (None, 7, "abc"):
+                ws = MockWebSocket()
+                await server._send_error(ws, code, message, msg_id)
+                assert ws.sent == [
+                    json.dumps(
+                        {
+                            "jsonrpc": "2.0",
+                            "error": {"code": code, "message": message},
+                            "id": msg_id,
+                        },
+                        separators=(",", ":"),
+                        ensure_ascii=False,
+                    ).encode()
+                ]
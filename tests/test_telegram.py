@@ -97,6 +97,22 @@ class TestSendApproval:
         # InlineKeyboardMarkup is constructed in the adapter; we check its structure
         assert markup is not None
 
+    async def test_lists_args_missing_from_signature(self, adapter, mock_app, choices):
+        request = ApprovalRequest(
+            request_id="req-2",
+            tool_name="ha_call_service",
+            args={"domain": "light", "entity_id": "light.kitchen", "brightness": 128},
+            signature="ha_call_service(light.turn_on, light.kitchen)",
+        )
+        await adapter.send_approval(request, choices)
+
+        text = mock_app.bot.send_message.call_args.kwargs["text"]
+        assert text.split("\n") == [
+            "\U0001f6a8 ha_call_service",
+            "ha_call_service(light.turn_on, light.kitchen)",
+            "  brightness: 128",
+        ]
+
     async def test_returns_message_id_as_string(self, adapter, mock_app, approval_request, choices):
         """send_approval returns message_id as string."""
         msg_id = await adapter.send_approval(approval_request, choices)
@@ -350,18 +366,65 @@ class TestTimeout:
         assert len(results) == 1
         assert results[0].action == "deny"
 
-    async def test_schedule_timeout_creates_tracked_task(self, adapter):
-        """schedule_timeout creates a task tracked in _pending."""
+    async def test_schedule_timeout_creates_tracked_timer(self, adapter):
+        """schedule_timeout arms a loop timer tracked in _pending; no task until it fires."""
+        tasks_before = asyncio.all_tasks()
         adapter.schedule_timeout("req-t4", 10, "53")
 
         assert "req-t4" in adapter._pending
-        task = adapter._pending["req-t4"]
-        assert isinstance(task, asyncio.Task)
+        handle = adapter._pending["req-t4"]
+        assert isinstance(handle, asyncio.TimerHandle)
+        assert asyncio.all_tasks() == tasks_before
 
         # Cleanup
-        task.cancel()
+        handle.cancel()
+
+    async def test_stop_cancels_fired_timeout_in_flight(self, adapter, mock_app):
+        """stop() also cancels a timeout that fired and is still resolving."""
+        started = asyncio.Event()
+
+        async def slow_callback(result):
+            started.set()
+            await asyncio.sleep(10)
+
+        await adapter.on_approval_callback(slow_callback)
+
+        adapter.schedule_timeout("req-t5", 0, "54")
+        await started.wait()
+        [task] = adapter._timeout_tasks
+        await adapter.stop()
         with contextlib.suppress(asyncio.CancelledError):
             await task
+        assert task.cancelled()
+
+
+class TestConcurrentResolution:
+    async def test_callback_does_not_wait_for_edit(self, adapter, mock_app):
+        """The approval callback runs while the Telegram edit is still in flight."""
+        edit_done = asyncio.Event()
+        seen = []
+
+        async def slow_edit(**kwargs):
+            await asyncio.sleep(0.05)
+            edit_done.set()
+
+        async def cb(result: ApprovalResult) -> None:
+            seen.append(edit_done.is_set())
+
+        mock_app.bot.edit_message_text.side_effect = slow_edit
+        await adapter.on_approval_callback(cb)
+        adapter.schedule_timeout("req-c1", 0, "70")
+        await asyncio.sleep(0.1)
+        assert seen == [False]
+        assert edit_done.is_set()
+
+    async def test_callback_error_logged(self, adapter, mock_app, caplog):
+        await adapter.on_approval_callback(AsyncMock(side_effect=RuntimeError("boom")))
+        with caplog.at_level(logging.ERROR):
+            adapter.schedule_timeout("req-c2", 0, "71")
+            await asyncio.sleep(0.05)
+        assert "Approval callback failed for req-c2" in caplog.text
+        mock_app.bot.edit_message_text.assert_awaited_once()
 
 
 # ---------------------------------------------------------------------------
@@ -438,6 +501,14 @@ class TestRaceSafeResolution:
         # The timeout task should have been cancelled
         assert "req-race2" not in adapter._pending
 
+    async def test_resolved_ids_bounded(self, adapter, monkeypatch):
+        """Only the most recent resolved request_ids are remembered."""
+        monkeypatch.setattr("agentpass.messenger.telegram._RESOLVED_MAX", 3)
+        for i in range(5):
+            adapter.schedule_timeout(f"req-{i}", 0, str(i))
+        await asyncio.sleep(0.05)
+        assert list(adapter._resolved) == ["req-2", "req-3", "req-4"]
+
 
 # ---------------------------------------------------------------------------
 # Test: stop()
@@ -445,8 +516,8 @@ class TestRaceSafeResolution:
 
 
 class TestStop:
-    async def test_cancels_all_pending_timeout_tasks(self, adapter):
-        """stop() cancels all pending timeout tasks and clears _pending."""
+    async def test_cancels_all_pending_timeout_timers(self, adapter):
+        """stop() cancels all pending timeout timers and clears _pending."""
         task1 = MagicMock()
         task1.cancel = MagicMock()
         task2 = MagicMock()
@@ -525,6 +596,26 @@ class TestHandlerRegistrationOrder:
         assert invalid_idx < valid_idx, "InvalidCallbackData handler must be registered first"
 
 
+class TestPersistence:
+    def test_persists_callback_data_only(self, mock_app, telegram_config, tmp_path):
+        with patch("agentpass.messenger.telegram.Application") as mock_app_cls:
+            mock_builder = MagicMock()
+            mock_app_cls.builder.return_value = mock_builder
+            mock_builder.token.return_value = mock_builder
+            mock_builder.persistence.return_value = mock_builder
+            mock_builder.arbitrary_callback_data.return_value = mock_builder
+            mock_builder.build.return_value = mock_app
+
+            from agentpass.messenger.telegram import TelegramAdapter
+
+            TelegramAdapter(telegram_config, persistence_path=str(tmp_path / "cb.pickle"))
+
+        [persistence], _ = mock_builder.persistence.call_args
+        store = persistence.store_data
+        assert store.callback_data
+        assert not (store.bot_data or store.chat_data or store.user_data)
+
+
 class TestCallbackDataGuard:
     async def test_non_dict_data_does_not_crash(self, adapter):
         """Major 4: _handle_callback guards against non-dict data (e.g. InvalidCallbackData)."""